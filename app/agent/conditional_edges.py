@@ -1,10 +1,12 @@
-from agent.agent_config import agent  # agent 불러오기
+from service.intent_router import route_followup
 
-def route_by_agent(state: dict) -> str:
-    followup = state.get("user_input", "")   
 
-    # 👇 프롬프트를 넣어서 agent 호출
-    result = agent.invoke({"input": prompt})
+def _agent_tool_name(followup: str):
+    # agent는 로컬 분류기가 애매할 때만 필요하므로, 처음 쓸 때 불러옵니다. (import 시 초기화 비용 회피)
+    from agent.agent_config import get_agent  # agent 불러오기
+
+    # 👇 사용자 입력을 넣어서 agent 호출
+    result = get_agent().invoke({"input": followup})
     print("🧾 Agent 결과 전체:", result)
 
     steps = result.get("intermediate_steps", [])
@@ -18,13 +20,12 @@ def route_by_agent(state: dict) -> str:
 
     if not tool_name:
         print("❌ 도구 판단 실패. 종료로 분기")
-        return "end"
+    return tool_name
+
 
-    print(f"🔀 분기 판단: {tool_name}")
+async def route_by_agent(state: dict) -> str:
+    followup = state.get("user_input", "")
 
-    return {
-        "restart": "location_node",
-        "show_menu": "menu_node",
-        "another_restaurants": "intersection_node",
-        "another_menu": "menu_node",
-    }.get(tool_name, "end")
+    next_node = await route_followup(followup, _agent_tool_name)
+    print(f"🔀 분기 판단: {next_node}")
+    return next_node
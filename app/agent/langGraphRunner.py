@@ -1,129 +1,359 @@
 import os
 import sys
+import time
 import asyncio
+import functools
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from langgraph.graph import StateGraph, END
 from langchain_core.runnables import Runnable
-from typing import TypedDict
+from typing import Annotated, TypedDict
 from langchain_core.runnables import RunnableLambda
 from agent.conditional_edges import route_by_agent
 from tools.gpt_tools import (
+    extract_tool,
     get_location_tool,
     get_menu_tool,
     get_context_tool,
     intersection_restaurant,
     get_restaurant_info,
+    rank_restaurants,
+    extraction_keywords,
     final_recommend,
+    stream_final_recommend,
 )
 from service.saveRestaurant_pipeline import next_tool
+from auth_context import set_request_token, reset_request_token
 
 # --- 토큰 관리 관련 import (자동 갱신 관련 제거) ---
 # bring_to_server의 refresh_access_token_if_needed 등은 이제 직접 호출하지 않음
 # get_menu, review_fetch의 httpx 갱신 함수도 제거 (각 _make_authenticated_request_httpx 내에서만 사용)
 
 
+def merge_timings(left: dict, right: dict) -> dict:
+    """병렬 브랜치에서 동시에 기록한 노드별 소요 시간을 합칩니다."""
+    return {**(left or {}), **(right or {})}
+
+
 # ✅ 수정: 상태에 user_input 포함
 class State(TypedDict):
     user_input: str
+    jwt_token: str
+    extraction: dict
     location: list
     menu: list
     context: list
     candidates: dict          
     restaurant_details: dict  
+    ranked: dict
+    excluded: list            # 이 대화에서 이미 추천한 식당 ID (후속 요청에서 제외)
     result: dict
+    started_at: float
+    timings: Annotated[dict, merge_timings]
+
+
+def timed_node(name: str):
+    """
+    노드 실행 시간을 측정해서 state["timings"][name]에 기록하는 데코레이터.
+    병렬 브랜치 중 어느 쪽이 임계 경로인지 확인하는 용도입니다.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(state: State) -> dict:
+            start = time.perf_counter()
+            result = await func(state)
+            elapsed = time.perf_counter() - start
+            print(f"⏱️ {name}: {elapsed:.2f}초")
+            return {**result, "timings": {name: elapsed}}
+        return wrapper
+    return decorator
+
+
+# 장소/메뉴/상황 키워드를 한 번의 LLM 호출로 추출한 뒤 세 브랜치로 나눠 보냅니다.
+@timed_node("extract_node")
+async def extract_node(state: State) -> dict:
+    extraction = await extract_tool(state["user_input"])
+    return {"extraction": extraction, "started_at": time.perf_counter()}
 
-# ✅ 각 노드에서 user_input을 다음 상태로 명시적으로 넘겨줘야 함
+# 병렬 브랜치(location/menu/context)는 같은 step에서 실행되므로
+# user_input처럼 공유 키를 다시 쓰면 충돌이 납니다. 각자 자기 키만 반환합니다.
+@timed_node("location_node")
 async def location_node(state: State) -> dict:
-    location = await get_location_tool(state["user_input"])
-    return {
-        "location": location,
-        "user_input": state["user_input"]
-    }
+    location = await get_location_tool(state["extraction"])
+    return {"location": location}
 
+@timed_node("menu_node")
 async def menu_node(state: State) -> dict:
-    menu = await get_menu_tool(state["user_input"])
-    return {
-        "menu": menu,
-        "user_input": state["user_input"]
-    }
+    menu = await get_menu_tool(state["extraction"])
+    return {"menu": menu}
 
+@timed_node("context_node")
 async def context_node(state: State) -> dict:
-    context = await get_context_tool(state["user_input"])
-    return {
-        "context": context,
-        "user_input": state["user_input"]
-    }
+    context = await get_context_tool(state["extraction"])
+    return {"context": context}
 
 async def intersection_node(state: State) -> dict:
+    timings = state.get("timings") or {}
+    branches = {k: v for k, v in timings.items() if k in ("location_node", "menu_node", "context_node")}
+    if branches:
+        critical = max(branches, key=branches.get)
+        print(f"🧭 임계 경로: {critical} ({branches[critical]:.2f}초)")
+    if state.get("started_at"):
+        print(f"⏱️ 병렬 브랜치 전체: {time.perf_counter() - state['started_at']:.2f}초")
+
     candidates = intersection_restaurant(
         state["location"],
         state["menu"],
-        state["context"]
+        state["context"],
+        exclude=state.get("excluded"),
+        location_requested=bool((state.get("extraction") or {}).get("location")),
     )
     return {"candidates": candidates}
 
 
 async def detail_node(state: State) -> dict:
-    details = get_restaurant_info(state["candidates"])
+    details = await get_restaurant_info(state["candidates"])
     return {"restaurant_details": details}
 
+async def rank_node(state: State) -> dict:
+    location = state.get("location") or {}
+    context = state.get("context") or {}
+    excluded = state.get("excluded") or []
+    ranked = rank_restaurants(
+        state["restaurant_details"], state.get("extraction"), location.get("center"), context.get("scores"),
+        exclude=excluded,
+    )
+    shown = [r.get("placeId") for r in ranked.get("restaurants") or [] if isinstance(r, dict)]
+    return {"ranked": ranked, "excluded": excluded + shown}
+
+# 후보가 하나도 남지 않았을 때(이전 추천에서 모두 제외, 위치 조회 실패 등) LLM을 부르지 않고 돌려주는 결과
+NO_MORE_RESTAURANTS = "조건에 맞는 식당을 더 찾지 못했어요. 다른 장소나 메뉴로 다시 요청해 주세요."
+
+
+def _has_ranked(state: dict) -> bool:
+    return bool((state.get("ranked") or {}).get("restaurants"))
+
+
 async def final_node(state: State) -> dict:
-    result = await final_recommend(state["restaurant_details"], state["user_input"])
+    if not _has_ranked(state):
+        print("ℹ️ 추천할 식당이 없어 최종 추천을 건너뜀")
+        return {"result": NO_MORE_RESTAURANTS}
+    keywords = extraction_keywords(state.get("extraction"))
+    result = await final_recommend(state["ranked"], state["user_input"], keywords)
     print("📦 final_node result:", result)
     return {"result": result}
 
 
 # LangGraph 설정
-graph_builder = StateGraph(State)
+def build_graph(entry_node: str = "extract_node", include_final: bool = True) -> StateGraph:
+    """
+    entry_node부터 시작하는 그래프를 만듭니다.
+    include_final=False면 rank_node에서 끝납니다. (스트리밍에서는 최종 추천을 그래프 밖에서 토큰 단위로 생성)
+    - extract_node / location_node: 전체 파이프라인 (restart도 새 입력에서 장소부터 다시 뽑아야 하므로 동일)
+    - menu_node: 새 입력에서 메뉴만 다시 추출하고, 기존 location/context 결과는 state에서 재사용
+    - intersection_node: 추출/검색 없이 기존 후보로 교집합부터 다시 실행
+    - rank_node: 이미 가져온 상세 정보에서 추천하지 않은 식당만 다시 순위를 매겨 최종 추천
+    """
+    builder = StateGraph(State)
+
+    builder.add_node("rank_node", rank_node)
+    if entry_node != "rank_node":
+        builder.add_node("intersection_node", intersection_node)
+        builder.add_node("detail_node", detail_node)
+        builder.add_edge("intersection_node", "detail_node")
+        builder.add_edge("detail_node", "rank_node")
+    if include_final:
+        builder.add_node("final_node", final_node)
+        builder.add_edge("rank_node", "final_node")
+        builder.add_edge("final_node", END)
+    else:
+        builder.add_edge("rank_node", END)
+
+    if entry_node in ("extract_node", "location_node"):
+        builder.add_node("extract_node", extract_node)
+        builder.add_node("location_node", location_node)
+        builder.add_node("menu_node", menu_node)
+        builder.add_node("context_node", context_node)
+
+        # location/menu/context는 서로 의존하지 않으므로 extract_node에서 동시에 출발해
+        # intersection_node에서 세 브랜치가 모두 끝날 때까지 기다렸다가 합칩니다.
+        builder.set_entry_point("extract_node")
+        builder.add_edge("extract_node", "location_node")
+        builder.add_edge("extract_node", "menu_node")
+        builder.add_edge("extract_node", "context_node")
+        builder.add_edge(["location_node", "menu_node", "context_node"], "intersection_node")
+    elif entry_node == "menu_node":
+        builder.add_node("extract_node", extract_node)
+        builder.add_node("menu_node", menu_node)
+
+        builder.set_entry_point("extract_node")
+        builder.add_edge("extract_node", "menu_node")
+        builder.add_edge("menu_node", "intersection_node")
+    elif entry_node == "intersection_node":
+        builder.set_entry_point("intersection_node")
+    elif entry_node == "rank_node":
+        builder.set_entry_point("rank_node")
+    else:
+        raise ValueError(f"지원하지 않는 시작 노드: {entry_node}")
+
+    return builder
+
+
+graph_builder = build_graph()
+
+# 그래프는 모듈 로드 시 한 번만 컴파일하고, 후속 요청용 시작 노드별 그래프도 미리 만들어 둡니다.
+_full_graph = graph_builder.compile()
+COMPILED_GRAPHS = {
+    "extract_node": _full_graph,
+    "location_node": _full_graph,
+    "menu_node": build_graph("menu_node").compile(),
+    "intersection_node": build_graph("intersection_node").compile(),
+    "rank_node": build_graph("rank_node").compile(),
+}
+STREAMING_GRAPH = build_graph(include_final=False).compile()
 
-graph_builder.add_node("location_node", location_node)
-graph_builder.add_node("menu_node", menu_node)
-graph_builder.add_node("context_node", context_node)
-graph_builder.add_node("intersection_node", intersection_node)
-graph_builder.add_node("detail_node", detail_node)
-graph_builder.add_node("final_node", final_node)
 
+def get_compiled_graph(entry_node: str = "extract_node"):
+    if entry_node not in COMPILED_GRAPHS:
+        raise ValueError(f"지원하지 않는 시작 노드: {entry_node}")
+    return COMPILED_GRAPHS[entry_node]
 
-graph_builder.set_entry_point("location_node")
-graph_builder.add_edge("location_node", "menu_node")
-graph_builder.add_edge("menu_node", "context_node")
-graph_builder.add_edge("context_node", "intersection_node")
-graph_builder.add_edge("intersection_node", "detail_node")
-graph_builder.add_edge("detail_node", "final_node")
-graph_builder.add_edge("final_node", END)
+
+def resume_entry_node(next_node: str, state: dict) -> str:
+    """
+    next_tool이 고른 시작 노드를 세션에 남은 state로 실행할 수 있는지 확인하고, 부족하면 앞 단계로 물립니다.
+    rank_node → (남은 후보 없음) intersection_node → (검색 결과 없음) extract_node
+    """
+    if next_node == "rank_node":
+        details = (state.get("restaurant_details") or {}).get("restaurants") or []
+        excluded = set(state.get("excluded") or [])
+        if any(isinstance(r, dict) and r.get("placeId") not in excluded for r in details):
+            return "rank_node"
+        next_node = "intersection_node"
+    if next_node == "intersection_node" and not all(k in state for k in ("location", "menu", "context")):
+        return "extract_node"
+    if next_node == "menu_node" and not all(k in state for k in ("location", "context")):
+        return "extract_node"
+    return next_node
 
 
 # 실행 함수 (인증 오류 처리 간소화)
 async def run_recommendation_pipeline(state: dict) -> dict:
-    graph = graph_builder.compile()
+    return await run_from_node(state, entry_node="extract_node")
+
+
+async def run_from_node(state: dict, entry_node: str) -> dict:
+    graph = get_compiled_graph(entry_node)
+    # state["jwt_token"]을 이 실행의 컨텍스트에 묶어서 모든 백엔드 호출이 같은 토큰을 쓰도록 함
+    reset_token = set_request_token(state.get("jwt_token"))
     try:
         result = await graph.ainvoke(state)
-        print(result)
+        print({k: v for k, v in result.items() if k != "jwt_token"})  # 토큰은 로그에 남기지 않음
         return result
     except RuntimeError as e: # 인증 실패 예외는 여기에서 처리 (상위 호출자에게 전달)
         print(f"\n❌ 애플리케이션 실행 실패: {e}")
         # 오류 메시지를 사용자에게 안내하고, 재로그인을 유도
         return {"error": f"Authentication required: {e}. Please log in manually."}
+    finally:
+        reset_request_token(reset_token)
 
 
-async def run_from_node(state: dict, entry_node: str) -> dict:
-    graph = graph_builder.compile()
+async def run_followup(session_state: dict, user_input: str, jwt_token: str = None):
+    """
+    세션에 저장된 state로 후속 요청을 실행합니다. (next_node, 결과 state)를 반환.
+    "다른 식당 추천해줘"는 rank_node부터 시작하므로 순위 매기기 + 최종 추천만 다시 실행됩니다.
+    """
+    # 로컬 분류기가 애매할 때만 Gemini를 부르고, 그 호출은 llm_scheduler를 거칩니다.
+    next_node = await next_tool(user_input)
+    if next_node == "end":
+        return next_node, None
+
+    next_node = resume_entry_node(next_node, session_state)
+    state = {} if next_node in ("extract_node", "location_node") else dict(session_state)
+    state.pop("result", None)
+    state["user_input"] = user_input
+    state["jwt_token"] = jwt_token
+    print(f"🔁 후속 요청 시작 노드: {next_node}")
+    return next_node, await run_from_node(state, entry_node=next_node)
+
+
+def _count_restaurants(value) -> int:
+    if isinstance(value, dict) and isinstance(value.get("restaurants"), list):
+        return len(value["restaurants"])
+    return 0
+
+
+def _progress_event(node: str, output: dict):
+    """그래프 노드 출력을 사용자에게 보여줄 진행 이벤트로 바꿉니다. 보여줄 게 없으면 None."""
+    if node == "extract_node":
+        return {"event": "extracted", "data": output.get("extraction", {})}
+    if node == "location_node":
+        location = output.get("location", {})
+        if "error" in location:
+            return {"event": "location_failed", "data": {"detail": location["error"]}}
+        return {"event": "location_resolved", "data": {"count": _count_restaurants(location)}}
+    if node in ("menu_node", "context_node"):
+        key = "menu" if node == "menu_node" else "context"
+        return {"event": f"{key}_filtered", "data": {"count": _count_restaurants(output.get(key))}}
+    if node == "intersection_node":
+        return {"event": "candidates_found", "data": {"count": _count_restaurants(output.get("candidates"))}}
+    if node == "detail_node":
+        return {"event": "details_loaded", "data": {"count": _count_restaurants(output.get("restaurant_details"))}}
+    if node == "rank_node":
+        return {"event": "ranked", "data": {"count": _count_restaurants(output.get("ranked"))}}
+    return None
+
+
+async def stream_recommendation_pipeline(state: dict, on_complete=None):
+    """
+    run_recommendation_pipeline의 스트리밍 버전.
+    노드가 끝날 때마다 진행 이벤트를 yield하고, 마지막 추천 문장은 Gemini가 만드는 대로 token 이벤트로 보냅니다.
+    이벤트 형식: {"event": 이름, "data": ...}
+    on_complete: 끝까지 성공했을 때 최종 state로 호출 (세션 저장용)
+    """
+    # StreamingResponse는 응답 전용 Task에서 이 제너레이터를 돌리므로 여기서 설정한 토큰은 이 요청에만 보입니다.
+    set_request_token(state.get("jwt_token"))
+    final_state = dict(state)
     try:
-        partial_graph = graph.with_config({"entry_point": entry_node})
-        result = await partial_graph.ainvoke(state)
-        return result
+        async for step in STREAMING_GRAPH.astream(state):
+            for node, output in step.items():
+                if not isinstance(output, dict):
+                    continue
+                final_state.update(output)
+                event = _progress_event(node, output)
+                if event:
+                    yield event
+
+        if not _has_ranked(final_state):
+            final_state["result"] = NO_MORE_RESTAURANTS
+            if on_complete:
+                on_complete(final_state)
+            yield {"event": "done", "data": {"result": NO_MORE_RESTAURANTS}}
+            return
+
+        result = ""
+        keywords = extraction_keywords(final_state.get("extraction"))
+        async for kind, payload in stream_final_recommend(final_state.get("ranked", {}), state["user_input"], keywords):
+            if kind == "analyses":
+                yield {"event": "analyses_done", "data": {"count": len(payload)}}
+            else:
+                result += payload
+                yield {"event": "token", "data": payload}
+        final_state["result"] = result
+        if on_complete:
+            on_complete(final_state)
+        yield {"event": "done", "data": {"result": result}}
     except RuntimeError as e:
         print(f"\n❌ 애플리케이션 실행 실패: {e}")
-        return {"error": f"Authentication required: {e}. Please log in manually."}
+        yield {"event": "error", "data": {"detail": f"Authentication required: {e}. Please log in manually."}}
 
 
 # 테스트 (자동 토큰 관리 로직 제거)
 async def main():
     # 초기 토큰 유효성 검사 및 갱신 로직 제거
-    # JWT_TOKEN은 이제 FastAPI 미들웨어에서 받아서 os.environ에 설정될 것으로 기대
-    # 즉, 이 스크립트 실행 전에는 JWT_TOKEN이 os.environ에 없어도 됩니다.
+    # FastAPI에서는 요청마다 state["jwt_token"]으로 토큰이 전달됩니다.
+    # CLI로 실행할 때는 state에 토큰이 없으므로 auth_context가 JWT_TOKEN 환경 변수를 대신 사용합니다.
 
     state = {"user_input": input("처음 요청을 입력하세요: ")}
 
@@ -140,13 +370,14 @@ async def main():
             if followup.lower() == "exit":
                 break
 
-            state["user_input"] = followup
-            next_node = next_tool(state)
+            next_node, state = await run_followup(state, followup)
             if next_node == "end":
                 break
-
-            state.pop("result", None)
-            state = await run_from_node(state, entry_node=next_node)
+            if "error" in state:
+                print("\n🚫 LangGraph 실행 중 인증 오류 발생. 프론트엔드에서 다시 로그인해주세요.")
+                break
+            print("\n📍 추천 결과:")
+            print(state.get("result"))
 
 
 if __name__ == "__main__":
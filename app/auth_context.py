@@ -0,0 +1,28 @@
+# app/auth_context.py
+
+import os
+from contextvars import ContextVar
+
+# 요청별 JWT 토큰 보관소
+# 예전에는 미들웨어가 os.environ["JWT_TOKEN"]에 토큰을 넣었는데, 프로세스 전역이라
+# 동시에 들어온 요청끼리 토큰이 섞일 수 있었습니다. ContextVar는 asyncio Task /
+# asyncio.to_thread 마다 복사되므로 요청 하나의 파이프라인 안에서만 보입니다.
+
+_request_token: ContextVar = ContextVar("jwt_token", default=None)
+
+
+def set_request_token(token: str):
+    """현재 컨텍스트에 토큰을 설정하고, reset_request_token에 넘길 토큰(Token 객체)을 반환합니다."""
+    return _request_token.set(token)
+
+
+def reset_request_token(reset_token):
+    _request_token.reset(reset_token)
+
+
+def get_request_token():
+    """
+    현재 요청의 JWT 토큰을 반환합니다.
+    FastAPI 밖(langGraphRunner.main 같은 CLI 실행)에서는 JWT_TOKEN 환경 변수를 대신 사용합니다.
+    """
+    return _request_token.get() or os.getenv("JWT_TOKEN")
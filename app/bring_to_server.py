@@ -3,14 +3,21 @@
 import requests
 import os
 import httpx
+from http_client import get_http_client
+from auth_context import get_request_token
+from config import load_env
 
-SPRING_SERVER = "http://localhost:8080" # 또는 배포 서버 주소
+load_env()
+
+SPRING_SERVER = os.getenv("SPRING_SERVER", "http://localhost:8080") # 또는 배포 서버 주소
+# 주변 식당/전체 식당 조회는 원래(get_nearby_restaurants_DB, findall_restaurants_DB)부터 배포 서버를 씀
+SPRING_DB_SERVER = os.getenv("SPRING_DB_SERVER", "http://mooin.shop:8080")
 
 def _make_authenticated_request(method, url, json_data=None, params=None):
     """
-    환경변수에서 JWT 토큰을 가져와 동기(sync) 요청을 보내는 헬퍼 함수
+    현재 요청의 JWT 토큰(auth_context)을 가져와 동기(sync) 요청을 보내는 헬퍼 함수
     """
-    current_access_token = os.getenv("JWT_TOKEN")
+    current_access_token = get_request_token()
     
     if not current_access_token:
         raise RuntimeError("인증 토큰이 없습니다. 로그인 상태를 확인하세요.")
@@ -37,29 +44,30 @@ def _make_authenticated_request(method, url, json_data=None, params=None):
 
 async def _make_async_authenticated_request(method, url, json_data=None, params=None):
     """
-    환경변수에서 JWT 토큰을 가져와 비동기(async) 요청을 보내는 헬퍼 함수
+    현재 요청의 JWT 토큰(auth_context)을 가져와 비동기(async) 요청을 보내는 헬퍼 함수
     """
-    current_access_token = os.getenv("JWT_TOKEN")
+    current_access_token = get_request_token()
     if not current_access_token:
         raise RuntimeError("인증 토큰이 없습니다. 로그인 상태를 확인하세요.")
 
     headers = {"Authorization": f"Bearer {current_access_token}", "Content-Type": "application/json"}
     
-    async with httpx.AsyncClient() as client:
-        try:
-            if method.upper() == "GET":
-                response = await client.get(url, headers=headers, params=params, timeout=15)
-            elif method.upper() == "POST":
-                 response = await client.post(url, json=json_data, headers=headers, params=params, timeout=15)
-            else:
-                 raise ValueError(f"지원하지 않는 HTTP 메소드: {method}")
-            
-            response.raise_for_status()
-            return response
-        except httpx.RequestError as e:
-            if e.response is not None and e.response.status_code == 401:
-                raise RuntimeError(f"인증에 실패했습니다(401). 토큰이 만료되었거나 유효하지 않습니다.")
-            raise e
+    client = get_http_client()  # FastAPI lifespan에서 만든 공유 커넥션 풀
+    try:
+        if method.upper() == "GET":
+            response = await client.get(url, headers=headers, params=params)
+        elif method.upper() == "POST":
+             response = await client.post(url, json=json_data, headers=headers, params=params)
+        else:
+             raise ValueError(f"지원하지 않는 HTTP 메소드: {method}")
+        
+        response.raise_for_status()
+        return response
+    except httpx.HTTPStatusError as e:
+        # raise_for_status()는 RequestError가 아니라 HTTPStatusError를 던지므로 여기서 401을 잡아야 함
+        if e.response.status_code == 401:
+            raise RuntimeError(f"인증에 실패했습니다(401). 토큰이 만료되었거나 유효하지 않습니다.")
+        raise e
 
 # --- 실제 호출 함수들 ---
 
@@ -89,6 +97,36 @@ def bring_restaurants_list(placeIds: list):
     response = _make_authenticated_request("POST", url, json_data=placeIds)
     return {"restaurants": response.json()}
 
+# --- 비동기 버전 (그래프 노드처럼 async 코드에서 사용) ---
+# 동기 버전과 반환 형태가 같습니다. 동기 버전은 requests로 이벤트 루프를 최대 15초까지 막기 때문에
+# async def 안에서는 반드시 아래 함수들을 사용하세요.
+
+async def bring_nearby_restaurants_async(latitude: float, longitude: float, radius: int) -> dict:
+    url = f"{SPRING_DB_SERVER}/api/restaurants"
+    params = {"lat": latitude, "lng": longitude, "radius": radius}
+    response = await _make_async_authenticated_request("GET", url, params=params)
+    return {"restaurants": response.json()}
+
+async def bring_menu_filter_restaurants_async(keywords: list):
+    url = f"{SPRING_SERVER}/api/restaurants/filter/menu"
+    response = await _make_async_authenticated_request("POST", url, json_data={"keywords": keywords})
+    return {"restaurants": response.json()}
+
+async def bring_context_filter_restaurants_async(contexts: list):
+    url = f"{SPRING_SERVER}/api/restaurants/filter/context"
+    response = await _make_async_authenticated_request("POST", url, json_data={"keywords": contexts})
+    return {"restaurants": response.json()}
+
+async def bring_rating_count_async(placeIds: list):
+    url = f"{SPRING_SERVER}/api/restaurants/ratingAndCount"
+    response = await _make_async_authenticated_request("POST", url, json_data=placeIds)
+    return {"restaurants": response.json()}
+
+async def bring_restaurants_list_async(placeIds: list):
+    url = f"{SPRING_SERVER}/api/restaurants/restaurants"
+    response = await _make_async_authenticated_request("POST", url, json_data=placeIds)
+    return {"restaurants": response.json()}
+
 async def get_menu_texts(place_id: int) -> list:
     url = f"{SPRING_SERVER}/api/restaurants/{place_id}/menus"
     response = await _make_async_authenticated_request("GET", url)
@@ -0,0 +1,62 @@
+# app/config.py
+
+import os
+import threading
+from dotenv import load_dotenv
+
+# .env 로드를 한 곳으로 모은 모듈
+# 예전에는 main.py(app/.env), agent_config.py(프로젝트 루트 .env), 그 밖의 모듈(load_dotenv() 자동 탐색)이
+# 각자 .env를 읽었습니다. 이제 모든 모듈이 load_env()를 부르고, 실제 로드는 프로세스에서 한 번만 일어납니다.
+# 모듈 상수(os.getenv(...))가 .env 값을 보도록, 환경 변수를 읽는 모듈은 import 직후 load_env()를 호출합니다.
+
+APP_DIR = os.path.abspath(os.path.dirname(__file__))
+ENV_CANDIDATES = [
+    os.path.join(APP_DIR, ".env"),
+    os.path.join(APP_DIR, "..", ".env"),
+]
+
+_loaded = None
+_lock = threading.Lock()
+
+
+def load_env():
+    """
+    ENV_FILE → app/.env → 프로젝트 루트 .env 순서로 있는 파일을 모두 로드합니다.
+    override=False라서 이미 설정된 환경 변수와 앞쪽 파일의 값이 우선이고, 뒤쪽 파일은 빠진 키만 채웁니다.
+    (빈 app/.env가 있어도 루트 .env의 GOOGLE_API_KEY, JWT_TOKEN 등을 그대로 읽음)
+    """
+    global _loaded
+    if _loaded is not None:
+        return _loaded
+    with _lock:
+        if _loaded is None:
+            loaded = []
+            for path in [os.getenv("ENV_FILE")] + ENV_CANDIDATES:
+                if not path or not os.path.isfile(path):
+                    continue
+                path = os.path.abspath(path)
+                if path in loaded:
+                    continue
+                load_dotenv(dotenv_path=path, override=False)
+                loaded.append(path)
+                print(f".env loaded: {path}")
+            _loaded = loaded
+    return _loaded
+
+
+def get_service_token() -> str:
+    """
+    사용자 요청 밖에서 Spring을 부를 때 쓰는 서비스 토큰 (SPRING_SERVICE_TOKEN).
+    lifespan의 카탈로그 갱신, 오프라인 색인/태깅 스크립트처럼 요청별 JWT(auth_context)가 없는 곳에서 씁니다.
+    설정되지 않았으면 "Bearer None"으로 보내지 않고 바로 RuntimeError를 냅니다.
+    """
+    load_env()
+    token = os.getenv("SPRING_SERVICE_TOKEN")
+    if not token:
+        raise RuntimeError("SPRING_SERVICE_TOKEN이 설정되지 않았습니다. (.env 또는 환경 변수에 Spring 서비스 계정 토큰을 넣어주세요)")
+    return token
+
+
+def place_id_of(r) -> int:
+    """Spring 식당 목록 항목 → placeId. 목록이 {"placeId": ...} dict이거나 ID 숫자 그대로인 두 형태를 모두 받습니다."""
+    return int(r["placeId"]) if isinstance(r, dict) else int(r)
@@ -0,0 +1,51 @@
+import os
+import sys
+import asyncio
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from config import load_env
+
+load_env()
+
+from service.menu_index import append_menu_log, append_build_marker, MENU_INDEX_LOG
+from service.saveRestaurant_pipeline import load_catalog_ids
+from bring_to_server import get_menu_texts
+from http_client import close_http_client
+
+# 이미 Spring에 저장된 식당 메뉴로 메뉴 역색인 로그(MENU_INDEX_LOG)를 처음 채우는 스크립트
+# 이후 새로 크롤링되는 식당은 업로더(data/uploader.py)가 직접 로그에 추가합니다.
+# 서버는 이 스크립트가 끝까지 돌아 남긴 완료 표시를 본 뒤에만 로컬 인덱스를 씁니다. (같은 파일 시스템에서 실행)
+# 실행: python data/build_menu_index.py
+
+CONCURRENCY = 16
+
+
+async def main():
+    place_ids = await load_catalog_ids()
+    if place_ids is None:
+        return
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def fetch(place_id):
+        async with semaphore:
+            try:
+                menus = await get_menu_texts(place_id)
+                append_menu_log(place_id, menus)
+                return True
+            except Exception as e:
+                print(f"[{place_id}] ❌ 메뉴 조회 실패: {e}")
+                return False
+
+    results = await asyncio.gather(*[fetch(pid) for pid in place_ids])
+    # 완료 표시: 서버는 이 커버리지가 MENU_INDEX_MIN_COVERAGE 이상일 때만 로컬 인덱스를 사용
+    append_build_marker(len(place_ids), sum(results))
+    print(f"✅ {sum(results)}/{len(place_ids)}곳 메뉴를 {MENU_INDEX_LOG}에 기록")
+
+
+if __name__ == "__main__":
+    async def run():
+        try:
+            await main()
+        finally:
+            await close_http_client()
+
+    asyncio.run(run())
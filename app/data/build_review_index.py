@@ -0,0 +1,42 @@
+import os
+import sys
+import asyncio
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from config import load_env, place_id_of
+
+load_env()
+
+from service.review_index import build_review_index, REVIEW_INDEX_DIR
+from service.saveRestaurant_pipeline import load_catalog_ids
+from bring_to_server import bring_restaurants_list_async
+from http_client import close_http_client
+
+# 크롤링된 리뷰로 BM25 상황/분위기 색인을 만드는 오프라인 스크립트
+# 실행: python data/build_review_index.py  (서버는 재시작 시 새 색인을 mmap으로 읽음)
+
+DETAIL_BATCH_SIZE = 50
+
+
+async def main():
+    place_ids = await load_catalog_ids()
+    if place_ids is None:
+        return
+    documents = {}
+    for i in range(0, len(place_ids), DETAIL_BATCH_SIZE):
+        batch = place_ids[i:i + DETAIL_BATCH_SIZE]
+        details = await bring_restaurants_list_async(batch)
+        for r in details.get("restaurants") or []:
+            documents[place_id_of(r)] = [rev.get("text", "") for rev in r.get("reviews") or []]
+        print(f"[{min(i + DETAIL_BATCH_SIZE, len(place_ids))}/{len(place_ids)}] 리뷰 수집")
+
+    build_review_index(documents, REVIEW_INDEX_DIR)
+
+
+if __name__ == "__main__":
+    async def run():
+        try:
+            await main()
+        finally:
+            await close_http_client()
+
+    asyncio.run(run())
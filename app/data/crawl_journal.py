@@ -0,0 +1,83 @@
+import os
+import time
+import sqlite3
+
+# 크롤링 진행 상황 저널 (SQLite)
+# 식당별 상태(done / registered / failed)와 마지막 시도 시각을 남겨서, 중단 후 다시 실행하면
+# 끝난 식당은 네트워크 호출 없이 건너뜁니다. 서버에 이미 있는 식당은 처음 한 번 전체 ID를 받아 done으로 채웁니다.
+# - done       : 식당 등록 + 평점/후기/메뉴 전송까지 완료 (또는 서버에 이미 있음)
+# - registered : 식당은 등록했지만 후기/메뉴 수집 실패 → 다음 실행에서 등록은 건너뛰고 수집만 재시도
+# - failed     : 등록 전에 실패 → 다음 실행에서 처음부터 재시도
+# 저널은 save_data의 메인 프로세스만 씁니다. (수집 단계는 결과만 넘겨줌)
+
+CRAWL_JOURNAL_PATH = os.getenv(
+    "CRAWL_JOURNAL_PATH",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "cache", "crawl_journal.sqlite3")),
+)
+CRAWL_MAX_ATTEMPTS = int(os.getenv("CRAWL_MAX_ATTEMPTS", 3))
+
+
+class CrawlJournal:
+    def __init__(self, path: str = CRAWL_JOURNAL_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS crawl_journal (
+                place_id INTEGER PRIMARY KEY,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_crawled REAL NOT NULL,
+                error TEXT
+            )
+        """)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS journal_meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.commit()
+
+    def seeded_at(self):
+        row = self._conn.execute("SELECT value FROM journal_meta WHERE key = 'seeded_at'").fetchone()
+        return float(row[0]) if row else None
+
+    def seed_existing(self, place_ids) -> int:
+        """서버에 이미 있는 식당을 done으로 기록합니다. (이미 저널에 있는 식당은 그대로 둠)"""
+        now = time.time()
+        with self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO crawl_journal (place_id, status, attempts, last_crawled) VALUES (?, 'done', 0, ?)",
+                ((int(pid), now) for pid in place_ids),
+            )
+            added = self._conn.total_changes - before
+            self._conn.execute(
+                "INSERT OR REPLACE INTO journal_meta (key, value) VALUES ('seeded_at', ?)", (str(now),)
+            )
+        return added
+
+    def snapshot(self) -> dict:
+        """
+        {place_id: (상태, 시도 횟수)} 전체. 파이프라인의 중복 제거 단계가 한 번 읽어서
+        done이거나 시도 횟수가 CRAWL_MAX_ATTEMPTS 이상인 식당을 건너뜁니다.
+        """
+        rows = self._conn.execute("SELECT place_id, status, attempts FROM crawl_journal").fetchall()
+        return {pid: (status, attempts) for pid, status, attempts in rows}
+
+    def record(self, place_id: int, status: str, error: str = None):
+        with self._conn:
+            self._conn.execute(
+                """INSERT INTO crawl_journal (place_id, status, attempts, last_crawled, error)
+                   VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(place_id) DO UPDATE SET
+                       status = excluded.status,
+                       attempts = CASE WHEN excluded.status = 'done' THEN crawl_journal.attempts
+                                       ELSE crawl_journal.attempts + 1 END,
+                       last_crawled = excluded.last_crawled,
+                       error = excluded.error""",
+                (int(place_id), status, 0 if status == "done" else 1, time.time(), error),
+            )
+
+    def counts(self) -> dict:
+        return dict(self._conn.execute("SELECT status, COUNT(*) FROM crawl_journal GROUP BY status").fetchall())
+
+    def close(self):
+        self._conn.close()
@@ -3,23 +3,96 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import WebDriverException
 
-from send_to_server import send_restaurant_rating, send_reviews, send_menus
-
+import os
 import time
+from multiprocessing import util
+
+# 크롤링에 필요 없는 리소스(이미지, 폰트, CSS)는 받지 않음. 텍스트/DOM만 있으면 충분합니다.
+CRAWL_BLOCK_RESOURCES = os.getenv("CRAWL_BLOCK_RESOURCES", "true").lower() in ("1", "true", "yes")
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.css",
+]
+# 드라이버 하나로 처리할 최대 식당 수. 넘으면 Chrome을 새로 띄움 (메모리 누수/탭 찌꺼기 정리)
+CRAWL_DRIVER_MAX_PAGES = int(os.getenv("CRAWL_DRIVER_MAX_PAGES", 200))
 
 def init_driver():
     options = Options()
     options.add_argument("--headless=new")  # Headless 모드
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
+    if CRAWL_BLOCK_RESOURCES:
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
     return webdriver.Chrome(options=options)
 
+def _block_resources(driver):
+    # Network.setBlockedURLs는 탭(target)마다 적용되므로 새 탭을 열 때마다 호출
+    if not CRAWL_BLOCK_RESOURCES:
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    except WebDriverException as e:
+        print(f"⚠️ 리소스 차단 설정 실패: {e}")
+
+
+class WorkerDriver:
+    """
+    크롤링 워커 프로세스 하나가 계속 재사용하는 Chrome 드라이버.
+    식당마다 Chrome을 새로 띄우지 않고, max_pages마다 또는 드라이버가 죽었을 때만 다시 띄웁니다.
+    """
+    def __init__(self, max_pages: int = CRAWL_DRIVER_MAX_PAGES):
+        self.max_pages = max_pages
+        self.driver = None
+        self.pages = 0
+        self.launches = 0
+        self._finalizer = None
+
+    def _alive(self) -> bool:
+        try:
+            self.driver.window_handles
+            return True
+        except WebDriverException:
+            return False
+
+    def acquire(self):
+        if self.driver is not None and (self.pages >= self.max_pages or not self._alive()):
+            self.discard()
+        if self.driver is None:
+            self.driver = init_driver()
+            self.pages = 0
+            self.launches += 1
+            if self._finalizer is None:
+                # Pool 워커가 정상 종료될 때 Chrome도 같이 종료
+                self._finalizer = util.Finalize(None, self.discard, exitpriority=10)
+        self.pages += 1
+        return self.driver
+
+    def discard(self):
+        if self.driver is None:
+            return
+        try:
+            self.driver.quit()
+        except Exception as e:
+            print(f"⚠️ 드라이버 종료 중 오류: {e}")
+        self.driver = None
+
+
 def crawl_review(driver ,url: str, place_id: int):
+    """
+    장소 페이지에서 평점/후기 수/후기/메뉴를 수집합니다. 서버 전송은 하지 않고 결과 dict를 반환 (실패하면 None)
+    업로드는 save_data가 data/uploader.py로 배치 처리합니다.
+    """
     try:
-        # 새 탭 열기
-        driver.execute_script("window.open(arguments[0]);", url)
+        # 빈 탭을 열고 리소스 차단을 건 뒤 페이지 이동
+        driver.execute_script("window.open('about:blank');")
         driver.switch_to.window(driver.window_handles[-1])
+        _block_resources(driver)
+        driver.get(url)
 
         wait = WebDriverWait(driver, 10)
 
@@ -86,13 +159,11 @@ def crawl_review(driver ,url: str, place_id: int):
                 except:
                     continue
 
-        # 서버 전송
-        send_restaurant_rating(place_id, rating, review_count)
-        send_reviews(place_id, reviews)
-        send_menus(place_id, menus)
+        return {"rating": rating, "review_count": review_count, "reviews": reviews, "menus": menus}
 
     except Exception as e:
         print(f"[{place_id}] 오류 발생:", e)
+        return None
 
     finally:
         driver.close()  # 현재 탭 닫기
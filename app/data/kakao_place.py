@@ -0,0 +1,133 @@
+import os
+import sys
+import asyncio
+import httpx
+
+# 브라우저 없이 카카오 장소 페이지의 원본 JSON을 직접 받아 평점/후기 수/후기/메뉴를 뽑는 빠른 경로
+# 장소 페이지(place.map.kakao.com/{id})는 아래 JSON으로 화면을 그립니다.
+# - {BASE}/main/v/{place_id}                       : basicInfo(평점/후기 수), comment(첫 후기 페이지), menuInfo
+# - {BASE}/commentlist/v/{place_id}/{last_id}      : 다음 후기 페이지
+# 응답 구조가 예상과 다르면 KakaoPlaceParseError를 던지고, 호출하는 쪽에서 Selenium(crawl_review)으로 넘어갑니다.
+# KAKAO_PLACE_API_BASE를 로컬 스텁 서버 주소로 바꾸면 저장해 둔 응답으로 파서를 확인할 수 있습니다.
+
+KAKAO_PLACE_API_BASE = os.getenv("KAKAO_PLACE_API_BASE", "https://place.map.kakao.com").rstrip("/")
+# Selenium 경로가 스크롤 3번으로 읽던 만큼 (첫 페이지 + 추가 2페이지)
+KAKAO_PLACE_REVIEW_PAGES = int(os.getenv("KAKAO_PLACE_REVIEW_PAGES", 3))
+KAKAO_PLACE_TIMEOUT = float(os.getenv("KAKAO_PLACE_TIMEOUT", 5))
+MIN_REVIEW_LENGTH = 5   # crawl_review와 같은 기준
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Referer": "https://place.map.kakao.com/",
+    "Accept": "application/json",
+}
+
+
+class KakaoPlaceParseError(Exception):
+    pass
+
+
+def create_place_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        headers=HEADERS,
+        timeout=httpx.Timeout(KAKAO_PLACE_TIMEOUT),
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+    )
+
+
+# 응답 구조가 바뀌었을 때 파서에서 날 수 있는 예외. 모두 KakaoPlaceParseError로 바꿔서 Selenium으로 넘어가게 함
+PARSE_ERRORS = (KeyError, TypeError, AttributeError, ValueError)
+
+
+def parse_comments(comment: dict):
+    """comment 블록 → (후기 목록, 다음 페이지 여부, 마지막 commentid)"""
+    try:
+        return _parse_comments(comment)
+    except PARSE_ERRORS as e:
+        raise KakaoPlaceParseError(f"comment 형식 오류: {e!r}")
+
+
+def _parse_comments(comment: dict):
+    if not isinstance(comment, dict):
+        return [], False, None
+    items = comment.get("list") or []
+    reviews = []
+    for item in items:
+        text = (item.get("contents") or "").strip()
+        if len(text) >= MIN_REVIEW_LENGTH:
+            reviews.append({"text": text})
+    last_id = items[-1].get("commentid") if items else None
+    return reviews, bool(comment.get("hasNext")) and last_id is not None, last_id
+
+
+def parse_place(data: dict) -> dict:
+    """main/v 응답 → {"rating", "review_count", "reviews", "menus", "has_next", "last_comment_id"}"""
+    try:
+        return _parse_place(data)
+    except PARSE_ERRORS as e:
+        raise KakaoPlaceParseError(f"main 형식 오류: {e!r}")
+
+
+def _parse_place(data: dict) -> dict:
+    if not isinstance(data, dict) or not isinstance(data.get("basicInfo"), dict):
+        raise KakaoPlaceParseError("basicInfo 없음")
+
+    feedback = data["basicInfo"].get("feedback") or {}
+    score_sum = float(feedback.get("scoresum") or 0)
+    score_cnt = int(feedback.get("scorecnt") or 0)
+    review_count = int(feedback.get("comntcnt") or 0)
+    rating = round(score_sum / score_cnt, 1) if score_cnt else 0.0
+
+    menus = []
+    for item in (data.get("menuInfo") or {}).get("menuList") or []:
+        name = (item.get("menu") or "").strip()
+        if name:
+            menus.append({"name": name, "price": (item.get("price") or "").strip()})
+
+    reviews, has_next, last_id = parse_comments(data.get("comment"))
+    return {
+        "rating": rating,
+        "review_count": review_count,
+        "reviews": reviews,
+        "menus": menus,
+        "has_next": has_next,
+        "last_comment_id": last_id,
+    }
+
+
+async def fetch_place(client: httpx.AsyncClient, place_id: int, review_pages: int = KAKAO_PLACE_REVIEW_PAGES) -> dict:
+    """
+    평점/후기 수/후기/메뉴를 HTTP만으로 가져옵니다. crawl_review가 서버로 보내는 것과 같은 값.
+    HTTP 오류는 httpx 예외, 응답 구조 문제는 KakaoPlaceParseError.
+    """
+    response = await client.get(f"{KAKAO_PLACE_API_BASE}/main/v/{place_id}")
+    response.raise_for_status()
+    try:
+        place = parse_place(response.json())
+    except ValueError as e:   # JSON이 아닌 응답 (차단 페이지 등)
+        raise KakaoPlaceParseError(f"JSON 아님: {e}")
+
+    pages = 1
+    while place["has_next"] and pages < review_pages:
+        response = await client.get(f"{KAKAO_PLACE_API_BASE}/commentlist/v/{place_id}/{place['last_comment_id']}")
+        response.raise_for_status()
+        try:
+            reviews, has_next, last_id = parse_comments(response.json().get("comment"))
+        except (KakaoPlaceParseError,) + PARSE_ERRORS:
+            break   # 첫 페이지는 받았으므로 추가 후기만 포기
+        place["reviews"].extend(reviews)
+        place["has_next"], place["last_comment_id"] = has_next, last_id
+        pages += 1
+    return place
+
+
+if __name__ == "__main__":
+    # 실행: python data/kakao_place.py <place_id>  (KAKAO_PLACE_API_BASE로 스텁 서버 지정 가능)
+    async def run(place_id):
+        async with create_place_client() as client:
+            place = await fetch_place(client, place_id)
+            print(f"평점 {place['rating']}, 후기 {place['review_count']}개, 수집 후기 {len(place['reviews'])}개, 메뉴 {len(place['menus'])}개")
+            for menu in place["menus"][:5]:
+                print(" -", menu)
+
+    asyncio.run(run(int(sys.argv[1])))
@@ -1,27 +1,51 @@
-from get_review_by_selenium import crawl_review, init_driver
-from send_to_server import send_restaurant, restaurant_is_exist
+import os
+import time
+import httpx
 
-def process_restaurant(r):
+from get_review_by_selenium import crawl_review, WorkerDriver
+from kakao_place import fetch_place, KakaoPlaceParseError
+from selenium.common.exceptions import WebDriverException
+
+# save_data 파이프라인의 수집 단계가 쓰는 식당 단위 함수들
+# fast: 카카오 장소 JSON을 HTTP로 바로 받고, 실패할 때만 Selenium / selenium: 항상 브라우저로 크롤링
+# (save_data.py --selenium 플래그로도 바꿀 수 있음)
+CRAWL_MODE = os.getenv("CRAWL_MODE", "fast")
+
+# Chrome 워커 프로세스(ProcessPoolExecutor)마다 하나씩 생기는 드라이버 (모듈 전역은 프로세스별로 따로 존재)
+# 빠른 경로가 성공하는 동안에는 Chrome을 띄우지 않습니다.
+worker_driver = WorkerDriver()
+
+
+def restaurant_from_search(r: dict) -> dict:
+    """카카오 카테고리 검색 결과 한 건 → 서버에 등록할 식당 dict"""
+    return {
+        "place_id": int(r["id"]),
+        "name": r.get("place_name", ""),
+        "address": r.get("road_address_name"),
+        "url": r.get("place_url", ""),
+        "category": r.get("category_name", ""),
+        "latitude": r.get("y"),
+        "longitude": r.get("x")
+    }
+
+
+async def crawl_fast(client: httpx.AsyncClient, place_id: int):
+    """HTTP 빠른 경로. 수집 결과 dict, 파싱/HTTP 실패면 None (Selenium으로 넘김)"""
+    started = time.perf_counter()
+    try:
+        place = await fetch_place(client, place_id)
+    except (KakaoPlaceParseError, httpx.HTTPError) as e:
+        print(f"[{place_id}] ⚠️ 빠른 경로 실패, Selenium으로 전환: {e}")
+        return None
+    print(f"[{place_id}] ⚡ HTTP 수집 {time.perf_counter() - started:.2f}초 (후기 {len(place['reviews'])}, 메뉴 {len(place['menus'])})")
+    return {k: place[k] for k in ("rating", "review_count", "reviews", "menus")}
+
+
+def crawl_selenium(restaurant: dict):
+    """Chrome 워커 프로세스에서 실행. 수집 결과 dict 또는 None"""
+    driver = worker_driver.acquire()
     try:
-        place_id = int(r["id"])
-        if restaurant_is_exist(place_id):
-            return
-
-        restaurant = {
-            "place_id": place_id,
-            "name": r.get("place_name", ""),
-            "address": r.get("road_address_name"),
-            "url": r.get("place_url", ""),
-            "category": r.get("category_name", ""),
-            "latitude": r.get("y"),
-            "longitude": r.get("x")
-        }
-
-        send_restaurant(restaurant)
-
-        driver = init_driver()
-        crawl_review(driver, restaurant["url"], place_id)
-        driver.quit()
-
-    except Exception as e:
-        print(f"[{place_id}] ❌ 오류 발생: {e}")
+        return crawl_review(driver, restaurant["url"], restaurant["place_id"])
+    except WebDriverException:
+        worker_driver.discard()  # 브라우저가 죽었으면 다음 식당에서 새로 띄움
+        raise
@@ -2,12 +2,19 @@ import os
 import requests
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from dotenv import load_dotenv
-from multiprocessing import Pool
-from process_restaurant import process_restaurant
+from config import load_env
+from concurrent.futures import ProcessPoolExecutor
+from process_restaurant import CRAWL_MODE, restaurant_from_search, crawl_fast, crawl_selenium
+from kakao_place import create_place_client
+from crawl_journal import CrawlJournal, CRAWL_MAX_ATTEMPTS
+from uploader import CrawlUploader, UPLOAD_BATCH_SIZE
+from send_to_server import fetch_existing_place_ids, restaurant_is_exist
+import argparse
+import asyncio
+import time
 import json
 
-load_dotenv()
+load_env()
 KAKAO_API_KEY = os.getenv("KAKAO_API_KEY")
 
 LAT_START = 37.41992
@@ -55,31 +62,219 @@ def generate_coords():
         lat += STEP_LAT
     return coords
 
+# --- staged 크롤링 파이프라인 ---
+# discover(식당 목록) → dedupe(저널/중복 확인) → scrape(HTTP 빠른 경로, 실패 시 Chrome) → upload(배치 업로드)
+# 단계 사이는 크기가 정해진 asyncio.Queue라서 뒤 단계가 밀리면 앞 단계가 자동으로 기다립니다. (backpressure)
+# 단계마다 동시 실행 수를 따로 두고, 비싼 scrape 단계(특히 Chrome 프로세스)가 쉬지 않도록
+# 확인/업로드 같은 네트워크 대기는 다른 단계에서 겹쳐서 처리합니다.
+
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", 256))
+DISCOVER_CONCURRENCY = int(os.getenv("DISCOVER_CONCURRENCY", 4))
+DEDUPE_CONCURRENCY = int(os.getenv("DEDUPE_CONCURRENCY", 8))
+SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", 32))        # HTTP 빠른 경로 동시 요청 수
+CRAWL_BROWSER_WORKERS = int(os.getenv("CRAWL_BROWSER_WORKERS", 4))   # Chrome 워커 프로세스 수
+UPLOAD_FLUSH_SEC = float(os.getenv("UPLOAD_FLUSH_SEC", 5))
+PIPELINE_STATS_SEC = float(os.getenv("PIPELINE_STATS_SEC", 10))
+
+_STOP = object()
+
+
+class StageStats:
+    def __init__(self, name: str, inbox: asyncio.Queue = None):
+        self.name = name
+        self.inbox = inbox
+        self.done = 0
+        self.dropped = 0
+        self.busy = 0
+        self.started = time.perf_counter()
+
+    def line(self) -> str:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        depth = self.inbox.qsize() if self.inbox is not None else "-"
+        return f"{self.name} q={depth} busy={self.busy} done={self.done} drop={self.dropped} ({self.done / elapsed:.1f}/s)"
+
+
+async def run_stage(stats: StageStats, handle, concurrency: int, inbox: asyncio.Queue, outbox: asyncio.Queue):
+    """
+    inbox에서 하나씩 꺼내 handle(item)을 실행하고, None이 아닌 결과를 outbox에 넣습니다.
+    앞 단계가 끝나면 _STOP이 들어오고, 모든 워커가 끝나면 다음 단계에 _STOP을 넘깁니다.
+    """
+    async def worker():
+        while True:
+            item = await inbox.get()
+            if item is _STOP:
+                await inbox.put(_STOP)   # 같은 단계의 다른 워커도 멈추도록 다시 넣어둠
+                return
+            stats.busy += 1
+            try:
+                result = await handle(item)
+            except Exception as e:
+                print(f"[{stats.name}] ❌ 처리 실패: {e}")
+                result = None
+            finally:
+                stats.busy -= 1
+            if result is None:
+                stats.dropped += 1
+            else:
+                stats.done += 1
+                await outbox.put(result)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    await outbox.put(_STOP)
+
+
+async def discover_from_file(path: str, outbox: asyncio.Queue, stats: StageStats):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                await outbox.put(json.loads(line))
+                stats.done += 1
+    await outbox.put(_STOP)
+
+
+async def discover_from_kakao(outbox: asyncio.Queue, stats: StageStats):
+    # 좌표 격자마다 카카오 카테고리 검색 (requests 기반이라 스레드에서 실행)
+    coords = asyncio.Queue()
+    for coord in generate_coords():
+        coords.put_nowait(coord)
+    coords.put_nowait(_STOP)
+
+    async def search(coord):
+        lat, lng = coord
+        return await asyncio.to_thread(search_restaurants_by_kakaomap, longitude=lng, latitude=lat)
+
+    found = asyncio.Queue(maxsize=DISCOVER_CONCURRENCY * 2)
+    producer = asyncio.create_task(run_stage(StageStats("search"), search, DISCOVER_CONCURRENCY, coords, found))
+    while True:
+        results = await found.get()
+        if results is _STOP:
+            break
+        for r in results:
+            await outbox.put(r)
+            stats.done += 1
+    await producer
+    await outbox.put(_STOP)
+
+
+async def run_pipeline(args):
+    journal = CrawlJournal()
+    check_exists = False
+    if args.reseed or journal.seeded_at() is None:
+        try:
+            added = journal.seed_existing(await asyncio.to_thread(fetch_existing_place_ids))
+            print(f"🗂️ 서버 식당 {added}곳을 저널에 기록")
+        except Exception as e:
+            print(f"⚠️ 서버 식당 목록 조회 실패, 식당별 존재 확인으로 진행: {e}")
+            check_exists = True
+    known = journal.snapshot()
+    seen = set()
+
+    discovered = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    to_scrape = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    to_upload = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+
+    discover_stats = StageStats("discover")
+    dedupe_stats = StageStats("dedupe", discovered)
+    scrape_stats = StageStats("scrape", to_scrape)
+    upload_stats = StageStats("upload", to_upload)
+
+    async def dedupe(r):
+        place_id = int(r["id"])
+        if place_id in seen:
+            return None
+        seen.add(place_id)
+        status, attempts = known.get(place_id, (None, 0))
+        if status == "done" or attempts >= CRAWL_MAX_ATTEMPTS:
+            return None
+        if check_exists and await asyncio.to_thread(restaurant_is_exist, place_id):
+            journal.record(place_id, "done")
+            return None
+        return restaurant_from_search(r), status == "registered"
+
+    loop = asyncio.get_running_loop()
+    place_client = create_place_client()
+    browsers = ProcessPoolExecutor(max_workers=CRAWL_BROWSER_WORKERS)
+
+    async def scrape(item):
+        restaurant, registered = item
+        place_id = restaurant["place_id"]
+        crawled, error = None, None
+        if not args.selenium:
+            crawled = await crawl_fast(place_client, place_id)
+        if crawled is None:
+            try:
+                crawled = await loop.run_in_executor(browsers, crawl_selenium, restaurant)
+            except Exception as e:
+                error = str(e)
+        return {
+            "place_id": place_id,
+            "restaurant": None if registered else restaurant,
+            "crawled": crawled,
+            "error": error,
+        }
+
+    uploader = CrawlUploader()
+
+    async def upload():
+        # 배치가 차거나 UPLOAD_FLUSH_SEC 동안 새 항목이 없으면 올림. 업로드는 스레드에서 돌고 그동안 scrape는 계속 진행
+        batch, stopping = [], False
+        while not stopping:
+            idle = False
+            try:
+                item = await asyncio.wait_for(to_upload.get(), timeout=UPLOAD_FLUSH_SEC)
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+            except asyncio.TimeoutError:
+                idle = True
+            if batch and (stopping or idle or len(batch) >= UPLOAD_BATCH_SIZE):
+                upload_stats.busy = len(batch)
+                results = await asyncio.to_thread(uploader.upload_batch, batch)
+                upload_stats.busy = 0
+                for place_id, status, error in results:
+                    journal.record(place_id, status, error)
+                    if status == "done":
+                        upload_stats.done += 1
+                    else:
+                        upload_stats.dropped += 1
+                batch = []
+
+    async def report():
+        while True:
+            await asyncio.sleep(PIPELINE_STATS_SEC)
+            stages = (discover_stats, dedupe_stats, scrape_stats, upload_stats)
+            print("📊 " + " | ".join(s.line() for s in stages))
+
+    if args.discover:
+        discover = discover_from_kakao(discovered, discover_stats)
+    else:
+        discover = discover_from_file(args.input, discovered, discover_stats)
+
+    started = time.perf_counter()
+    reporter = asyncio.create_task(report())
+    try:
+        await asyncio.gather(
+            discover,
+            run_stage(dedupe_stats, dedupe, DEDUPE_CONCURRENCY, discovered, to_scrape),
+            run_stage(scrape_stats, scrape, SCRAPE_CONCURRENCY, to_scrape, to_upload),
+            upload(),
+        )
+    finally:
+        reporter.cancel()
+        await place_client.aclose()
+        browsers.shutdown(wait=True)
+        uploader.close()
+    print("📊 " + " | ".join(s.line() for s in (discover_stats, dedupe_stats, scrape_stats, upload_stats)))
+    print(f"크롤링 완료: {time.perf_counter() - started:.1f}초, 저널 {journal.counts()}")
+    journal.close()
+
+
 if __name__ == "__main__":
-    #coords = generate_coords()
-
-    #all_results = []
-    #count = 1
-    # for lat, lng in coords:
-    #     results = search_restaurants_by_kakaomap(longitude=lng, latitude=lat)
-    #     print(count)
-    #     count+=1
-    #     all_results.extend(results)
-
-    # 중복 제거
-    #unique_restaurants = list({int(r["id"]): r for r in all_results}.values())
-    #print(f"📌 총 식당 수: {len(unique_restaurants)}")
-    # with open("backup_restaurants.jsonl", "w", encoding="utf-8") as f:
-    #     for r in unique_restaurants:
-    #         f.write(json.dumps(r, ensure_ascii=False) + "\n")
-    
-    
-    with open("backup_restaurants.jsonl", "r", encoding="utf-8") as f:
-        unique_restaurants = [json.loads(line.strip()) for line in f]
-    total = len(unique_restaurants)
-    print(f"📦 처리할 식당 수: {len(unique_restaurants)}")
-    
-    with Pool(processes=8) as pool:
-        for i, result in enumerate(pool.imap_unordered(process_restaurant, unique_restaurants), 1):
-             print(f"[{i}/{total}] {result}")
-    print("크롤링 완료")
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input", default="backup_restaurants.jsonl", help="식당 목록 JSONL (카카오 검색 결과)")
+    parser.add_argument("--discover", action="store_true", help="파일 대신 좌표 격자로 카카오 검색부터 실행")
+    parser.add_argument("--selenium", action="store_true", default=CRAWL_MODE == "selenium",
+                        help="HTTP 빠른 경로 없이 항상 Chrome으로 수집 (기본값: CRAWL_MODE=selenium)")
+    parser.add_argument("--reseed", action="store_true", help="서버의 식당 ID 목록으로 저널을 다시 채움")
+    asyncio.run(run_pipeline(parser.parse_args()))
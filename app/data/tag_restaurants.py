@@ -0,0 +1,106 @@
+import os
+import re
+import sys
+import json
+import time
+import asyncio
+import argparse
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from config import load_env, place_id_of
+
+load_env()
+
+from service.prompt import build_context_prompt, CONTEXT_PROMPT_VERSION
+from service.context_tags import context_tag_store
+from service.saveRestaurant_pipeline import load_catalog_ids
+from bring_to_server import bring_restaurants_list_async
+from http_client import close_http_client
+from llm.gemini_call import call_llm
+
+# 크롤링된 모든 식당에 상황/분위기/목적 태그를 미리 붙여두는 오프라인 배치
+# 실행: python data/tag_restaurants.py --concurrency 4
+# 중간에 끊겨도 다시 실행하면 현재 CONTEXT_PROMPT_VERSION으로 이미 태깅된 식당은 건너뜁니다.
+# 상세 조회/LLM 호출이 실패한 배치는 로그만 남기고 다음 배치로 넘어가며, 다음 실행에서 다시 시도합니다.
+# --limit 없이 끝까지 돈 실행만 완료로 기록하고(tag_runs), 서버는 그 뒤에야 태그 조회를 씁니다.
+# Spring 호출에는 SPRING_SERVICE_TOKEN(서비스 계정 토큰)을 사용합니다.
+
+DETAIL_BATCH_SIZE = 20
+
+
+def parse_tags(text: str) -> dict:
+    try:
+        json_str = re.search(r'\{.*\}', text, re.DOTALL)
+        if json_str:
+            return json.loads(json_str.group()).get("tags", {})
+    except json.JSONDecodeError as e:
+        print(f"❌ JSON 파싱 실패: {e}")
+    return {}
+
+
+async def tag_restaurant(restaurant: dict, semaphore: asyncio.Semaphore) -> dict:
+    async with semaphore:
+        prompt = build_context_prompt(restaurant)
+        response = await call_llm(prompt, print_result=False)
+    tags = parse_tags(response)
+    return context_tag_store.save_tags(place_id_of(restaurant), tags, CONTEXT_PROMPT_VERSION)
+
+
+async def run(concurrency: int, force: bool, limit: int):
+    place_ids = await load_catalog_ids()
+    if place_ids is None:
+        return
+    done = set() if force else context_tag_store.tagged_ids(CONTEXT_PROMPT_VERSION)
+    todo = [pid for pid in place_ids if pid not in done]
+    if limit:
+        todo = todo[:limit]
+    total = len(todo)
+    print(f"📦 전체 {len(place_ids)}곳 중 태깅할 식당: {total}곳 (이미 완료 {len(done)}곳)")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    start = time.time()
+    finished = 0
+    failed = 0
+    # 상세 정보(리뷰 포함)는 묶어서 가져오고, LLM 호출은 semaphore로 동시 실행 수를 제한
+    for i in range(0, total, DETAIL_BATCH_SIZE):
+        batch = todo[i:i + DETAIL_BATCH_SIZE]
+        try:
+            details = await bring_restaurants_list_async(batch)
+            restaurants = details.get("restaurants") or []
+            results = await asyncio.gather(
+                *[tag_restaurant(r, semaphore) for r in restaurants], return_exceptions=True
+            )
+        except Exception as e:
+            failed += len(batch)
+            print(f"[{i + 1}~{i + len(batch)}/{total}] ❌ 배치 실패, 다음 실행에서 다시 시도: {e}")
+            continue
+        for r, result in zip(restaurants, results):
+            if isinstance(result, Exception):
+                failed += 1
+                print(f"[{r.get('placeId')}] ❌ 태깅 실패: {result}")
+            else:
+                finished += 1
+                print(f"[{finished}/{total}] {r.get('name', r.get('placeId'))}: {result}")
+
+    elapsed = time.time() - start
+    print(f"✅ 태깅 완료: {finished}곳, 실패 {failed}곳, {elapsed:.1f}초 (저장된 식당 {context_tag_store.count()}곳)")
+    if not limit:
+        # 카탈로그를 한 번 다 돈 실행만 완료로 기록 (서버는 커버리지가 충분할 때만 태그 조회 사용)
+        tagged = len(set(place_ids) & context_tag_store.tagged_ids(CONTEXT_PROMPT_VERSION))
+        context_tag_store.mark_complete(CONTEXT_PROMPT_VERSION, len(place_ids), tagged)
+        print(f"🏷️ {CONTEXT_PROMPT_VERSION} 태깅 커버리지: {tagged}/{len(place_ids)}곳")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="식당 상황/분위기/목적 태그 배치")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 실행할 LLM 호출 수")
+    parser.add_argument("--force", action="store_true", help="이미 태깅된 식당도 다시 태깅")
+    parser.add_argument("--limit", type=int, default=0, help="이번 실행에서 태깅할 최대 식당 수 (0이면 전체)")
+    args = parser.parse_args()
+
+    async def main():
+        try:
+            await run(args.concurrency, args.force, args.limit)
+        finally:
+            await close_http_client()
+
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from send_to_server import send_restaurant, send_restaurant_rating, send_reviews, send_menus, is_success
+from service.menu_index import append_menu_log
+
+# 크롤링 결과를 배치 단위로 Spring 서버에 올리는 업로더
+# 크롤링 단계는 수집만 하고, save_data의 업로드 단계가 결과를 배치로 모아 upload_batch로 넘깁니다.
+# 배치 안의 식당별 업로드(등록 → 평점 → 후기 → 메뉴)를 공유 세션 위에서 동시에 실행하고 처리량을 출력합니다.
+# 업로드 결과(done / registered / failed)는 upload_batch()의 반환값으로 돌려주고, 호출하는 쪽이 크롤링 저널에 기록합니다.
+
+UPLOAD_BATCH_SIZE = int(os.getenv("UPLOAD_BATCH_SIZE", 50))
+UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", 8))
+
+
+class CrawlUploader:
+    def __init__(self, concurrency: int = UPLOAD_CONCURRENCY):
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+        self.totals = {"batches": 0, "places": 0, "requests": 0, "failed": 0, "seconds": 0.0}
+
+    def upload_batch(self, batch: list) -> list:
+        """
+        batch의 식당을 모두 업로드하고 [(place_id, 상태, 오류), ...]를 반환합니다.
+        place: {"place_id", "restaurant"(등록할 식당 dict, 이미 등록됐으면 None), "crawled"(수집 결과, 실패면 None)}
+        crawled = {"rating", "review_count", "reviews", "menus"}
+        """
+        if not batch:
+            return []
+        started = time.perf_counter()
+        results = list(self._executor.map(self._upload_place, batch))
+        elapsed = time.perf_counter() - started
+
+        requests_sent = sum(r[3] for r in results)
+        failed = sum(1 for r in results if r[1] != "done")
+        self.totals["batches"] += 1
+        self.totals["places"] += len(batch)
+        self.totals["requests"] += requests_sent
+        self.totals["failed"] += failed
+        self.totals["seconds"] += elapsed
+        print(
+            f"📤 배치 업로드: {len(batch)}곳 (실패 {failed}), 요청 {requests_sent}건, {elapsed:.2f}초 "
+            f"({len(batch) / elapsed:.1f}곳/초, {requests_sent / elapsed:.1f}요청/초)"
+        )
+        return [r[:3] for r in results]
+
+    def _upload_place(self, place: dict):
+        place_id = place["place_id"]
+        sent = 0
+        registered = place.get("restaurant") is None
+        if not registered:
+            result = send_restaurant(place["restaurant"])
+            sent += 1
+            if not is_success(result):
+                return place_id, "failed", f"식당 등록 실패: {result[0]} {result[1][:200]}", sent
+            registered = True
+
+        crawled = place.get("crawled")
+        if crawled is None:
+            return place_id, "registered", place.get("error") or "후기/메뉴 수집 실패", sent
+
+        steps = [
+            ("평점", lambda: send_restaurant_rating(place_id, crawled["rating"], crawled["review_count"])),
+            ("후기", lambda: send_reviews(place_id, crawled["reviews"])),
+            ("메뉴", lambda: send_menus(place_id, crawled["menus"])),
+        ]
+        for name, send in steps:
+            result = send()
+            sent += 1
+            if not is_success(result):
+                return place_id, "registered", f"{name} 전송 실패: {result[0]} {result[1][:200]}", sent
+
+        append_menu_log(place_id, crawled["menus"])  # 서버의 로컬 메뉴 역색인에 반영
+        return place_id, "done", None, sent
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        t = self.totals
+        if t["seconds"]:
+            print(
+                f"📤 업로드 합계: {t['places']}곳, 요청 {t['requests']}건, 실패 {t['failed']}곳, "
+                f"{t['seconds']:.1f}초 ({t['places'] / t['seconds']:.1f}곳/초)"
+            )
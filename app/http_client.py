@@ -0,0 +1,71 @@
+# app/http_client.py
+
+import os
+import httpx
+
+# Spring 서버 호출에 공통으로 쓰는 프로세스 단위 httpx.AsyncClient
+# FastAPI lifespan에서 init/close 하고, 각 모듈은 get_http_client()로 가져다 씁니다.
+# 매 호출마다 AsyncClient를 새로 만들면 TCP 연결을 매번 새로 맺기 때문에
+# 식당별 메뉴/리뷰 요청처럼 한꺼번에 많이 나가는 호출에서 지연이 커집니다.
+
+SPRING_HTTP_MAX_CONNECTIONS = int(os.getenv("SPRING_HTTP_MAX_CONNECTIONS", 100))
+SPRING_HTTP_MAX_KEEPALIVE = int(os.getenv("SPRING_HTTP_MAX_KEEPALIVE", 20))
+SPRING_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("SPRING_HTTP_KEEPALIVE_EXPIRY", 30))
+SPRING_HTTP_TIMEOUT = float(os.getenv("SPRING_HTTP_TIMEOUT", 15))
+SPRING_HTTP_CONNECT_TIMEOUT = float(os.getenv("SPRING_HTTP_CONNECT_TIMEOUT", 5))
+SPRING_HTTP2 = os.getenv("SPRING_HTTP2", "false").lower() in ("1", "true", "yes")
+
+_client = None
+
+
+def _http2_available() -> bool:
+    # http2=True는 h2 패키지가 있어야 동작하므로 없으면 HTTP/1.1로 내려갑니다.
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        print("⚠️ SPRING_HTTP2가 켜져 있지만 h2 패키지가 없어 HTTP/1.1을 사용합니다. (pip install httpx[http2])")
+        return False
+
+
+def _create_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=SPRING_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=SPRING_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=SPRING_HTTP_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(SPRING_HTTP_TIMEOUT, connect=SPRING_HTTP_CONNECT_TIMEOUT)
+    return httpx.AsyncClient(
+        limits=limits,
+        timeout=timeout,
+        http2=SPRING_HTTP2 and _http2_available(),
+    )
+
+
+async def init_http_client() -> httpx.AsyncClient:
+    """FastAPI 시작 시 호출. 이미 만들어져 있으면 그대로 씁니다."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _create_client()
+        print(f"🔌 공유 HTTP 클라이언트 생성 (max_connections={SPRING_HTTP_MAX_CONNECTIONS}, keepalive={SPRING_HTTP_MAX_KEEPALIVE}, http2={SPRING_HTTP2})")
+    return _client
+
+
+async def close_http_client():
+    """FastAPI 종료 시 호출. 열려 있는 keep-alive 연결을 정리합니다."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+        print("🔌 공유 HTTP 클라이언트 종료")
+    _client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    공유 클라이언트를 반환합니다.
+    langGraphRunner.main()처럼 FastAPI 없이 실행할 때는 처음 호출 시 만들어집니다.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _create_client()
+    return _client
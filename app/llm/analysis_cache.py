@@ -0,0 +1,165 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import asyncio
+import threading
+from collections import OrderedDict
+
+# 식당별 리뷰 분석(llmResult) 캐시
+# 키 = placeId + 리뷰 집합 해시 + 프롬프트 버전. 리뷰가 바뀌거나 프롬프트를 고쳤을 때만 다시 분석합니다.
+# 인기 식당은 거의 모든 요청에 등장하므로 다른 사용자가 방금 분석한 결과를 그대로 재사용합니다.
+# get_or_compute(이벤트 루프)는 메모리 LRU만 직접 보고, SQLite 조회/저장은 asyncio.to_thread로 넘겨서
+# 디스크가 느려져도 다른 요청의 스트리밍이 멈추지 않게 합니다.
+
+ANALYSIS_CACHE_PATH = os.getenv(
+    "ANALYSIS_CACHE_PATH",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "cache", "analysis.sqlite3")),
+)
+ANALYSIS_CACHE_TTL = int(os.getenv("ANALYSIS_CACHE_TTL", 60 * 60 * 24 * 7))   # 7일
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", 50000))
+ANALYSIS_MEMORY_MAX_ENTRIES = int(os.getenv("ANALYSIS_MEMORY_MAX_ENTRIES", 2000))
+
+
+def review_set_hash(reviews: list) -> str:
+    """리뷰 순서가 바뀌어도 같은 해시가 나오도록 텍스트를 정렬해서 해시합니다."""
+    texts = sorted((r.get("text", "") if isinstance(r, dict) else str(r)).strip() for r in reviews or [])
+    return hashlib.sha256("\n".join(texts).encode("utf-8")).hexdigest()
+
+
+def make_analysis_key(restaurant: dict, prompt_version: str) -> str:
+    return f"{restaurant.get('placeId')}:{review_set_hash(restaurant.get('reviews', []))}:{prompt_version}"
+
+
+class AnalysisCache:
+    def __init__(self, path: str = ANALYSIS_CACHE_PATH, ttl: int = ANALYSIS_CACHE_TTL,
+                 max_entries: int = ANALYSIS_CACHE_MAX_ENTRIES, memory_max_entries: int = ANALYSIS_MEMORY_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory_max_entries = memory_max_entries
+        self.stats = {"hits": 0, "misses": 0, "shared": 0}
+
+        self._memory = OrderedDict()   # key -> (llm_result, expires_at)
+        self._inflight = {}            # key -> asyncio.Future (같은 식당 동시 분석 방지)
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS analysis (
+                key TEXT PRIMARY KEY,
+                place_id TEXT NOT NULL,
+                llm_result TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_analysis_created_at ON analysis(created_at)")
+        self._conn.commit()
+
+    def get_memory(self, key: str):
+        """메모리 LRU만 확인 (디스크 I/O 없음). 없거나 만료되면 None이고, 이때는 통계를 남기지 않습니다."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None or entry[1] < time.time():
+                return None
+            self._memory.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[0]
+
+    def get(self, key: str):
+        """메모리 → SQLite 순서로 조회합니다. 디스크를 읽으므로 이벤트 루프에서는 스레드로 부르세요."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                row = self._conn.execute(
+                    "SELECT llm_result, expires_at FROM analysis WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = (json.loads(row[0]), row[1])
+                    self._remember(key, entry)
+
+            if entry is None or entry[1] < now:
+                self.stats["misses"] += 1
+                return None
+
+            self._memory.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[0]
+
+    def set(self, key: str, llm_result: str):
+        now = time.time()
+        expires_at = now + self.ttl
+        with self._lock:
+            self._remember(key, (llm_result, expires_at))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analysis (key, place_id, llm_result, expires_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                (key, key.split(":", 1)[0], json.dumps(llm_result, ensure_ascii=False), expires_at, now),
+            )
+            self._conn.execute("DELETE FROM analysis WHERE expires_at < ?", (now,))
+            count = self._conn.execute("SELECT COUNT(*) FROM analysis").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM analysis WHERE key IN (SELECT key FROM analysis ORDER BY created_at ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            self._conn.commit()
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_max_entries:
+            self._memory.popitem(last=False)
+
+    async def get_or_compute(self, key: str, compute):
+        """
+        캐시에 있으면 바로 반환하고, 없으면 compute()를 실행해 저장합니다.
+        같은 키로 동시에 들어온 요청은 LLM을 한 번만 호출하고 결과를 나눠 씁니다.
+        """
+        cached = self.get_memory(key)
+        if cached is not None:
+            return cached
+
+        inflight = self._inflight.get(key)
+        while inflight is not None:
+            self.stats["shared"] += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # 계산하던 요청이 취소되었고(SSE 연결 끊김 등) 이 요청은 살아 있으면 이어서 직접 계산
+                if not inflight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+            inflight = self._inflight.get(key)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            # 디스크 조회도 inflight 등록 뒤에 해야 같은 키의 동시 요청이 한 번만 읽고 한 번만 계산함
+            result = await asyncio.to_thread(self.get, key)
+            if result is None:
+                result = await compute()
+                if result:
+                    await asyncio.to_thread(self.set, key, result)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # 기다리는 쪽이 없어도 "never retrieved" 경고가 나지 않게 처리
+            raise
+        finally:
+            # 취소(CancelledError)는 위 except에 걸리지 않으므로, 기다리는 쪽이 멈추지 않도록 future도 취소
+            if not future.done():
+                future.cancel()
+            self._inflight.pop(key, None)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM analysis").fetchone()[0]
+            return {**self.stats, "size": size}
+
+
+analysis_cache = AnalysisCache()
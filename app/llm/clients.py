@@ -0,0 +1,40 @@
+import os
+import threading
+
+from config import load_env
+
+load_env()
+
+# Gemini 클라이언트 레지스트리
+# langchain_google_genai import와 클라이언트 생성이 무거워서, 모듈 import 시점이 아니라 처음 쓰는 시점에 만들고
+# 같은 설정의 클라이언트는 프로세스 전체에서 하나만 재사용합니다.
+
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "models/gemini-1.5-pro")
+
+# 이름 → ChatGoogleGenerativeAI 생성 인자
+CLIENT_CONFIGS = {
+    "default": {},                                          # 추출/분기 (saveRestaurant_pipeline)
+    "streaming": {"model_kwargs": {"streaming": True}},     # 식당 분석/최종 추천 (gemini_call)
+    "agent": {"temperature": 0.4},                          # 분기 agent (agent_config)
+}
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def get_llm(name: str = "default"):
+    client = _clients.get(name)
+    if client is not None:
+        return client
+    with _lock:
+        client = _clients.get(name)
+        if client is None:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+
+            api_key = os.getenv("GOOGLE_API_KEY")
+            if api_key is None:
+                print("경고: GOOGLE_API_KEY 환경 변수가 로드되지 않았습니다!")
+            client = ChatGoogleGenerativeAI(model=GEMINI_MODEL, google_api_key=api_key, **CLIENT_CONFIGS[name])
+            _clients[name] = client
+            print(f"🤖 Gemini 클라이언트 생성: {name}")
+    return client
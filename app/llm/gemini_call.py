@@ -1,28 +1,43 @@
-from service.prompt import build_review_prompt, build_final_recommendation_prompt
-from langchain_google_genai import ChatGoogleGenerativeAI
-import os
-from dotenv import load_dotenv
+from service.prompt import build_review_prompt, build_final_recommendation_prompt, REVIEW_PROMPT_VERSION
+from llm.analysis_cache import analysis_cache, make_analysis_key
+from llm.llm_scheduler import llm_scheduler
+from service.review_select import select_reviews
+from llm.clients import get_llm
 import asyncio
-JWT_TOKEN = os.getenv("JWT_TOKEN")
-load_dotenv()
 
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-
-llm = ChatGoogleGenerativeAI(model="models/gemini-1.5-pro", google_api_key=GOOGLE_API_KEY, model_kwargs={"streaming": True})
+async def stream_llm(prompt: str):
+    """
+    Gemini 응답을 생성되는 대로 조각(str) 단위로 넘겨줍니다.
+    동시 실행 수 / 초당 호출 수 제한과 429·5xx 재시도는 llm_scheduler가 담당합니다.
+    """
+    async for chunk in llm_scheduler.stream(lambda: get_llm("streaming").astream(prompt)):
+        if chunk.content:
+            yield chunk.content
 
 async def call_llm(prompt: str, print_result: bool):
-    stream = llm.astream(prompt)
     result = ""
-    async for chunk in stream:
-        if chunk.content:
-            result += chunk.content
+    async for text in stream_llm(prompt):
+        result += text
     if print_result:
         print()
     return result
 
 async def analyze_restaurant(restaurant: dict) -> dict:
-    prompt = build_review_prompt(restaurant)
-    response =await call_llm(prompt, print_result=False)
+    # 토큰 예산 안에서 리뷰를 먼저 고르고, 실제로 프롬프트에 들어갈 리뷰 기준으로 캐시 키를 만듭니다.
+    # 식당별 분석은 사용자끼리 공유하는 캐시라 사용자 키워드 없이 고릅니다. (키워드는 최종 추천 프롬프트에만 반영)
+    reviews, stats = select_reviews(restaurant.get("reviews", []))
+    if stats["tokens_saved"] > 0:
+        print(f"✂️ [{restaurant.get('placeId')}] 리뷰 {stats['total']}→{stats['selected']}개, 토큰 {stats['tokens_saved']} 절약")
+    selected = {**restaurant, "reviews": reviews}
+
+    # 같은 식당 + 같은 리뷰 + 같은 프롬프트 버전이면 캐시된 분석을 재사용
+    key = make_analysis_key(selected, REVIEW_PROMPT_VERSION)
+
+    async def compute():
+        prompt = build_review_prompt(selected, selected_reviews=reviews)
+        return await call_llm(prompt, print_result=False)
+
+    response = await analysis_cache.get_or_compute(key, compute)
     result = {
         "placeId": restaurant["placeId"],
         "name": restaurant["name"],
@@ -30,18 +45,34 @@ async def analyze_restaurant(restaurant: dict) -> dict:
         "llmResult": response
     }
     return result
+
 async def run_llm_analysis(data: dict) -> list:
     restaurants = data.get("restaurants", [])
     if not isinstance(restaurants, list):
         raise ValueError("restaurants는 리스트여야 합니다.")
 
     tasks = [analyze_restaurant(r) for r in restaurants]
-    return await asyncio.gather(*tasks)
+    # 한 식당 분석이 실패해도 전체 요청이 실패하지 않도록 실패한 것만 빼고 반환
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    analyses = []
+    for r, result in zip(restaurants, results):
+        if isinstance(result, Exception):
+            print(f"⚠️ [{r.get('placeId')}] 분석 실패, 제외: {result}")
+            continue
+        analyses.append(result)
+    return analyses
 
 
-async def get_final_recommendation(results: list, input_text:str) -> str:
+async def get_final_recommendation(results: list, input_text:str, keywords: list = None) -> str:
     """
     전체 흐름: 개별 분석 → 종합 프롬프트 → 최종 추천 생성
     """
-    final_prompt = build_final_recommendation_prompt(results, input_text)
+    final_prompt = build_final_recommendation_prompt(results, input_text, keywords)
     return await call_llm(final_prompt, print_result = True)
+
+
+async def stream_final_recommendation(results: list, input_text: str, keywords: list = None):
+    """get_final_recommendation의 스트리밍 버전. SSE 엔드포인트에서 토큰을 바로 흘려보낼 때 사용."""
+    final_prompt = build_final_recommendation_prompt(results, input_text, keywords)
+    async for text in stream_llm(final_prompt):
+        yield text
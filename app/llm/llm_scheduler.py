@@ -0,0 +1,131 @@
+import os
+import time
+import random
+import asyncio
+from contextlib import asynccontextmanager
+
+# 모든 Gemini 호출이 거쳐가는 공용 스케줄러
+# - 전역 동시 실행 수 제한 (Semaphore)
+# - 초당 호출 수 제한 (토큰 버킷)
+# - 429 / 5xx / 타임아웃 에러는 지터를 섞은 지수 백오프로 재시도
+# 후보 식당이 80곳이면 80개 스트림이 한꺼번에 나가서 쿼터 에러가 나던 문제를 막습니다.
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+LLM_RATE_PER_SEC = float(os.getenv("LLM_RATE_PER_SEC", 2.0))
+LLM_BURST = int(os.getenv("LLM_BURST", 8))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 4))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", 1.0))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", 20.0))
+
+RETRYABLE_MARKERS = ("429", "500", "502", "503", "504", "resource exhausted", "resourceexhausted",
+                     "quota", "rate limit", "unavailable", "deadline exceeded", "internal error",
+                     "timeout", "timed out")
+
+
+def is_retryable(error: Exception) -> bool:
+    """google.api_core 예외 타입에 의존하지 않고 상태 코드/메시지로 재시도 여부를 판단합니다."""
+    status = getattr(error, "code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in RETRYABLE_MARKERS)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class LLMScheduler:
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY, rate_per_sec: float = LLM_RATE_PER_SEC,
+                 burst: int = LLM_BURST, max_retries: int = LLM_MAX_RETRIES):
+        self.max_retries = max_retries
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._bucket = TokenBucket(rate_per_sec, burst)
+        self.stats = {"calls": 0, "retries": 0, "failures": 0, "waiting": 0, "running": 0}
+
+    @asynccontextmanager
+    async def slot(self):
+        """동시 실행 슬롯 + 토큰 버킷을 얻은 뒤 본문을 실행합니다."""
+        self.stats["waiting"] += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.stats["waiting"] -= 1
+        try:
+            await self._bucket.acquire()
+        except BaseException:
+            # 토큰 버킷 대기 중에 취소되면 running은 올리지 않았으므로 슬롯만 돌려줌
+            self._semaphore.release()
+            raise
+        self.stats["running"] += 1
+        self.stats["calls"] += 1
+        try:
+            yield
+        finally:
+            self.stats["running"] -= 1
+            self._semaphore.release()
+
+    def backoff(self, attempt: int) -> float:
+        # full jitter: 0 ~ min(max, base * 2^attempt)
+        return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt)))
+
+    async def run(self, make_call):
+        """
+        make_call()이 돌려주는 코루틴을 스케줄러 아래에서 실행하고, 재시도 가능한 에러면 다시 시도합니다.
+        재시도할 때마다 코루틴을 새로 만들어야 하므로 코루틴이 아니라 함수를 받습니다.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.slot():
+                    return await make_call()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    self.stats["failures"] += 1
+                    raise
+                delay = self.backoff(attempt)
+                self.stats["retries"] += 1
+                print(f"🔁 LLM 호출 재시도 {attempt + 1}/{self.max_retries} ({delay:.1f}초 후): {e}")
+                await asyncio.sleep(delay)
+
+    async def stream(self, make_stream):
+        """
+        run()의 스트리밍 버전. 첫 조각을 받기 전 에러만 재시도합니다.
+        (이미 일부를 내보낸 뒤에 다시 시도하면 응답이 중복되므로 그때는 그대로 에러를 올림)
+        """
+        for attempt in range(self.max_retries + 1):
+            started = False
+            try:
+                async with self.slot():
+                    async for chunk in make_stream():
+                        started = True
+                        yield chunk
+                return
+            except Exception as e:
+                if started or attempt >= self.max_retries or not is_retryable(e):
+                    self.stats["failures"] += 1
+                    raise
+                delay = self.backoff(attempt)
+                self.stats["retries"] += 1
+                print(f"🔁 LLM 스트림 재시도 {attempt + 1}/{self.max_retries} ({delay:.1f}초 후): {e}")
+                await asyncio.sleep(delay)
+
+
+llm_scheduler = LLMScheduler()
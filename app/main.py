@@ -1,30 +1,101 @@
 # main.py
+import time
+_PROCESS_STARTED = time.perf_counter()   # 기동 시간 측정 기준 (main.py import 시작)
+
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import asyncio
+import importlib
+import json
 import os
 import sys
-from dotenv import load_dotenv
+from contextlib import asynccontextmanager
 
 # --- LangGraph 프로젝트 경로 설정 ---
 LANGGRAPH_PROJECT_PATH = os.path.abspath(os.path.dirname(__file__))
 sys.path.append(LANGGRAPH_PROJECT_PATH)
 print(f"LangGraph project path added to sys.path: {LANGGRAPH_PROJECT_PATH}")
 
-# --- 기존 LangGraph Runner 및 관련 모듈 임포트 ---
+# --- 환경 변수 로드 ---
+# 다른 모듈의 상수(os.getenv)가 .env 값을 보도록 가장 먼저, 프로세스에서 한 번만 로드합니다.
+from config import load_env
+load_env()
+
+# --- 가벼운 모듈만 바로 임포트 ---
+# langgraph/langchain/Gemini를 끌어오는 agent.langGraphRunner는 아래 get_runner()로 지연 로드합니다.
 try:
-    from agent.langGraphRunner import run_recommendation_pipeline # LangGraph 함수 임포트
-    # 이제 bring_to_server 등에서 전역 토큰 변수를 임포트할 필요 없음.
-    # main.py 미들웨어에서 os.environ["JWT_TOKEN"]을 설정하면 됨.
+    from service.session_store import session_store
+    from http_client import init_http_client, close_http_client
+    from service.spatial_index import spatial_index_refresher
+    from service.menu_index import menu_index_refresher
+    from service.review_index import load_review_index
+    from auth_context import set_request_token, reset_request_token
+    # 토큰은 os.environ이 아니라 요청별 컨텍스트(auth_context)와 graph state로 전달됨.
 
-    print("LangGraph modules loaded successfully.")
+    print("Core modules loaded successfully.")
 except ImportError as e:
     print(f"Error importing LangGraph modules: {e}")
     print(f"Please ensure your LangGraph project (expected at {LANGGRAPH_PROJECT_PATH}) is correctly configured and accessible.")
     sys.exit(1)
 
-app = FastAPI()
+# --- LangGraph 러너 지연 로드 ---
+# langgraph/langchain import와 그래프 컴파일이 기동 시간 대부분을 차지하므로,
+# 워커가 요청을 받기 시작한 뒤 백그라운드 스레드에서 불러옵니다. 로드 전에 온 요청은 끝날 때까지 기다립니다.
+startup_timings = {}
+_runner_task = None
+
+def _import_runner():
+    started = time.perf_counter()
+    module = importlib.import_module("agent.langGraphRunner")
+    startup_timings["runner_import_sec"] = round(time.perf_counter() - started, 3)
+    print(f"LangGraph modules loaded successfully. ({startup_timings['runner_import_sec']:.2f}s)")
+    return module
+
+async def get_runner():
+    global _runner_task
+    if _runner_task is None:
+        _runner_task = asyncio.ensure_future(asyncio.to_thread(_import_runner))
+    try:
+        # 요청 하나가 취소되어도 로드 자체는 계속되도록 shield
+        return await asyncio.shield(_runner_task)
+    except Exception as e:
+        print(f"Error importing LangGraph modules: {e}")
+        _runner_task = None   # 다음 요청에서 다시 시도
+        raise
+
+async def _warm_runner():
+    try:
+        await get_runner()
+    except Exception:
+        pass   # 로그는 get_runner에서 남김. 첫 요청 때 다시 시도
+
+def _load_catalog():
+    # saveRestaurant_pipeline은 langchain을 import하므로 기동 경로가 아닌 갱신 스레드에서 불러옴
+    from service.saveRestaurant_pipeline import findall_restaurants_DB
+    return findall_restaurants_DB()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Spring 서버 호출용 공유 HTTP 커넥션 풀을 워커 수명 동안 유지
+    await init_http_client()
+    background = [
+        # LangGraph 러너 미리 로드
+        asyncio.create_task(_warm_runner()),
+        # 상황 키워드용 BM25 리뷰 색인(오프라인 빌드)을 mmap으로 열어둠 (열리기 전에는 태그/Spring 조회)
+        asyncio.create_task(load_review_index()),
+        # 주변 식당 공간 인덱스는 백그라운드에서 채우고 주기적으로 갱신 (채워지기 전에는 Spring 조회 사용)
+        asyncio.create_task(spatial_index_refresher(_load_catalog)),
+        asyncio.create_task(menu_index_refresher()),
+    ]
+    startup_timings["ready_sec"] = round(time.perf_counter() - _PROCESS_STARTED, 3)
+    print(f"🚀 워커 준비 완료: {startup_timings['ready_sec']:.2f}s (LangGraph 러너는 백그라운드 로드 중)")
+    yield
+    for task in background:
+        task.cancel()
+    await close_http_client()
+
+app = FastAPI(lifespan=lifespan)
 
 # --- CORS 설정 --- (기존과 동일)
 origins = [
@@ -41,9 +112,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# --- 환경 변수 로드 --- (기존과 동일)
-load_dotenv(dotenv_path=os.path.abspath(os.path.join(os.path.dirname(__file__), '.env')))
-print("FastAPI .env file loaded.")
+# --- 기동 시간 / 러너 로드 상태 ---
+@app.get("/health")
+async def health():
+    return {"status": "ok", "runner_ready": "runner_import_sec" in startup_timings, "startup": startup_timings}
 
 # --- JWT 토큰 검증 및 갱신 미들웨어 ---
 # 프론트엔드로부터 받은 Access Token을 LangGraph 모듈에 전달합니다.
@@ -60,7 +132,13 @@ async def verify_jwt_token(request: Request, call_next):
             return JSONResponse(status_code=401, content={"detail": "Unauthorized: Missing or invalid token"})
 
         token = auth_header.split(" ")[1]
-        os.environ["JWT_TOKEN"] = token
+        # 프로세스 전역(os.environ)에 쓰면 동시 요청끼리 토큰이 섞이므로 요청 단위로만 보관
+        request.state.jwt_token = token
+        reset_token = set_request_token(token)
+        try:
+            return await call_next(request)
+        finally:
+            reset_request_token(reset_token)
 
     return await call_next(request)
 
@@ -74,18 +152,108 @@ async def invoke_langgraph_api(request_data: Request):
         if not user_input:
             raise HTTPException(status_code=400, detail="user_input is required")
 
-        state = {"user_input": user_input}
-        langgraph_result = await run_recommendation_pipeline(state)
+        token = request_data.state.jwt_token
+        state = {"user_input": user_input, "jwt_token": token}
+        runner = await get_runner()
+        langgraph_result = await runner.run_recommendation_pipeline(state)
         
         if "error" in langgraph_result and "Authentication required" in langgraph_result["error"]:
             return JSONResponse(status_code=401, content={"detail": "Authentication required: Please re-login."})
         elif "error" in langgraph_result:
             return JSONResponse(status_code=500, content={"detail": langgraph_result["error"]})
         
-        return {"result": langgraph_result.get("result", "응답 없음")}
+        # 후속 요청(/api/langgraph/followup)이 이어서 쓸 수 있도록 중간 결과를 세션에 보관
+        conversation_id, session_key = session_store.new_id(), session_store.new_key()
+        session_store.save(conversation_id, langgraph_result, session_key)
+        return {
+            "result": langgraph_result.get("result", "응답 없음"),
+            "conversation_id": conversation_id,
+            "session_key": session_key,
+        }
     
     except RuntimeError as e: 
         return JSONResponse(status_code=401, content={"detail": f"Authentication required: {e}"})
     except Exception as e:
         print(f"Unhandled exception in LangGraph API: {e}")
         return JSONResponse(status_code=500, content={"detail": f"LangGraph execution failed: {e}"})
+
+
+# --- 후속 요청 엔드포인트 ---
+# invoke/stream이 돌려준 conversation_id + session_key로 세션을 이어받아 next_tool이 고른 노드부터 다시 실행합니다.
+# 세션은 JWT가 아니라 session_key에 묶여 있으므로 대화 중에 access token이 갱신되어도 이어집니다.
+# "다른 식당 추천해줘"는 추출/지오코딩/후보 조회 없이 순위 매기기 + 최종 추천만 실행됩니다.
+@app.post("/api/langgraph/followup")
+async def followup_langgraph_api(request_data: Request):
+    try:
+        data = await request_data.json()
+        user_input = data.get("user_input")
+        conversation_id = data.get("conversation_id")
+        session_key = data.get("session_key")
+
+        if not user_input or not conversation_id or not session_key:
+            raise HTTPException(status_code=400, detail="user_input, conversation_id and session_key are required")
+
+        token = request_data.state.jwt_token
+        session = session_store.get(conversation_id, session_key)
+        if session is None:
+            return JSONResponse(status_code=404, content={"detail": "Conversation not found or expired"})
+
+        runner = await get_runner()
+        next_node, langgraph_result = await runner.run_followup(session, user_input, token)
+        if next_node == "end":
+            session_store.delete(conversation_id)
+            return {"result": None, "conversation_id": conversation_id, "next": next_node}
+
+        if "error" in langgraph_result and "Authentication required" in langgraph_result["error"]:
+            return JSONResponse(status_code=401, content={"detail": "Authentication required: Please re-login."})
+        elif "error" in langgraph_result:
+            return JSONResponse(status_code=500, content={"detail": langgraph_result["error"]})
+
+        session_store.save(conversation_id, langgraph_result, session_key)
+        return {"result": langgraph_result.get("result", "응답 없음"), "conversation_id": conversation_id, "next": next_node}
+
+    except HTTPException:
+        raise
+    except RuntimeError as e:
+        return JSONResponse(status_code=401, content={"detail": f"Authentication required: {e}"})
+    except Exception as e:
+        print(f"Unhandled exception in LangGraph followup API: {e}")
+        return JSONResponse(status_code=500, content={"detail": f"LangGraph execution failed: {e}"})
+
+
+# --- LangGraph 스트리밍 엔드포인트 (Server-Sent Events) ---
+# 그래프 전체가 끝날 때까지 기다리지 않고 노드 진행 상황(장소 확인, 후보 N곳, 분석 완료)과
+# 최종 추천 토큰을 생성되는 대로 보냅니다.
+def _format_sse(event: dict) -> str:
+    return f"event: {event['event']}\ndata: {json.dumps(event['data'], ensure_ascii=False)}\n\n"
+
+@app.post("/api/langgraph/stream")
+async def stream_langgraph_api(request_data: Request):
+    data = await request_data.json()
+    user_input = data.get("user_input")
+
+    if not user_input:
+        raise HTTPException(status_code=400, detail="user_input is required")
+
+    token = request_data.state.jwt_token
+    state = {"user_input": user_input, "jwt_token": token}
+    conversation_id, session_key = session_store.new_id(), session_store.new_key()
+    runner = await get_runner()
+
+    def save_session(final_state):
+        session_store.save(conversation_id, final_state, session_key)
+
+    async def event_stream():
+        try:
+            yield _format_sse({"event": "session", "data": {"conversation_id": conversation_id, "session_key": session_key}})
+            async for event in runner.stream_recommendation_pipeline(state, on_complete=save_session):
+                yield _format_sse(event)
+        except Exception as e:
+            print(f"Unhandled exception in LangGraph stream: {e}")
+            yield _format_sse({"event": "error", "data": {"detail": f"LangGraph execution failed: {e}"}})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
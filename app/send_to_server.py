@@ -1,56 +1,99 @@
 import requests
 import os
-from dotenv import load_dotenv
+import threading
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import load_env, place_id_of
 
-load_dotenv()
+load_env()
 
 SPRING_SERVER = "http://localhost:8080"
 
 JWT_TOKEN = os.getenv("JWT_TOKEN")
 
+# 크롤링 데이터 업로드용 공유 세션
+# 요청마다 새 연결을 맺지 않도록 keep-alive 커넥션 풀을 쓰고, 연결 오류와 429/503은 지수 백오프로 재시도합니다.
+# 업로드 API는 POST이고 멱등이 아니라서(후기/식당이 중복 저장될 수 있음) 서버가 요청을 받았을 수도 있는 경우
+# (읽기 타임아웃, 500/502/504)는 재시도하지 않습니다. 연결 실패는 요청이 전달되지 않았고,
+# 429/503은 서버가 처리하지 않고 거절한 응답이므로 Retry-After에 맞춰 다시 보냅니다.
+UPLOAD_POOL_SIZE = int(os.getenv("UPLOAD_POOL_SIZE", 16))
+UPLOAD_MAX_RETRIES = int(os.getenv("UPLOAD_MAX_RETRIES", 3))
+UPLOAD_BACKOFF = float(os.getenv("UPLOAD_BACKOFF", 0.5))     # 0.5, 1, 2초 ...
+UPLOAD_TIMEOUT = float(os.getenv("UPLOAD_TIMEOUT", 15))
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                retry = Retry(
+                    total=UPLOAD_MAX_RETRIES,
+                    connect=UPLOAD_MAX_RETRIES,
+                    read=0,                      # 읽기 타임아웃: 서버가 이미 저장했을 수 있음
+                    other=0,
+                    status=UPLOAD_MAX_RETRIES,
+                    status_forcelist=(429, 503),
+                    allowed_methods=None,        # 429/503 거절 응답은 POST도 재시도
+                    backoff_factor=UPLOAD_BACKOFF,
+                    respect_retry_after_header=True,
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(pool_connections=UPLOAD_POOL_SIZE, pool_maxsize=UPLOAD_POOL_SIZE, max_retries=retry)
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update({"Authorization": f"Bearer {JWT_TOKEN}"})
+                _session = session
+    return _session
+
+
+def _post(url: str, payload):
+    try:
+        response = get_session().post(url, json=payload, timeout=UPLOAD_TIMEOUT)
+        return response.status_code, response.text
+    except requests.RequestException as e:
+        # 연결 실패도 (상태 코드, 본문) 형태로 돌려줌. 상태 코드 0 = 응답 없음
+        return 0, str(e)
+
+
+def is_success(result) -> bool:
+    return 200 <= result[0] < 300
+
 def send_restaurant_rating(place_id: int, rating: float, count: int):
     url = f"{SPRING_SERVER}/api/restaurants/{place_id}/rating"
-    headers = {"Authorization": f"Bearer {JWT_TOKEN}"}
     payload = {
         "rating": rating,
         "reviewCount": count
     }
-    response = requests.post(url, json=payload, headers=headers)
-    return response.status_code, response.text
+    return _post(url, payload)
 
 def send_restaurant(restaurant: dict):
     url = f"{SPRING_SERVER}/api/restaurants"
-    headers = {"Authorization": f"Bearer {JWT_TOKEN}"}
-    response = requests.post(url, json=restaurant, headers=headers)
-    return response.status_code, response.text
+    return _post(url, restaurant)
 
 def restaurant_is_exist(place_id: int) -> bool:
     try:
         url = f"{SPRING_SERVER}/api/restaurants/{place_id}"
-        headers = {"Authorization": f"Bearer {JWT_TOKEN}"}
-        response = requests.get(url, headers=headers)
+        response = get_session().get(url, timeout=UPLOAD_TIMEOUT)
         return response.ok and response.json()
     except Exception as e:
         return False
 
+def fetch_existing_place_ids() -> list:
+    """서버에 저장된 모든 식당 ID를 한 번에 가져옵니다. (크롤링 저널 초기화용, 식당별 restaurant_is_exist 대신)"""
+    url = f"{SPRING_SERVER}/api/restaurants/all"
+    response = get_session().get(url, timeout=60)
+    response.raise_for_status()
+    return [place_id_of(r) for r in response.json()]
+
 def send_reviews(place_id: int, reviews: list):
     url = f"{SPRING_SERVER}/api/restaurants/{place_id}/reviews"
-    headers = {"Authorization": f"Bearer {JWT_TOKEN}"}
-    response = requests.post(url, json=reviews, headers=headers)
-    return response.status_code, response.text
+    return _post(url, reviews)
 
 def send_menus(place_id: int, items: list):
     url = f"{SPRING_SERVER}/api/restaurants/{place_id}/menus"
-    headers = {
-        "Authorization": f"Bearer {JWT_TOKEN}",
-        "Content-Type": "application/json"
-    }
-    try:
-        response = requests.post(
-            url,
-            json=items,
-            headers=headers
-        )
-        return response.status_code, response.text
-    except requests.RequestException as e:
-        return 500
+    return _post(url, items)
@@ -0,0 +1,164 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+
+from service.prompt import CONTEXT_TAGS
+
+# 식당별 상황/분위기/목적 태그 저장소
+# data/tag_restaurants.py 배치가 채우고, get_context_tool이 요청 시점에 조회합니다.
+# 리뷰 전체에 대한 자유 텍스트 매칭 대신 미리 뽑아둔 (태그, 점수)로 바로 필터링합니다.
+# 일부 식당만 태깅된 상태로 쓰면 태깅 안 된 식당이 상황 검색에서 빠지므로, 현재 프롬프트 버전으로
+# 배치가 끝까지 돌았고 커버리지가 CONTEXT_TAG_MIN_COVERAGE 이상일 때만 조회에 씁니다. (is_complete)
+
+CONTEXT_TAGS_PATH = os.getenv(
+    "CONTEXT_TAGS_PATH",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "cache", "context_tags.sqlite3")),
+)
+CONTEXT_TAG_MIN_SCORE = float(os.getenv("CONTEXT_TAG_MIN_SCORE", 0.5))
+CONTEXT_TAG_MIN_COVERAGE = float(os.getenv("CONTEXT_TAG_MIN_COVERAGE", 0.95))
+CONTEXT_TAG_TOP_N = int(os.getenv("CONTEXT_TAG_TOP_N", 200))   # 태그 조회로 넘길 최대 식당 수
+CONTEXT_TAG_RECHECK_SEC = 60   # 아직 완료되지 않은 버전은 이 간격으로만 다시 확인
+
+ALL_CONTEXT_TAGS = [tag for tags in CONTEXT_TAGS.values() for tag in tags]
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", "", (text or "").strip())
+
+
+def match_context_tags(keywords: list) -> list:
+    """
+    사용자 키워드를 태그 목록에 맞춥니다. ("혼자 밥" → "혼밥"은 못 잡지만 "혼밥하기 좋은" → "혼밥"은 잡음)
+    매칭되는 태그가 없으면 빈 리스트.
+    """
+    matched = []
+    for keyword in keywords or []:
+        k = _normalize(keyword)
+        if not k:
+            continue
+        for tag in ALL_CONTEXT_TAGS:
+            t = _normalize(tag)
+            if (t in k or k in t) and tag not in matched:
+                matched.append(tag)
+    return matched
+
+
+class ContextTagStore:
+    def __init__(self, path: str = CONTEXT_TAGS_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS restaurant_tags (
+                place_id INTEGER PRIMARY KEY,
+                tags TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                tagged_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS tag_index (
+                tag TEXT NOT NULL,
+                place_id INTEGER NOT NULL,
+                score REAL NOT NULL,
+                PRIMARY KEY (tag, place_id)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tag_index_score ON tag_index(tag, score)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS tag_runs (
+                prompt_version TEXT PRIMARY KEY,
+                places INTEGER NOT NULL,
+                tagged INTEGER NOT NULL,
+                completed_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+        self._complete = {}      # prompt_version -> (완료 여부, 확인 시각)
+
+    def save_tags(self, place_id: int, tags: dict, prompt_version: str):
+        """태그는 CONTEXT_TAGS에 있는 것만, 점수는 0~1로 잘라서 저장합니다."""
+        clean = {}
+        for tag, score in (tags or {}).items():
+            if tag in ALL_CONTEXT_TAGS:
+                try:
+                    clean[tag] = min(max(float(score), 0.0), 1.0)
+                except (TypeError, ValueError):
+                    continue
+        with self._lock:
+            self._conn.execute("DELETE FROM tag_index WHERE place_id = ?", (place_id,))
+            self._conn.executemany(
+                "INSERT INTO tag_index (tag, place_id, score) VALUES (?, ?, ?)",
+                [(tag, place_id, score) for tag, score in clean.items()],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO restaurant_tags (place_id, tags, prompt_version, tagged_at) VALUES (?, ?, ?, ?)",
+                (place_id, json.dumps(clean, ensure_ascii=False), prompt_version, time.time()),
+            )
+            self._conn.commit()
+        return clean
+
+    def get_tags(self, place_id: int) -> dict:
+        with self._lock:
+            row = self._conn.execute("SELECT tags FROM restaurant_tags WHERE place_id = ?", (place_id,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def tagged_ids(self, prompt_version: str) -> set:
+        """이미 현재 프롬프트 버전으로 태깅된 식당 (배치 재시작 시 건너뛰기용)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT place_id FROM restaurant_tags WHERE prompt_version = ?", (prompt_version,)
+            ).fetchall()
+        return {r[0] for r in rows}
+
+    def mark_complete(self, prompt_version: str, places: int, tagged: int):
+        """배치가 카탈로그 전체를 한 번 다 돌았을 때 기록. places: 카탈로그 식당 수, tagged: 이 버전으로 태깅된 수"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tag_runs (prompt_version, places, tagged, completed_at) VALUES (?, ?, ?, ?)",
+                (prompt_version, places, tagged, time.time()),
+            )
+            self._conn.commit()
+            self._complete.pop(prompt_version, None)
+
+    def is_complete(self, prompt_version: str, min_coverage: float = CONTEXT_TAG_MIN_COVERAGE) -> bool:
+        """prompt_version으로 끝난 배치가 있고 커버리지가 충분한지. (요청마다 불리므로 결과를 잠시 캐시)"""
+        cached = self._complete.get(prompt_version)
+        if cached and (cached[0] or time.time() - cached[1] < CONTEXT_TAG_RECHECK_SEC):
+            return cached[0]
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT places, tagged FROM tag_runs WHERE prompt_version = ?", (prompt_version,)
+            ).fetchone()
+        complete = bool(row) and row[0] > 0 and row[1] / row[0] >= min_coverage
+        self._complete[prompt_version] = (complete, time.time())
+        return complete
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM restaurant_tags").fetchone()[0]
+
+    def find_restaurants(self, tags: list, min_score: float = CONTEXT_TAG_MIN_SCORE,
+                         top_n: int = CONTEXT_TAG_TOP_N) -> list:
+        """
+        태그 중 하나라도 min_score 이상인 식당 ID를 점수 합 내림차순으로 최대 top_n개 반환합니다.
+        SQLite 조회라 이벤트 루프에서는 asyncio.to_thread로 부릅니다.
+        """
+        if not tags:
+            return []
+        placeholders = ",".join("?" for _ in tags)
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT place_id, SUM(score) AS total FROM tag_index
+                    WHERE tag IN ({placeholders}) AND score >= ?
+                    GROUP BY place_id ORDER BY total DESC LIMIT ?""",
+                (*tags, min_score, top_n),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+
+context_tag_store = ContextTagStore()
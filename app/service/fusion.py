@@ -0,0 +1,94 @@
+import os
+import heapq
+
+from config import place_id_of
+
+# 위치/메뉴/상황 후보 목록을 하나의 순위로 합치는 단계 (weighted reciprocal-rank fusion)
+# - 각 목록에서 r번째(0부터)로 등장한 식당은 weight / (FUSION_RRF_K + r + 1)점을 받습니다.
+# - 모든(비어 있지 않은) 목록에 등장한 식당부터 채우고, top_k보다 적으면
+#   등장한 목록 수 조건을 하나씩 낮춰(relaxation) 나머지를 점수순으로 채웁니다.
+# - anchor 목록(기본: 위치)이 비어 있지 않으면 relaxation 중에도 anchor에 있는 식당만 남깁니다.
+# - require_anchor=True(사용자가 장소를 말함)인데 anchor 조회가 실패했거나 비어 있으면, 다른 동네 식당으로
+#   채우지 않고 빈 후보와 error를 반환합니다.
+# 목록 길이 합 n에 대해 누적은 O(n), 선택은 O(n log top_k)입니다.
+
+FUSION_TOP_K = int(os.getenv("FUSION_TOP_K", 30))
+FUSION_RRF_K = int(os.getenv("FUSION_RRF_K", 60))
+FUSION_WEIGHTS = {"location": 1.0, "menu": 1.0, "context": 0.7}
+
+
+def _ids(result) -> list:
+    """{"restaurants": [...]} / [...] 어느 쪽이든 정수 ID 목록으로. 오류 응답은 빈 목록."""
+    if isinstance(result, dict):
+        if "error" in result:
+            return []
+        result = result.get("restaurants") or []
+    if all(type(r) is int for r in result):
+        return result
+    ids = []
+    for r in result:
+        try:
+            ids.append(place_id_of(r))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return ids
+
+
+def fuse_candidates(
+    sources: dict,
+    weights: dict = None,
+    top_k: int = FUSION_TOP_K,
+    anchor: str = "location",
+    rrf_k: int = FUSION_RRF_K,
+    exclude=None,
+    require_anchor: bool = False,
+) -> dict:
+    """
+    sources: {"location": 결과, "menu": 결과, "context": 결과}
+    exclude: 이미 추천한 식당 ID (후속 요청에서 다음 후보를 뽑을 때)
+    require_anchor: anchor 결과가 없으면 완화하지 않고 빈 후보를 반환 ({"restaurants": None} / {"error": ...} 포함)
+    → {"restaurants": [ID, ...], "scores": {ID: 점수}, "matched": 최소 등장 목록 수}
+    """
+    weights = weights or FUSION_WEIGHTS
+    lists = {name: _ids(result) for name, result in sources.items()}
+    active = [name for name, ids in lists.items() if ids]
+    if require_anchor and anchor not in active:
+        return {"restaurants": [], "scores": {}, "matched": 0, "error": f"{anchor} 조회 결과 없음"}
+    if not active:
+        return {"restaurants": [], "scores": {}, "matched": 0}
+
+    scores = {}
+    hits = {}
+    for name in active:
+        w = weights.get(name, 1.0)
+        seen = set()
+        for rank, rid in enumerate(lists[name]):
+            if rid in seen:
+                continue
+            seen.add(rid)
+            scores[rid] = scores.get(rid, 0.0) + w / (rrf_k + rank + 1)
+            hits[rid] = hits.get(rid, 0) + 1
+
+    anchor_ids = set(lists[anchor]) if anchor in active else None
+    exclude = set(exclude or ())
+    # 등장한 목록 수별 버킷 (counting sort)
+    buckets = [[] for _ in range(len(active) + 1)]
+    for rid, n in hits.items():
+        if rid not in exclude and (anchor_ids is None or rid in anchor_ids):
+            buckets[n].append(rid)
+
+    selected = []
+    matched = len(active)
+    for n in range(len(active), 0, -1):
+        need = top_k - len(selected)
+        if need <= 0:
+            break
+        if buckets[n]:
+            matched = n
+            selected.extend(heapq.nlargest(need, buckets[n], key=scores.__getitem__))
+
+    return {
+        "restaurants": selected,
+        "scores": {rid: round(scores[rid], 6) for rid in selected},
+        "matched": matched,
+    }
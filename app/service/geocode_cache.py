@@ -0,0 +1,146 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# 장소명 → 좌표 캐시 (SQLite에 저장해서 재시작해도 유지)
+# 트래픽 대부분이 "강남역", "홍대" 같은 몇 백개의 장소명이므로
+# 메모리 LRU를 앞에 두고, 없을 때만 SQLite → Google Geocoding API 순서로 내려갑니다.
+# SQLite 조회/저장(get, set)은 디스크를 건드리므로 이벤트 루프에서 직접 부르지 말고 스레드에서 부릅니다.
+# 이벤트 루프에서는 get_memory로 메모리 LRU만 확인합니다. (get_coordinates_from_location_async)
+
+GEOCODE_CACHE_PATH = os.getenv(
+    "GEOCODE_CACHE_PATH",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "cache", "geocode.sqlite3")),
+)
+GEOCODE_CACHE_TTL = int(os.getenv("GEOCODE_CACHE_TTL", 60 * 60 * 24 * 30))          # 성공: 30일
+GEOCODE_NEGATIVE_TTL = int(os.getenv("GEOCODE_NEGATIVE_TTL", 60 * 60 * 6))           # 실패: 6시간
+GEOCODE_CACHE_MAX_ENTRIES = int(os.getenv("GEOCODE_CACHE_MAX_ENTRIES", 5000))
+GEOCODE_MEMORY_MAX_ENTRIES = int(os.getenv("GEOCODE_MEMORY_MAX_ENTRIES", 1000))
+
+
+def normalize_location(location: str) -> str:
+    """대소문자/공백 차이로 같은 장소가 다른 키가 되지 않도록 정규화합니다."""
+    return re.sub(r"\s+", " ", (location or "").strip()).lower()
+
+
+class GeocodeCache:
+    def __init__(self, path: str = GEOCODE_CACHE_PATH, ttl: int = GEOCODE_CACHE_TTL,
+                 negative_ttl: int = GEOCODE_NEGATIVE_TTL, max_entries: int = GEOCODE_CACHE_MAX_ENTRIES,
+                 memory_max_entries: int = GEOCODE_MEMORY_MAX_ENTRIES):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.memory_max_entries = memory_max_entries
+        self.stats = {"hits": 0, "negative_hits": 0, "misses": 0, "evictions": 0}
+
+        self._memory = OrderedDict()   # key -> (value, expires_at)
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # get_location_tool이 asyncio.to_thread로 부르기 때문에 여러 스레드에서 접근합니다.
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS geocode (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_geocode_last_access ON geocode(last_access)")
+        self._conn.commit()
+
+    def get_memory(self, location: str):
+        """메모리 LRU만 확인합니다. (디스크 I/O 없음, 이벤트 루프에서 호출 가능) 없거나 만료되면 None."""
+        key = normalize_location(location)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None or entry[1] < time.time():
+                return None
+            self._memory.move_to_end(key)
+            value = entry[0]
+            self.stats["negative_hits" if "error" in value else "hits"] += 1
+            return dict(value)
+
+    def get(self, location: str):
+        """캐시된 좌표(dict) 또는 음성 캐시된 {"error": ...}를 반환. 없거나 만료되면 None."""
+        key = normalize_location(location)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                row = self._conn.execute(
+                    "SELECT value, expires_at FROM geocode WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = (json.loads(row[0]), row[1])
+                    self._remember(key, entry)
+                    # 디스크 LRU 순서는 메모리에서 처음 올라올 때만 갱신 (메모리 히트는 디스크를 건드리지 않음)
+                    self._conn.execute("UPDATE geocode SET last_access = ? WHERE key = ?", (now, key))
+                    self._conn.commit()
+
+            if entry is None or entry[1] < now:
+                if entry is not None:
+                    self._forget(key)
+                self.stats["misses"] += 1
+                return None
+
+            self._memory.move_to_end(key)
+            value = entry[0]
+            self.stats["negative_hits" if "error" in value else "hits"] += 1
+            return dict(value)
+
+    def set(self, location: str, value: dict):
+        """성공한 좌표는 ttl, {"error": ...}(장소를 못 찾음)는 negative_ttl 동안 저장합니다."""
+        key = normalize_location(location)
+        now = time.time()
+        expires_at = now + (self.negative_ttl if "error" in value else self.ttl)
+        with self._lock:
+            self._remember(key, (value, expires_at))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocode (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), expires_at, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_max_entries:
+            self._memory.popitem(last=False)
+
+    def _forget(self, key):
+        self._memory.pop(key, None)
+        self._conn.execute("DELETE FROM geocode WHERE key = ?", (key,))
+        self._conn.commit()
+
+    def _evict(self, now):
+        # 만료된 항목 먼저 정리하고, 그래도 max_entries를 넘으면 가장 오래 안 쓴 것부터 삭제
+        cur = self._conn.execute("DELETE FROM geocode WHERE expires_at < ?", (now,))
+        removed = cur.rowcount
+        count = self._conn.execute("SELECT COUNT(*) FROM geocode").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            cur = self._conn.execute(
+                "DELETE FROM geocode WHERE key IN (SELECT key FROM geocode ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+            removed += cur.rowcount
+        self.stats["evictions"] += max(removed, 0)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            total = self.stats["hits"] + self.stats["negative_hits"] + self.stats["misses"]
+            hit_rate = (self.stats["hits"] + self.stats["negative_hits"]) / total if total else 0.0
+            size = self._conn.execute("SELECT COUNT(*) FROM geocode").fetchone()[0]
+            return {**self.stats, "size": size, "hit_rate": round(hit_rate, 3)}
+
+
+geocode_cache = GeocodeCache()
@@ -0,0 +1,111 @@
+import os
+import re
+import random
+import asyncio
+import threading
+
+from llm.llm_scheduler import llm_scheduler
+
+# 후속 요청("다른 식당 추천해줘", "메뉴 보여줘" ...) 분기용 로컬 분류기
+# 키워드/정규식 패턴 점수로 restart / show_menu / another_restaurants / another_menu / end를 고르고,
+# 확신도가 낮을 때만 LLM(next_tool, route_by_agent)에 넘깁니다.
+# 로컬 판단과 LLM 판단을 함께 로그로 남겨 일치율을 볼 수 있게 합니다.
+# LLM 분류(폴백, 비교용 shadow 호출 모두)는 공용 llm_scheduler를 거칩니다.
+
+INTENT_ROUTER_MIN_CONFIDENCE = float(os.getenv("INTENT_ROUTER_MIN_CONFIDENCE", 0.7))
+INTENT_ROUTER_MIN_SCORE = float(os.getenv("INTENT_ROUTER_MIN_SCORE", 1.0))
+# 확신도가 높아서 로컬로 끝낸 요청 중 이 비율만큼은 백그라운드로 LLM도 돌려 일치율을 측정 (0이면 끔)
+INTENT_ROUTER_SHADOW_RATE = float(os.getenv("INTENT_ROUTER_SHADOW_RATE", 0.0))
+
+# 분기 도구 이름 → 다시 시작할 그래프 노드
+INTENT_NODES = {
+    "restart": "location_node",
+    "show_menu": "menu_node",
+    "another_restaurants": "rank_node",
+    "another_menu": "menu_node",
+}
+
+# (도구 이름, 패턴, 가중치)
+INTENT_PATTERNS = [
+    ("restart", r"처음부터|다시\s*(시작|찾아|검색)|새로\s*(찾|추천|시작)|리셋|초기화", 2.0),
+    ("restart", r"다른\s*(동네|지역|위치|장소|역)", 2.0),
+    ("restart", r"(역|동|구|대|길)\s*(근처|주변|쪽|에서|으로)", 1.0),
+    ("show_menu", r"메뉴\s*(좀\s*)?(보여|알려|뭐|뭔|확인|있|궁금)|메뉴판|뭐\s*팔|무슨\s*메뉴|가격", 2.0),
+    ("another_menu", r"다른\s*(메뉴|음식|종류)|메뉴\s*(를\s*)?(바꿔|바꾸|변경)", 2.0),
+    ("another_menu", r"(먹고\s*싶|땡겨|땡기|당겨|당기)", 1.0),
+    ("another_menu", r"\S+\s*(말고|대신)\s*\S+\s*(으로|로|는|먹)", 1.0),
+    ("another_restaurants", r"다른\s*(식당|가게|집|곳|데|거|데는|곳은)|딴\s*(데|곳|집|거)", 2.0),
+    ("another_restaurants", r"(또|더|하나\s*더)\s*(추천|보여|알려|없)|(추천|보여)\s*더", 1.5),
+    ("another_restaurants", r"(여기|거기|이\s*식당|이\s*집|이\s*곳)\s*말고", 1.5),
+    ("end", r"^(그만|종료|끝|exit|quit|됐어|됐습니다|괜찮아|괜찮습니다|고마워|감사)", 3.0),
+]
+_COMPILED = [(label, re.compile(pattern), weight) for label, pattern, weight in INTENT_PATTERNS]
+
+router_stats = {"local": 0, "llm": 0, "agree": 0, "disagree": 0}
+_stats_lock = threading.Lock()
+_shadow_tasks = set()   # 백그라운드 비교 호출 Task가 끝나기 전에 GC되지 않도록 참조 보관
+
+
+def classify_followup(text: str):
+    """(도구 이름 또는 None, 확신도 0~1). 확신도 = 1등 점수 / 전체 점수 (1등 점수가 너무 낮으면 0)"""
+    text = re.sub(r"\s+", " ", (text or "").strip().lower())
+    scores = {}
+    for label, pattern, weight in _COMPILED:
+        if pattern.search(text):
+            scores[label] = scores.get(label, 0.0) + weight
+    if not scores:
+        return None, 0.0
+    label = max(scores, key=scores.get)
+    if scores[label] < INTENT_ROUTER_MIN_SCORE:
+        return label, 0.0
+    return label, scores[label] / sum(scores.values())
+
+
+def needs_llm(text: str) -> bool:
+    return classify_followup(text)[1] < INTENT_ROUTER_MIN_CONFIDENCE
+
+
+def record_decision(text: str, local_label, confidence: float, llm_label=None, source: str = "local"):
+    """로컬/LLM 판단을 한 줄로 남기고 일치율 통계를 갱신합니다."""
+    with _stats_lock:
+        router_stats[source] = router_stats.get(source, 0) + 1
+        if llm_label is not None and local_label is not None:
+            router_stats["agree" if llm_label == local_label else "disagree"] += 1
+    print(f"🧭 분기 판단[{source}] local={local_label}({confidence:.2f}) llm={llm_label} 입력={text!r}")
+
+
+async def _classify_with_llm(text: str, llm_classify):
+    # llm_classify는 동기 Gemini 호출이라 스레드에서 실행하고, 동시 실행/속도 제한은 스케줄러에 맡김
+    return await llm_scheduler.run(lambda: asyncio.to_thread(llm_classify, text))
+
+
+async def route_followup(text: str, llm_classify) -> str:
+    """
+    후속 요청 분기. 확신도가 충분하면 로컬 결과, 아니면 llm_classify(text)가 돌려준 도구 이름을 씁니다.
+    반환값은 다시 시작할 노드 이름 (모르는 도구면 "end")
+    """
+    label, confidence = classify_followup(text)
+    if confidence >= INTENT_ROUTER_MIN_CONFIDENCE:
+        record_decision(text, label, confidence)
+        if INTENT_ROUTER_SHADOW_RATE and random.random() < INTENT_ROUTER_SHADOW_RATE:
+            task = asyncio.create_task(_shadow_check(text, label, confidence, llm_classify))
+            _shadow_tasks.add(task)
+            task.add_done_callback(_shadow_tasks.discard)
+        return INTENT_NODES.get(label, "end")
+
+    llm_label = await _classify_with_llm(text, llm_classify)
+    record_decision(text, label, confidence, llm_label, source="llm")
+    return INTENT_NODES.get(llm_label, "end")
+
+
+async def _shadow_check(text, label, confidence, llm_classify):
+    try:
+        record_decision(text, label, confidence, await _classify_with_llm(text, llm_classify), source="shadow")
+    except Exception as e:
+        print(f"⚠️ 분기 비교용 LLM 호출 실패: {e}")
+
+
+def get_router_stats() -> dict:
+    with _stats_lock:
+        compared = router_stats["agree"] + router_stats["disagree"]
+        return {**router_stats, "agreement": round(router_stats["agree"] / compared, 3) if compared else None}
@@ -0,0 +1,187 @@
+import os
+import re
+import json
+import time
+import asyncio
+import threading
+from array import array
+from bisect import bisect_left
+
+# 메뉴 키워드 → 식당 ID 로컬 역색인
+# 메뉴 이름을 글자 1-gram / 2-gram으로 쪼개 정수 posting list(array)에 넣어두고,
+# 키워드의 2-gram posting을 교집합한 뒤 필요하면 실제 부분 문자열인지 확인합니다. ("닭발" → "국물닭발" 매칭)
+# 크롤러(data/uploader.py)가 메뉴를 올릴 때마다 MENU_INDEX_LOG에 한 줄씩 추가하고,
+# 서버는 로그에서 새로 붙은 줄만 읽어 인덱스를 갱신합니다.
+# 크롤러/백필 스크립트와 API 서버가 같은 파일 시스템(같은 MENU_INDEX_LOG 경로)을 쓴다고 가정합니다.
+# 다른 머신에서 크롤링하면 로그가 서버에 보이지 않으므로 인덱스는 켜지지 않고 Spring 필터를 그대로 씁니다.
+# 일부 식당만 들어간 인덱스로 Spring 검색을 대신하면 결과가 대부분 빠지므로, 백필(data/build_menu_index.py)이
+# 끝까지 돌아 완료 표시를 남기고 그 커버리지가 MENU_INDEX_MIN_COVERAGE 이상일 때만 ready가 됩니다.
+
+MENU_INDEX_LOG = os.getenv(
+    "MENU_INDEX_LOG",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "cache", "menu_log.jsonl")),
+)
+MENU_INDEX_REFRESH_SEC = int(os.getenv("MENU_INDEX_REFRESH_SEC", 60))
+MENU_INDEX_MIN_COVERAGE = float(os.getenv("MENU_INDEX_MIN_COVERAGE", 0.95))
+
+
+def normalize_menu(text: str) -> str:
+    return re.sub(r"[\s\W_]+", "", (text or "").lower())
+
+
+def _grams(text: str) -> set:
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+def _contains(postings: array, doc: int) -> bool:
+    i = bisect_left(postings, doc)
+    return i < len(postings) and postings[i] == doc
+
+
+def _menu_name(menu) -> str:
+    return menu.get("name", "") if isinstance(menu, dict) else str(menu)
+
+
+def append_menu_log(place_id: int, menus: list, path: str = MENU_INDEX_LOG):
+    """
+    크롤러에서 메뉴를 수집한 뒤 호출. 서버의 menu_index가 다음 갱신 때 읽어갑니다.
+    (서버와 같은 파일 시스템에서 실행할 때만 서버에 반영됨)
+    """
+    names = [_menu_name(m) for m in menus or [] if _menu_name(m)]
+    if not names:
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    line = json.dumps({"placeId": int(place_id), "menus": names}, ensure_ascii=False) + "\n"
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line)
+
+
+def append_build_marker(places: int, indexed: int, path: str = MENU_INDEX_LOG):
+    """
+    백필이 끝났다는 표시. places: 서버 카탈로그의 식당 수, indexed: 메뉴 조회에 성공한 식당 수
+    (메뉴가 없는 식당은 로그에 줄이 없으므로 커버리지는 인덱스 크기가 아니라 이 값으로 계산)
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    line = json.dumps({"build": {"places": int(places), "indexed": int(indexed), "at": time.time()}}) + "\n"
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line)
+
+
+class MenuIndex:
+    def __init__(self, log_path: str = MENU_INDEX_LOG):
+        self.log_path = log_path
+        self._doc_of = {}        # place_id -> doc 번호(0, 1, 2, ...)
+        self._place_ids = []     # doc 번호 -> place_id
+        self._menus = []         # doc 번호 -> 정규화된 메뉴 이름 목록
+        self._postings = {}      # gram -> array('i') (정렬된 doc 번호)
+        self._replaced = set()  # 메뉴가 교체되어 옛 posting이 남아 있는 doc
+        self._log_offset = 0
+        self.coverage = None     # 마지막 백필 완료 표시의 indexed / places (없으면 None)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._place_ids)
+
+    @property
+    def ready(self) -> bool:
+        """백필이 끝났고 커버리지가 충분할 때만 Spring 메뉴 검색을 대신합니다."""
+        return bool(self._place_ids) and self.coverage is not None and self.coverage >= MENU_INDEX_MIN_COVERAGE
+
+    def add(self, place_id: int, menus: list):
+        """식당 메뉴를 추가/교체합니다. 이전 메뉴의 posting은 남지만 검색 시 실제 문자열 확인에서 걸러집니다."""
+        names = [n for n in (normalize_menu(_menu_name(m)) for m in menus or []) if n]
+        with self._lock:
+            doc = self._doc_of.get(place_id)
+            if doc is None:
+                doc = len(self._place_ids)
+                self._doc_of[place_id] = doc
+                self._place_ids.append(place_id)
+                self._menus.append(names)
+            else:
+                self._menus[doc] = names
+                self._replaced.add(doc)
+            for gram in set().union(*(_grams(n) for n in names)) if names else ():
+                postings = self._postings.get(gram)
+                if postings is None:
+                    self._postings[gram] = array("i", [doc])
+                elif postings[-1] < doc:
+                    postings.append(doc)
+                elif not _contains(postings, doc):
+                    postings.insert(bisect_left(postings, doc), doc)
+
+    def _search_keyword(self, keyword: str) -> list:
+        # 1~2글자 키워드는 posting 자체가 정확한 결과. 3글자 이상은 2-gram만 교집합하면 충분합니다.
+        grams = {keyword} if len(keyword) <= 2 else {keyword[i:i + 2] for i in range(len(keyword) - 1)}
+        postings = [self._postings.get(g) for g in grams]
+        if any(p is None for p in postings):
+            return []
+        postings.sort(key=len)
+        docs = postings[0]
+        for other in postings[1:]:
+            docs = [d for d in docs if _contains(other, d)]
+            if not docs:
+                return []
+        # 3글자 이상은 2-gram이 모두 있어도 이어져 있지 않을 수 있고,
+        # 메뉴가 교체된 식당은 옛 posting이 남아 있으므로 실제 메뉴 이름으로 확인
+        if len(keyword) <= 2:
+            return [d for d in docs if d not in self._replaced or any(keyword in n for n in self._menus[d])]
+        return [d for d in docs if any(keyword in n for n in self._menus[d])]
+
+    def search(self, keywords: list) -> list:
+        """키워드 중 하나라도 메뉴 이름에 포함된 식당 ID (bring_menu_filter_restaurants와 같은 OR 조건)"""
+        found = []
+        seen = set()
+        with self._lock:
+            for keyword in keywords or []:
+                k = normalize_menu(keyword)
+                if not k:
+                    continue
+                for doc in self._search_keyword(k):
+                    if doc not in seen:
+                        seen.add(doc)
+                        found.append(self._place_ids[doc])
+        return found
+
+    def sync_from_log(self) -> int:
+        """로그 파일에서 지난번 이후 추가된 줄만 읽어 반영합니다. 반영한 식당 수를 반환."""
+        if not os.path.exists(self.log_path):
+            return 0
+        added = 0
+        with open(self.log_path, "r", encoding="utf-8") as f:
+            f.seek(self._log_offset)
+            while True:
+                line = f.readline()
+                if not line:
+                    break
+                if not line.endswith("\n"):
+                    break   # 크롤러가 아직 쓰는 중인 줄은 다음에 읽음
+                self._log_offset = f.tell()
+                try:
+                    entry = json.loads(line)
+                    if "build" in entry:
+                        build = entry["build"]
+                        self.coverage = build["indexed"] / build["places"] if build["places"] else 0.0
+                        print(f"🍽️ 메뉴 인덱스 백필 완료 표시: {build['indexed']}/{build['places']}곳 ({self.coverage:.0%})")
+                        continue
+                    self.add(int(entry["placeId"]), entry.get("menus", []))
+                    added += 1
+                except (ValueError, KeyError, TypeError) as e:
+                    print(f"⚠️ 메뉴 로그 줄 무시: {e}")
+        return added
+
+
+menu_index = MenuIndex()
+
+
+async def menu_index_refresher(interval: int = MENU_INDEX_REFRESH_SEC):
+    """FastAPI lifespan에서 백그라운드로 돌리는 갱신 루프."""
+    while True:
+        try:
+            added = await asyncio.to_thread(menu_index.sync_from_log)
+            if added:
+                print(f"🍽️ 메뉴 인덱스 갱신: {added}곳 반영, 전체 {len(menu_index)}곳")
+        except Exception as e:
+            print(f"⚠️ 메뉴 인덱스 갱신 중 오류: {e}")
+        await asyncio.sleep(interval)
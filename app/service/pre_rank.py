@@ -0,0 +1,89 @@
+import os
+import math
+
+# LLM 분석 전에 후보 식당을 싼 신호만으로 점수 매겨 상위 K곳만 남기는 단계
+# - 인기도: 0.6 * 평점 + 0.4 * log(리뷰 수 + 1)  (tools/recommend_location.py와 같은 공식)
+# - 키워드 겹침: 메뉴/상황 키워드가 이름, 카테고리, 메뉴, 리뷰에 얼마나 등장하는지
+# - 거리: 검색 중심 좌표에서 가까울수록 높음
+# - 상황 점수: 리뷰 BM25 색인(service/review_index.py)으로 조회했을 때의 점수, 후보 중 최고점 기준 0~1
+# 동네에 식당이 아무리 많아도 LLM으로 넘어가는 식당 수는 PRE_RANK_TOP_K로 고정됩니다.
+
+PRE_RANK_TOP_K = int(os.getenv("PRE_RANK_TOP_K", 10))
+PRE_RANK_RADIUS_M = float(os.getenv("PRE_RANK_RADIUS_M", 500))
+
+POPULARITY_WEIGHT = 1.0
+KEYWORD_WEIGHT = 2.0
+DISTANCE_WEIGHT = 1.0
+CONTEXT_WEIGHT = 1.0
+MAX_POPULARITY = 0.6 * 5.0 + 0.4 * math.log(1000 + 1)   # 정규화 기준 (평점 5.0, 리뷰 1000개)
+
+
+def popularity_score(restaurant: dict) -> float:
+    rating = restaurant.get("rating") or 0
+    review_count = restaurant.get("reviewCount") or 0
+    return 0.6 * rating + 0.4 * math.log(review_count + 1)
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    r = 6371000
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * r * math.asin(math.sqrt(a))
+
+
+def _searchable_text(restaurant: dict) -> str:
+    parts = [restaurant.get("name") or "", restaurant.get("category") or ""]
+    for menu in restaurant.get("menus") or []:
+        parts.append(menu.get("name", "") if isinstance(menu, dict) else str(menu))
+    for review in restaurant.get("reviews") or []:
+        parts.append(review.get("text", "") if isinstance(review, dict) else str(review))
+    return " ".join(parts)
+
+
+def keyword_score(restaurant: dict, keywords: list) -> float:
+    """키워드 중 식당 텍스트에 등장하는 비율 (0~1)"""
+    keywords = [k.strip() for k in keywords or [] if k and k.strip()]
+    if not keywords:
+        return 0.0
+    text = _searchable_text(restaurant)
+    return sum(1 for k in keywords if k in text) / len(keywords)
+
+
+def distance_score(restaurant: dict, center: dict, radius_m: float = PRE_RANK_RADIUS_M) -> float:
+    """중심에서 0m면 1, radius_m 이상이면 0. 좌표가 없으면 0."""
+    lat = restaurant.get("latitude")
+    lng = restaurant.get("longitude")
+    if not center or lat is None or lng is None:
+        return 0.0
+    try:
+        d = haversine_m(float(center["latitude"]), float(center["longitude"]), float(lat), float(lng))
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+    return max(0.0, 1.0 - d / radius_m)
+
+
+def pre_rank(
+    restaurants: list,
+    keywords: list = None,
+    center: dict = None,
+    top_k: int = PRE_RANK_TOP_K,
+    context_scores: dict = None,
+) -> list:
+    """
+    후보 식당에 preRankScore를 붙여 점수 내림차순으로 정렬하고 상위 top_k개만 반환합니다.
+    context_scores: {placeId: BM25 점수} (없으면 상황 점수 0)
+    """
+    context_scores = context_scores or {}
+    max_context = max(context_scores.values(), default=0) or 1.0
+    for r in restaurants:
+        score = (
+            POPULARITY_WEIGHT * popularity_score(r) / MAX_POPULARITY
+            + KEYWORD_WEIGHT * keyword_score(r, keywords)
+            + DISTANCE_WEIGHT * distance_score(r, center)
+            + CONTEXT_WEIGHT * context_scores.get(r.get("placeId"), 0) / max_context
+        )
+        r["preRankScore"] = round(score, 4)
+    ranked = sorted(restaurants, key=lambda r: r["preRankScore"], reverse=True)
+    return ranked[:top_k] if top_k else ranked
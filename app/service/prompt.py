@@ -1,4 +1,8 @@
 from langchain_core.prompts import PromptTemplate
+from service.review_select import select_reviews, REVIEW_TOKEN_BUDGET
+
+# review_prompt_template / build_review_prompt를 바꾸면 올려주세요. (llm/analysis_cache 키에 포함되어 기존 분석이 무효화됨)
+REVIEW_PROMPT_VERSION = "v1"
 
 review_prompt_template = PromptTemplate.from_template("""
 식당 이름: {name}
@@ -21,6 +25,9 @@ final_selection_prompt_template = PromptTemplate.from_template("""
 [사용자 요청]
 {user_input}
 
+[사용자 키워드]
+{keywords}
+
 [AI 분석 결과]
 {analyzed_results}
                                                             
@@ -35,6 +42,15 @@ final_selection_prompt_template = PromptTemplate.from_template("""
 3. AI평점 , 실제평점
 """)
 
+# 오프라인 태깅(data/tag_restaurants.py)에서 쓰는 상황/분위기/목적 태그 목록
+CONTEXT_TAGS = {
+    "상황": ["혼밥", "회식", "가족 외식", "단체", "접대"],
+    "분위기": ["조용한", "감성적인", "활기찬", "아늑한", "깔끔한"],
+    "목적": ["데이트", "가볍게 한잔", "술자리", "기념일", "가성비"],
+}
+# context_prompt_template / CONTEXT_TAGS를 바꾸면 올려주세요. (태깅 배치가 이 버전이 다른 식당만 다시 태깅함)
+CONTEXT_PROMPT_VERSION = "v1"
+
 context_prompt_template= PromptTemplate.from_template("""
     식당 이름: {name}
     실제 평점: {rating}
@@ -46,22 +62,37 @@ context_prompt_template= PromptTemplate.from_template("""
     ------------------------------
 
     리뷰를 기반으로 이 식당이 다음과 같은 측면에서 어떤지 판단하세요:
-    - 상황 (예: 혼밥, 회식, 가족 외식 등)
-    - 분위기 (예: 조용한, 감성적인, 활기찬 등)
-    - 목적 (예: 데이트, 가볍게 한잔 등)
+    - 상황: {situation_tags}
+    - 분위기: {mood_tags}
+    - 목적: {purpose_tags}
 
-    이 식당을 특정 상황/분위기/목적으로 추천할 수 있는 이유를 설명하고, AI 별점을 부여하세요.
+    위 태그 중 리뷰로 뒷받침되는 것만 골라 0.0~1.0 사이 점수를 매기세요.
+    리뷰에 근거가 없으면 넣지 마세요. 목록에 없는 태그는 만들지 마세요.
 
-    형식:
-    식당 이름) - 상세점보):식당url
-    추천이유)                                     
-    AI평점) , 실제평점)
+    답변형식(JSON만 출력):
+    {{
+        "tags": {{"혼밥": 0.9, "조용한": 0.7}}
+    }}
     """)
 
-def build_review_prompt(restaurant: dict) -> str:
-        reviews = restaurant.get("reviews", [])
-        review_text = "\n".join([rev["text"] for rev in reviews])
-        return review_prompt_template.format_prompt(
+def _budgeted_review_text(restaurant: dict, keywords: list, budget: int) -> str:
+    reviews, stats = select_reviews(restaurant.get("reviews", []), budget=budget, keywords=keywords)
+    if stats["tokens_saved"] > 0:
+        print(f"✂️ [{restaurant.get('placeId')}] 리뷰 {stats['total']}→{stats['selected']}개, 토큰 {stats['tokens_before']}→{stats['tokens_after']} ({stats['tokens_saved']} 절약)")
+    return "\n".join([rev["text"] for rev in reviews])
+
+
+def build_review_prompt(restaurant: dict, keywords: list = None, budget: int = REVIEW_TOKEN_BUDGET,
+                        selected_reviews: list = None) -> str:
+    """
+    selected_reviews: 이미 select_reviews로 고른 리뷰. 주면 다시 고르지 않고 그대로 넣습니다.
+    (analyze_restaurant는 고른 리뷰로 캐시 키를 만들므로 프롬프트도 같은 목록으로 만들어야 함)
+    """
+    if selected_reviews is not None:
+        review_text = "\n".join([rev["text"] for rev in selected_reviews])
+    else:
+        review_text = _budgeted_review_text(restaurant, keywords, budget)
+    return review_prompt_template.format_prompt(
         name=restaurant.get("name", "이름 없음"),
         rating=restaurant.get("rating", 0.0),
         reviewCount=restaurant.get("reviewCount", 0),
@@ -69,7 +100,8 @@ def build_review_prompt(restaurant: dict) -> str:
         review_text=review_text
     ).to_string()
 
-def build_final_recommendation_prompt(analyzed_restaurants: list, input_text:str) -> str:
+def build_final_recommendation_prompt(analyzed_restaurants: list, input_text:str, keywords: list = None) -> str:
+    """keywords: 사용자 메뉴/상황 키워드. 식당별 분석은 키워드 없이 캐시하므로 여기서 반영합니다."""
     text_blocks = []
     for r in analyzed_restaurants:
         name = r["name"]
@@ -83,17 +115,19 @@ def build_final_recommendation_prompt(analyzed_restaurants: list, input_text:str
 
     return final_selection_prompt_template.format_prompt(
         user_input = input_text,
+        keywords=", ".join(keywords) if keywords else "없음",
         analyzed_results=combined
     ).to_string()
 
 
-def build_context_prompt(restaurant:dict):
-    reviews = restaurant.get("reviews", [])
-    review_text = "\n".join([rev["text"] for rev in reviews])
+def build_context_prompt(restaurant:dict, budget: int = REVIEW_TOKEN_BUDGET):
+    review_text = _budgeted_review_text(restaurant, None, budget)
     return context_prompt_template.format(
     name=restaurant.get("name", "이름 없음"),
     rating=restaurant.get("rating", 0.0),
     reviewCount=restaurant.get("reviewCount", 0),
-    url=restaurant.get("url", "URL 없음"),
-    review_text=review_text
+    review_text=review_text,
+    situation_tags=", ".join(CONTEXT_TAGS["상황"]),
+    mood_tags=", ".join(CONTEXT_TAGS["분위기"]),
+    purpose_tags=", ".join(CONTEXT_TAGS["목적"]),
     )
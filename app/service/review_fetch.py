@@ -1,20 +1,22 @@
 import httpx
 import os
-from dotenv import load_dotenv
+from http_client import get_http_client
+from auth_context import get_request_token
+from config import load_env
 # time, json, base64 임포트 제거
 
-load_dotenv()
+load_env()
 
 SPRING_SERVER = "http://localhost:8080" # <-- 동일하게 localhost 또는 mooin.shop:8080
 
 # --- 토큰 관리 변수 (단순화: Access Token만 사용) ---
 # 전역 변수 ACCESS_TOKEN, REFRESH_TOKEN, TOKEN_EXPIRY_TIME 제거
-# 매번 os.getenv("JWT_TOKEN")으로 최신 토큰을 읽어옵니다.
+# 매번 get_request_token()으로 현재 요청의 토큰을 읽어옵니다. (os.environ 공유 X)
 
 # --- httpx 버전 인증 요청 함수 (토큰 갱신 제거) ---
 async def _make_authenticated_request_httpx(method, url, json_data=None, params=None):
-    # JWT_TOKEN 환경 변수에서 현재 Access Token 로드
-    current_access_token = os.getenv("JWT_TOKEN")
+    # 현재 요청 컨텍스트에서 Access Token 로드
+    current_access_token = get_request_token()
     
     if not current_access_token:
         raise RuntimeError("Authentication required: Access Token is not set. Please log in manually.")
@@ -29,16 +31,17 @@ async def _make_authenticated_request_httpx(method, url, json_data=None, params=
     print(f"🔐 Headers (Authorization token masked): {{'Content-Type': '{headers.get('Content-Type')}', 'Authorization': 'Bearer ...'}}" )
 
     try:
-        async with httpx.AsyncClient() as client:
-            if method == "POST":
-                response = await client.post(url, json=json_data, headers=headers, params=params, timeout=15)
-            elif method == "GET":
-                response = await client.get(url, headers=headers, params=params, timeout=15)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+        # 매번 AsyncClient를 새로 열지 않고 공유 커넥션 풀을 재사용
+        client = get_http_client()
+        if method == "POST":
+            response = await client.post(url, json=json_data, headers=headers, params=params)
+        elif method == "GET":
+            response = await client.get(url, headers=headers, params=params)
+        else:
+            raise ValueError(f"Unsupported HTTP method: {method}")
 
-            response.raise_for_status()
-            return response
+        response.raise_for_status()
+        return response
     except httpx.RequestError as e:
         print(f"❌ API call to {url} failed: {e}")
         if e.response is not None:
@@ -0,0 +1,154 @@
+import os
+import re
+import json
+import math
+import mmap
+import asyncio
+from array import array
+from collections import Counter
+
+# 상황/분위기 키워드용 BM25 리뷰 색인
+# 식당 하나 = 문서 하나(리뷰 전체). 한국어 형태소 분석기 없이 글자 2-gram을 단어로 씁니다.
+# data/build_review_index.py가 오프라인으로 만들고, 서버는 postings.bin을 mmap으로 열어서 씁니다.
+#
+# 파일 형식 (REVIEW_INDEX_DIR)
+# - meta.json   : {"terms": {term: [offset, df]}, "place_ids": [...], "doc_len": [...], "avgdl": float}
+# - postings.bin: term마다 (doc 번호, tf) int32 쌍을 df개씩 이어 붙인 배열. offset은 쌍 단위
+
+REVIEW_INDEX_DIR = os.getenv(
+    "REVIEW_INDEX_DIR",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "cache", "review_index")),
+)
+BM25_K1 = 1.2
+BM25_B = 0.75
+CONTEXT_BM25_MIN_SCORE = float(os.getenv("CONTEXT_BM25_MIN_SCORE", 2.0))
+CONTEXT_BM25_TOP_N = int(os.getenv("CONTEXT_BM25_TOP_N", 200))
+
+
+def tokenize(text: str) -> list:
+    text = re.sub(r"[\s\W_]+", "", (text or "").lower())
+    if len(text) < 2:
+        return [text] if text else []
+    return [text[i:i + 2] for i in range(len(text) - 1)]
+
+
+def build_review_index(documents: dict, out_dir: str = REVIEW_INDEX_DIR):
+    """
+    documents: {place_id: [리뷰 텍스트, ...]} → out_dir에 meta.json / postings.bin 저장
+    쓰는 도중 서버가 읽지 않도록 임시 파일에 쓴 뒤 이름을 바꿉니다.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    place_ids = []
+    doc_len = []
+    term_postings = {}
+    for doc, (place_id, reviews) in enumerate(documents.items()):
+        tf = Counter()
+        for text in reviews:
+            tf.update(tokenize(text))
+        place_ids.append(int(place_id))
+        doc_len.append(sum(tf.values()))
+        for term, count in tf.items():
+            term_postings.setdefault(term, []).append((doc, count))
+
+    terms = {}
+    postings = array("i")
+    for term, plist in term_postings.items():
+        terms[term] = [len(postings) // 2, len(plist)]
+        for doc, count in plist:
+            postings.append(doc)
+            postings.append(count)
+
+    avgdl = sum(doc_len) / len(doc_len) if doc_len else 0.0
+    meta = {"terms": terms, "place_ids": place_ids, "doc_len": doc_len, "avgdl": avgdl}
+
+    postings_path = os.path.join(out_dir, "postings.bin")
+    meta_path = os.path.join(out_dir, "meta.json")
+    with open(postings_path + ".tmp", "wb") as f:
+        postings.tofile(f)
+    with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(postings_path + ".tmp", postings_path)
+    os.replace(meta_path + ".tmp", meta_path)
+    print(f"📚 리뷰 색인 저장: 식당 {len(place_ids)}곳, 단어 {len(terms)}개, posting {len(postings) // 2}개")
+
+
+class ReviewIndex:
+    def __init__(self, index_dir: str = REVIEW_INDEX_DIR):
+        self.index_dir = index_dir
+        self._terms = {}
+        self._place_ids = []
+        self._doc_len = []
+        self._avgdl = 0.0
+        self._postings = None
+        self._mmap = None
+        self._file = None
+
+    @property
+    def ready(self) -> bool:
+        return self._postings is not None and bool(self._place_ids)
+
+    def load(self) -> bool:
+        """색인 파일이 있으면 postings를 mmap으로 엽니다. 없으면 False."""
+        meta_path = os.path.join(self.index_dir, "meta.json")
+        postings_path = os.path.join(self.index_dir, "postings.bin")
+        if not (os.path.exists(meta_path) and os.path.exists(postings_path)):
+            return False
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        file = open(postings_path, "rb")
+        if os.fstat(file.fileno()).st_size == 0:
+            file.close()
+            return False
+        mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.close()
+        self._terms = meta["terms"]
+        self._place_ids = meta["place_ids"]
+        self._doc_len = meta["doc_len"]
+        self._avgdl = meta["avgdl"] or 1.0
+        self._file, self._mmap = file, mm
+        self._postings = memoryview(mm).cast("i")
+        print(f"📚 리뷰 색인 로드: 식당 {len(self._place_ids)}곳, 단어 {len(self._terms)}개")
+        return True
+
+    def close(self):
+        if self._postings is not None:
+            self._postings.release()
+            self._postings = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def search(self, keywords: list, min_score: float = CONTEXT_BM25_MIN_SCORE, top_n: int = CONTEXT_BM25_TOP_N) -> list:
+        """키워드들의 BM25 점수 합으로 (place_id, score)를 점수 내림차순으로 반환합니다."""
+        if not self.ready:
+            return []
+        n_docs = len(self._place_ids)
+        scores = {}
+        for term in {t for k in keywords or [] for t in tokenize(k)}:
+            entry = self._terms.get(term)
+            if entry is None:
+                continue
+            offset, df = entry
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            pairs = self._postings[offset * 2:(offset + df) * 2]
+            for i in range(0, len(pairs), 2):
+                doc, tf = pairs[i], pairs[i + 1]
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_len[doc] / self._avgdl)
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        ranked = sorted(((s, d) for d, s in scores.items() if s >= min_score), reverse=True)[:top_n]
+        return [(self._place_ids[d], round(s, 4)) for s, d in ranked]
+
+
+review_index = ReviewIndex()
+
+
+async def load_review_index():
+    """FastAPI lifespan에서 호출. 색인이 없으면 그대로 두고 Spring 필터를 사용합니다."""
+    try:
+        if not await asyncio.to_thread(review_index.load):
+            print("ℹ️ 리뷰 색인이 없어 상황 필터는 태그/Spring 조회를 사용합니다. (data/build_review_index.py)")
+    except Exception as e:
+        print(f"⚠️ 리뷰 색인 로드 실패: {e}")
@@ -0,0 +1,87 @@
+import os
+import re
+import math
+
+# 프롬프트에 넣을 리뷰를 토큰 예산 안에서 고르는 단계
+# 인기 식당은 리뷰가 수백 개라 전부 이어 붙이면 프롬프트가 너무 커지므로
+# 1) 완전 중복 / 거의 같은 리뷰 제거  2) 길고 정보가 많은 리뷰, 사용자 키워드를 언급한 리뷰 우선
+# 3) 예산(REVIEW_TOKEN_BUDGET)이 찰 때까지 채웁니다.
+
+REVIEW_TOKEN_BUDGET = int(os.getenv("REVIEW_TOKEN_BUDGET", 1500))
+NEAR_DUPLICATE_THRESHOLD = 0.8
+KEYWORD_BONUS = 2.0
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    토크나이저 없이 쓰는 대략적인 토큰 수.
+    한글은 대략 1.5~2글자에 1토큰이라 보수적으로 글자 수 / 1.5로 계산합니다.
+    """
+    return math.ceil(len(text) / 1.5) if text else 0
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"[\s\W_]+", "", text.lower())
+
+
+def _shingles(text: str, n: int = 3) -> set:
+    return {text[i:i + n] for i in range(max(len(text) - n + 1, 1))}
+
+
+def _jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _review_score(text: str, normalized: str, keywords: list) -> float:
+    # 길이는 로그로 반영 (아주 긴 리뷰 하나가 예산을 독차지하지 않게)
+    length = math.log(len(normalized) + 1)
+    # 같은 글자 반복("ㅋㅋㅋㅋ", "맛있어요맛있어요")은 정보량이 적음
+    variety = len(set(normalized)) / len(normalized) if normalized else 0.0
+    mentions = sum(1 for k in keywords if k and k in text)
+    return length * (0.5 + variety) + KEYWORD_BONUS * mentions
+
+
+def select_reviews(reviews: list, budget: int = REVIEW_TOKEN_BUDGET, keywords: list = None):
+    """
+    reviews([{"text": ...}])에서 예산 안에 들어가는 리뷰를 골라 (선택된 리뷰, 통계)를 반환합니다.
+    통계: {"total": 원래 리뷰 수, "selected": 선택 수, "tokens_before", "tokens_after", "tokens_saved"}
+    """
+    keywords = [k.strip() for k in keywords or [] if k and k.strip()]
+    texts = [(r.get("text", "") if isinstance(r, dict) else str(r)).strip() for r in reviews or []]
+    tokens_before = sum(estimate_tokens(t) for t in texts)
+
+    # 완전 중복 제거 (공백/특수문자만 다른 것도 같은 리뷰로 봄)
+    unique = {}
+    for text in texts:
+        normalized = _normalize(text)
+        if normalized and normalized not in unique:
+            unique[normalized] = text
+
+    candidates = sorted(
+        unique.items(), key=lambda item: _review_score(item[1], item[0], keywords), reverse=True
+    )
+
+    selected = []
+    selected_shingles = []
+    used = 0
+    for normalized, text in candidates:
+        cost = estimate_tokens(text)
+        if used + cost > budget:
+            continue
+        shingles = _shingles(normalized)
+        if any(_jaccard(shingles, s) >= NEAR_DUPLICATE_THRESHOLD for s in selected_shingles):
+            continue
+        selected.append({"text": text})
+        selected_shingles.append(shingles)
+        used += cost
+
+    stats = {
+        "total": len(texts),
+        "selected": len(selected),
+        "tokens_before": tokens_before,
+        "tokens_after": used,
+        "tokens_saved": tokens_before - used,
+    }
+    return selected, stats
@@ -1,16 +1,79 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import PromptTemplate
+from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.pydantic_v1 import BaseModel, Field
 import json
 import re
-from dotenv import load_dotenv
+import asyncio
 import requests
 import os
+from service.geocode_cache import geocode_cache
+from service.intent_router import route_followup
+from auth_context import get_request_token, set_request_token
+from config import load_env, get_service_token, place_id_of
+from llm.clients import get_llm
+from llm.llm_scheduler import is_retryable
 
-load_dotenv()
+load_env()
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
-llm = ChatGoogleGenerativeAI(model="models/gemini-1.5-pro", google_api_key=GOOGLE_API_KEY)
+class RequestExtraction(BaseModel):
+    location: str = Field(description="장소명(지역, 건물, 역 등). 없으면 빈 문자열")
+    menu_keywords: list[str] = Field(default_factory=list, description="음식 키워드. 최대한 짧은 단위 (매운 음식->매운, 초밥집->초밥, 고깃집->고기)")
+    context_keywords: list[str] = Field(default_factory=list, description="분위기, 목적, 상황 키워드 (혼밥, 조용한, 가볍게 한잔 등). 장소/음식은 제외")
+
+
+extraction_parser = PydanticOutputParser(pydantic_object=RequestExtraction)
+
+extraction_prompt = PromptTemplate.from_template(
+    """다음 문장에서 장소명, 음식 키워드, 분위기/목적/상황 키워드를 한 번에 추출해줘.
+        - location: 장소명(예: 지역, 건물, 역 등)만 정확히. 설명하지 마.
+        - menu_keywords: 음식 키워드. 최대한 짧은 단위로 나누고 쓸모없는 키워드는 제거.
+        - context_keywords: 식당의 분위기, 식당을 가는 목적, 입력자의 상황. 장소, 음식에 관련된건 넣지 마.
+        ----------------------------------------------
+
+        문장: {text}
+
+        ----------------------------------------------
+        {format_instructions}
+        """,
+    partial_variables={"format_instructions": extraction_parser.get_format_instructions()},
+)
+
+_extraction_chain = None
+
+
+def get_extraction_chain():
+    # Gemini 클라이언트는 첫 호출 때 만들어지므로 체인도 그때 한 번만 구성
+    global _extraction_chain
+    if _extraction_chain is None:
+        _extraction_chain = extraction_prompt | get_llm() | extraction_parser
+    return _extraction_chain
+
+
+def empty_extraction() -> dict:
+    return RequestExtraction(location="").dict()
+
+
+def extract_request_info(text: str, raise_retryable: bool = False) -> dict:
+    """
+    get_location_from_text / get_location_and_menu / get_location_and_context를 한 번의 LLM 호출로 대체합니다.
+    스키마(RequestExtraction)로 검증된 {location, menu_keywords, context_keywords}를 반환합니다.
+    raise_retryable=True면 429/5xx/타임아웃 에러를 그대로 올려서 호출하는 쪽(llm_scheduler.run)이 재시도하게 합니다.
+    그 밖의 에러(파싱 실패 등)는 빈 추출 결과로 대체합니다.
+    """
+    try:
+        result = get_extraction_chain().invoke({"text": text})
+        data = result.dict()
+    except Exception as e:
+        if raise_retryable and is_retryable(e):
+            raise
+        print(f"❌ 추출 결과 파싱 실패: {e}")
+        data = empty_extraction()
+    data["location"] = data["location"].strip()
+    print("🧩 추출 결과:", data)
+    return data
+
 
 def get_location_and_context(text: str):
     prompt = PromptTemplate.from_template(
@@ -27,7 +90,7 @@ def get_location_and_context(text: str):
         }}
         """
     )
-    chain = prompt | llm
+    chain = prompt | get_llm()
     result = chain.invoke({"text": text})
     try:
         json_str = re.search(r'\{.*\}', result.content, re.DOTALL)
@@ -58,7 +121,7 @@ def get_location_and_menu(text: str):
         }}
         """
     )
-    chain = prompt | llm
+    chain = prompt | get_llm()
     result = chain.invoke({"text": text})
     try:
         json_str = re.search(r'\{.*\}', result.content, re.DOTALL)
@@ -76,7 +139,7 @@ def get_location_from_text(text: str) -> str:
     prompt = PromptTemplate.from_template(
     "다음 문장에서 장소명(예: 지역, 건물, 역 등)만 정확히 추출해줘. 설명하지 말고 장소명만 말해 .문장: {text}"
     )
-    chain = prompt | llm
+    chain = prompt | get_llm()
     result = chain.invoke({"text": text})
     location = result.content.strip()
     print(location)
@@ -85,8 +148,31 @@ def get_location_from_text(text: str) -> str:
 def get_coordinates_from_location(location: str) -> str: 
     """
     장소명을 위도, 경도로 변환합니다. (예: 성신여자대학교 → 37.5928015,127.0166047)
-    Google Maps Geocoding API 사용
+    geocode_cache를 먼저 확인하고, 없을 때만 Google Maps Geocoding API를 호출합니다.
+    """
+    cached = geocode_cache.get(location)
+    if cached is not None:
+        return cached
+
+    result = _geocode_from_google(location)
+    if "error" not in result or result.pop("not_found", False):
+        # 성공 결과와 "장소를 찾을 수 없음"만 캐시. 네트워크 오류/쿼터 초과는 다음 요청에서 재시도.
+        geocode_cache.set(location, result)
+    return result
+
+
+async def get_coordinates_from_location_async(location: str) -> dict:
     """
+    이벤트 루프용 get_coordinates_from_location. 메모리 LRU에 있으면 바로 반환하고,
+    SQLite 캐시 / Google API 조회는 스레드에서 실행해 디스크·네트워크 지연이 루프를 막지 않게 합니다.
+    """
+    cached = geocode_cache.get_memory(location)
+    if cached is not None:
+        return cached
+    return await asyncio.to_thread(get_coordinates_from_location, location)
+
+
+def _geocode_from_google(location: str) -> dict:
     url = "https://maps.googleapis.com/maps/api/geocode/json"
     params = {
         "address": location,
@@ -94,7 +180,7 @@ def get_coordinates_from_location(location: str) -> str:
     }
    
     try:
-        response = requests.get(url, params=params)
+        response = requests.get(url, params=params, timeout=5)
         data = response.json()
 
         if data.get("status") == "OK" and data.get("results"):
@@ -106,17 +192,17 @@ def get_coordinates_from_location(location: str) -> str:
                     "latitude": lat, "longitude": lng
                 }
             else:
-                return {"error": "위도 또는 경도 정보가 없습니다."}
+                return {"error": "위도 또는 경도 정보가 없습니다.", "not_found": True}
         else:
             return {
-                "error": f"API 실패: {data.get('status')}, {data.get('error_message', '원인 미상')}"
+                "error": f"API 실패: {data.get('status')}, {data.get('error_message', '원인 미상')}",
+                "not_found": data.get("status") == "ZERO_RESULTS",
             }
     except Exception as e:
         return {"error": f"예외 발생: {str(e)}"}
     
 
-SPRING_SERVER = "http://mooin.shop:8080"
-JWT_TOKEN = os.getenv("JWT_TOKEN")
+SPRING_SERVER = os.getenv("SPRING_DB_SERVER", "http://mooin.shop:8080")  # bring_to_server.SPRING_DB_SERVER와 같은 값
 def get_nearby_restaurants_DB(latitude: float, longitude: float, radius: int) -> dict:
     params = {
         "lat": latitude,
@@ -124,7 +210,7 @@ def get_nearby_restaurants_DB(latitude: float, longitude: float, radius: int) ->
         "radius": radius
     }
     url = f"{SPRING_SERVER}/api/restaurants"
-    headers = {"Authorization": f"Bearer {JWT_TOKEN}"}
+    headers = {"Authorization": f"Bearer {get_request_token()}"}
     try:
         response = requests.get(url, headers=headers, params=params)
         if response.status_code == 200:
@@ -137,11 +223,15 @@ def get_nearby_restaurants_DB(latitude: float, longitude: float, radius: int) ->
     
 
 
-def findall_restaurants_DB() -> dict:
+def findall_restaurants_DB(token: str = None) -> dict:
+    """
+    전체 식당 카탈로그. 요청 밖(lifespan, 오프라인 스크립트)에서 부르므로 서비스 토큰을 씁니다.
+    토큰이 없으면 RuntimeError (조용히 실패하지 않음)
+    """
     url = f"{SPRING_SERVER}/api/restaurants/all"
-    headers = {"Authorization": f"Bearer {JWT_TOKEN}"}
+    headers = {"Authorization": f"Bearer {token or get_service_token()}"}
     try:
-        response = requests.get(url, headers=headers)
+        response = requests.get(url, headers=headers, timeout=60)
         if response.status_code == 200:
             data = response.json()
             return {"restaurants": data}  
@@ -149,10 +239,23 @@ def findall_restaurants_DB() -> dict:
             return {"restaurants": None}
     except Exception as e:
         return {"error": f"예외 발생: {str(e)}"}
-    
-    
 
-def next_tool(user_input: str):
+
+async def load_catalog_ids():
+    """
+    오프라인 스크립트(data/build_menu_index, build_review_index, tag_restaurants)가 쓰는 전체 식당 ID 목록.
+    요청이 없는 실행이므로 이후 Spring 호출(bring_*)도 서비스 토큰으로 보내도록 현재 컨텍스트에 설정합니다.
+    서비스 토큰이 없으면 RuntimeError, 목록을 받지 못하면 None.
+    """
+    set_request_token(get_service_token())
+    data = await asyncio.to_thread(findall_restaurants_DB)
+    if "error" in data or data.get("restaurants") is None:
+        print(f"❌ 식당 목록을 불러오지 못했습니다: {data}")
+        return None
+    return [place_id_of(r) for r in data["restaurants"]]
+
+
+def _llm_next_tool(user_input: str) -> str:
     prompt = PromptTemplate.from_template("""
         다음은 사용자의 요청입니다: "{user_input}"
 
@@ -166,13 +269,13 @@ def next_tool(user_input: str):
         반드시 위 네 개 중 하나만 이름만 단독으로 출력하세요.
         """
     )
-    chain = prompt | llm
+    chain = prompt | get_llm()
     result = chain.invoke({"user_input":user_input})
-    tool_name = result.content.strip().lower()
-    print("🔀 분기 도구:", tool_name)
-    return {
-        "restart": "location_node",
-        "show_menu": "menu_node",
-        "another_restaurants": "intersection_node",
-        "another_menu": "menu_node",
-    }.get(tool_name, "end")
+    return result.content.strip().lower()
+
+
+async def next_tool(user_input: str):
+    # 대부분의 후속 요청은 로컬 분류기(service/intent_router.py)로 끝나고, 애매할 때만 Gemini를 호출합니다.
+    next_node = await route_followup(user_input, _llm_next_tool)
+    print("🔀 분기 노드:", next_node)
+    return next_node
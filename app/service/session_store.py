@@ -0,0 +1,116 @@
+import os
+import json
+import time
+import uuid
+import hashlib
+import secrets
+import threading
+from collections import OrderedDict
+
+# 대화(conversation_id)별로 그래프 중간 결과를 서버에 보관하는 세션 저장소
+# 후속 요청("다른 식당 추천해줘")은 여기 남은 location/menu/context/후보/상세 정보를 이어받아
+# next_tool이 고른 노드부터 다시 실행합니다. 메모리에만 두며, TTL과 LRU(개수 + 대략적인 바이트 수)로 제한합니다.
+# 세션을 만들 때 conversation_id와 함께 session_key(대화별 비밀값)를 발급하고 해시만 남겨서,
+# session_key를 받은 클라이언트만 이어서 쓸 수 있게 합니다. (JWT에 묶으면 대화 중 토큰이 갱신될 때 세션을 잃음)
+
+SESSION_TTL = int(os.getenv("SESSION_TTL", 60 * 30))                       # 마지막 사용 후 30분
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", 1000))
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", 64 * 1024 * 1024))
+
+SESSION_KEYS = (
+    "user_input",
+    "extraction",
+    "location",
+    "menu",
+    "context",
+    "candidates",
+    "restaurant_details",
+    "excluded",
+    "result",
+)
+
+
+def _owner(session_key: str) -> str:
+    return hashlib.sha256((session_key or "").encode("utf-8")).hexdigest()
+
+
+class SessionStore:
+    def __init__(self, ttl: int = SESSION_TTL, max_entries: int = SESSION_MAX_ENTRIES,
+                 max_bytes: int = SESSION_MAX_BYTES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+        self._sessions = OrderedDict()   # conversation_id -> (owner, state, size, expires_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    @staticmethod
+    def new_id() -> str:
+        return uuid.uuid4().hex
+
+    @staticmethod
+    def new_key() -> str:
+        """conversation_id와 함께 클라이언트에 돌려주는 session_key"""
+        return secrets.token_urlsafe(32)
+
+    def get(self, conversation_id: str, session_key: str):
+        """세션 state(dict 사본)를 반환. 없거나 만료되었거나 session_key가 다르면 None."""
+        now = time.time()
+        with self._lock:
+            entry = self._sessions.get(conversation_id)
+            if entry is None or entry[0] != _owner(session_key):
+                self.stats["misses"] += 1
+                return None
+            if entry[3] <= now:
+                self._forget(conversation_id)
+                self.stats["misses"] += 1
+                return None
+            owner, state, size, _ = entry
+            self._sessions[conversation_id] = (owner, state, size, now + self.ttl)
+            self._sessions.move_to_end(conversation_id)
+            self.stats["hits"] += 1
+            return dict(state)
+
+    def save(self, conversation_id: str, state: dict, session_key: str):
+        """그래프 결과 중 후속 요청에 필요한 키만 저장합니다."""
+        state = {k: state[k] for k in SESSION_KEYS if k in state}
+        size = len(json.dumps(state, ensure_ascii=False, default=str).encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._forget(conversation_id)
+            self._sessions[conversation_id] = (_owner(session_key), state, size, now + self.ttl)
+            self._bytes += size
+            self._evict(now)
+
+    def delete(self, conversation_id: str):
+        with self._lock:
+            self._forget(conversation_id)
+
+    def _forget(self, conversation_id):
+        entry = self._sessions.pop(conversation_id, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def _evict(self, now):
+        for conversation_id in [cid for cid, e in self._sessions.items() if e[3] <= now]:
+            self._forget(conversation_id)
+            self.stats["evictions"] += 1
+        # 가장 오래 안 쓴 세션부터 제거. 방금 저장한 세션 하나는 남김
+        while len(self._sessions) > 1 and (
+            len(self._sessions) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            conversation_id = next(iter(self._sessions))
+            self._forget(conversation_id)
+            self.stats["evictions"] += 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {**self.stats, "sessions": len(self._sessions), "bytes": self._bytes}
+
+
+session_store = SessionStore()
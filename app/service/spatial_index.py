@@ -0,0 +1,172 @@
+import os
+import math
+import time
+import heapq
+import asyncio
+import threading
+
+from config import place_id_of
+from service.pre_rank import haversine_m
+
+# 주변 식당 조회용 메모리 공간 인덱스 (위도/경도 격자)
+# 식당 카탈로그는 고정된 서울 범위 안에 있고 자주 바뀌지 않으므로, 카탈로그 전체를 격자 셀에 넣어두고
+# 반경/최근접 조회를 로컬에서 처리합니다. 인덱스가 비어 있거나 범위 밖 좌표면 Spring 조회로 넘어갑니다.
+
+# data/save_data.py의 LAT_START..LNG_END와 같은 크롤링 범위
+LAT_START = 37.41992
+LAT_END = 37.67961
+LNG_START = 126.8059
+LNG_END = 127.1683
+
+CELL_LAT = 0.0025   # 약 280m
+CELL_LNG = 0.003    # 위도 37.5도에서 약 265m
+METERS_PER_DEG_LAT = 111320
+SPATIAL_INDEX_REFRESH_SEC = int(os.getenv("SPATIAL_INDEX_REFRESH_SEC", 600))
+
+
+class SpatialIndex:
+    def __init__(self):
+        self._cells = {}        # (row, col) -> {place_id: (lat, lng)}
+        self._points = {}       # place_id -> (lat, lng)
+        self._lock = threading.Lock()
+        self.loaded_at = None
+
+    def __len__(self):
+        return len(self._points)
+
+    def place_ids(self) -> set:
+        with self._lock:
+            return set(self._points)
+
+    @property
+    def ready(self) -> bool:
+        return bool(self._points)
+
+    @staticmethod
+    def _cell(lat: float, lng: float):
+        return (int((lat - LAT_START) // CELL_LAT), int((lng - LNG_START) // CELL_LNG))
+
+    @staticmethod
+    def covers(lat: float, lng: float) -> bool:
+        return LAT_START <= lat <= LAT_END and LNG_START <= lng <= LNG_END
+
+    def upsert(self, restaurants: list) -> int:
+        """좌표가 있는 식당만 추가/갱신합니다. 좌표가 바뀐 식당은 셀을 옮깁니다. 변경된 수를 반환."""
+        changed = 0
+        with self._lock:
+            for r in restaurants:
+                try:
+                    place_id = place_id_of(r)
+                    lat, lng = float(r["latitude"]), float(r["longitude"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                old = self._points.get(place_id)
+                if old == (lat, lng):
+                    continue
+                if old is not None:
+                    self._cells.get(self._cell(*old), {}).pop(place_id, None)
+                self._points[place_id] = (lat, lng)
+                self._cells.setdefault(self._cell(lat, lng), {})[place_id] = (lat, lng)
+                changed += 1
+            self.loaded_at = time.time()
+        return changed
+
+    def remove(self, place_ids) -> int:
+        removed = 0
+        with self._lock:
+            for place_id in place_ids:
+                point = self._points.pop(place_id, None)
+                if point is not None:
+                    self._cells.get(self._cell(*point), {}).pop(place_id, None)
+                    removed += 1
+        return removed
+
+    def _cells_around(self, lat: float, lng: float, radius_m: float):
+        dlat = radius_m / METERS_PER_DEG_LAT
+        dlng = radius_m / (METERS_PER_DEG_LAT * max(math.cos(math.radians(lat)), 1e-6))
+        row_min, col_min = self._cell(lat - dlat, lng - dlng)
+        row_max, col_max = self._cell(lat + dlat, lng + dlng)
+        for row in range(row_min, row_max + 1):
+            for col in range(col_min, col_max + 1):
+                cell = self._cells.get((row, col))
+                if cell:
+                    yield cell
+
+    def radius_query(self, lat: float, lng: float, radius_m: float) -> list:
+        """반경 안의 (place_id, 거리m)를 가까운 순으로 반환합니다."""
+        with self._lock:
+            hits = []
+            for cell in self._cells_around(lat, lng, radius_m):
+                for place_id, (plat, plng) in cell.items():
+                    d = haversine_m(lat, lng, plat, plng)
+                    if d <= radius_m:
+                        hits.append((place_id, d))
+        hits.sort(key=lambda h: h[1])
+        return hits
+
+    def nearest(self, lat: float, lng: float, k: int, max_radius_m: float = 5000) -> list:
+        """가장 가까운 k곳의 (place_id, 거리m). 셀 한 칸씩 반경을 넓혀가며 찾습니다."""
+        step = CELL_LAT * METERS_PER_DEG_LAT
+        radius = step
+        while True:
+            with self._lock:
+                candidates = []
+                for cell in self._cells_around(lat, lng, radius):
+                    for place_id, (plat, plng) in cell.items():
+                        candidates.append((haversine_m(lat, lng, plat, plng), place_id))
+            best = heapq.nsmallest(k, candidates)
+            # k개를 찾았고 k번째가 현재 탐색 반경 안이면 더 넓혀도 순위가 바뀌지 않음
+            if (len(best) >= k and best[-1][0] <= radius) or radius >= max_radius_m:
+                return [(place_id, d) for d, place_id in best if d <= max_radius_m]
+            radius += step
+
+    def nearby_restaurants(self, lat: float, lng: float, radius_m: float) -> dict:
+        """bring_nearby_restaurants와 같은 {"restaurants": [placeId, ...]} 형태 (가까운 순)"""
+        return {"restaurants": [place_id for place_id, _ in self.radius_query(lat, lng, radius_m)]}
+
+
+spatial_index = SpatialIndex()
+
+
+def refresh_spatial_index(catalog: list):
+    """
+    카탈로그 전체를 받아 바뀐 식당만 반영합니다. (새 식당/좌표 변경은 upsert, 없어진 식당은 제거)
+    """
+    current_ids = set()
+    located = 0
+    for r in catalog:
+        try:
+            current_ids.add(place_id_of(r))
+        except (KeyError, TypeError, ValueError):
+            continue
+        if isinstance(r, dict) and r.get("latitude") is not None and r.get("longitude") is not None:
+            located += 1
+    if catalog and not located:
+        # 좌표 없는 카탈로그로 갱신하면 인덱스가 비어 모든 조회가 Spring으로 넘어가므로 바로 알림
+        raise ValueError(f"카탈로그 {len(catalog)}곳 중 latitude/longitude가 있는 식당이 없습니다. (/api/restaurants/all 응답 확인)")
+    if located < len(current_ids):
+        print(f"⚠️ 좌표 없는 식당 {len(current_ids) - located}곳은 공간 인덱스에서 제외")
+    changed = spatial_index.upsert(catalog)
+    removed = spatial_index.remove(spatial_index.place_ids() - current_ids)
+    print(f"🗺️ 공간 인덱스 갱신: 변경 {changed}곳, 삭제 {removed}곳, 전체 {len(spatial_index)}곳")
+
+
+async def spatial_index_refresher(load_catalog, interval: int = SPATIAL_INDEX_REFRESH_SEC):
+    """
+    FastAPI lifespan에서 백그라운드로 돌리는 갱신 루프.
+    load_catalog는 식당 목록({"restaurants": [...]})을 반환하는 동기 함수입니다. (예: findall_restaurants_DB)
+    서비스 토큰이 없으면(RuntimeError) 다시 시도해도 소용없으므로 루프를 끝내고 Spring 조회만 씁니다.
+    """
+    while True:
+        try:
+            data = await asyncio.to_thread(load_catalog)
+            if data.get("restaurants"):
+                refresh_spatial_index(data["restaurants"])
+            else:
+                print(f"⚠️ 공간 인덱스 갱신 실패, Spring 조회로 대체합니다: {data}")
+        except RuntimeError as e:
+            print(f"❌ 공간 인덱스를 켜지 못했습니다: {e}")
+            return
+        except Exception as e:
+            print(f"⚠️ 공간 인덱스 갱신 중 오류: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# 앱 모듈은 app/ 기준 import(service.*, tools.*), 크롤러 모듈은 app/data 기준 import(crawl_journal 등)를 씁니다.
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+for path in (APP_DIR, os.path.join(APP_DIR, "data")):
+    if path not in sys.path:
+        sys.path.append(path)
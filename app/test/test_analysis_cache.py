@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import pytest
+
+from llm.analysis_cache import AnalysisCache, make_analysis_key, review_set_hash
+
+
+def test_analysis_key_ignores_review_order():
+    a = {"placeId": 1, "reviews": [{"text": "a"}, {"text": "b"}]}
+    b = {"placeId": 1, "reviews": [{"text": "b"}, {"text": "a "}]}
+    assert make_analysis_key(a, "v1") == make_analysis_key(b, "v1")
+    assert make_analysis_key(a, "v1") != make_analysis_key(a, "v2")
+    assert review_set_hash([]) == review_set_hash(None)
+
+
+def test_get_or_compute_single_flight_and_persist(tmp_path):
+    path = str(tmp_path / "analysis.sqlite3")
+    cache = AnalysisCache(path=path)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "분석"
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_compute("1:h:v1", compute) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["분석"] * 5
+    assert len(calls) == 1
+    assert AnalysisCache(path=path).get("1:h:v1") == "분석"
+
+
+def test_get_or_compute_keeps_event_loop_free_during_disk_io(tmp_path, monkeypatch):
+    cache = AnalysisCache(path=str(tmp_path / "analysis.sqlite3"))
+    real_get, real_set = cache.get, cache.set
+
+    def slow_get(key):
+        time.sleep(0.2)      # 디스크 지연 흉내
+        return real_get(key)
+
+    def slow_set(key, value):
+        time.sleep(0.2)
+        real_set(key, value)
+
+    monkeypatch.setattr(cache, "get", slow_get)
+    monkeypatch.setattr(cache, "set", slow_set)
+
+    async def compute():
+        return "분석"
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        result = await cache.get_or_compute("1:h:v1", compute)
+        task.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(run())
+    assert result == "분석"
+    assert ticks >= 20      # 0.4초 동안 루프가 계속 돌았음
+    # 저장 뒤에는 메모리에서 바로 반환 (디스크 조회 없음)
+    assert asyncio.run(cache.get_or_compute("1:h:v1", compute)) == "분석"
+
+
+def test_get_or_compute_failure_is_shared_and_not_cached(tmp_path):
+    cache = AnalysisCache(path=str(tmp_path / "analysis.sqlite3"))
+
+    async def boom():
+        raise RuntimeError("429")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get_or_compute("k", boom))
+    assert cache.get("k") is None
+
+
+def test_cancelled_owner_does_not_strand_waiters(tmp_path):
+    cache = AnalysisCache(path=str(tmp_path / "analysis.sqlite3"))
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "분석"
+
+    async def run():
+        owner = asyncio.create_task(cache.get_or_compute("1:h:v1", compute))
+        await asyncio.sleep(0.05)
+        waiter = asyncio.create_task(cache.get_or_compute("1:h:v1", compute))
+        await asyncio.sleep(0)
+        owner.cancel()
+        result = await asyncio.wait_for(waiter, timeout=1)
+        return owner, result
+
+    owner, result = asyncio.run(run())
+    assert owner.cancelled()
+    assert result == "분석"
+    assert len(calls) == 2      # 취소된 요청 대신 기다리던 요청이 다시 계산
+    assert cache._inflight == {}
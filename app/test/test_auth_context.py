@@ -0,0 +1,29 @@
+import asyncio
+
+from auth_context import get_request_token, reset_request_token, set_request_token
+
+
+def test_concurrent_requests_see_only_their_own_token(monkeypatch):
+    monkeypatch.delenv("JWT_TOKEN", raising=False)
+
+    async def request(token):
+        set_request_token(token)
+        await asyncio.sleep(0.01)   # 다른 요청이 끼어들 기회를 줌
+        in_thread = await asyncio.to_thread(get_request_token)
+        return get_request_token(), in_thread
+
+    async def main():
+        return await asyncio.gather(*(request(f"token-{i}") for i in range(5)))
+
+    results = asyncio.run(main())
+    assert results == [(f"token-{i}", f"token-{i}") for i in range(5)]
+
+
+def test_reset_restores_previous_token_and_env_fallback(monkeypatch):
+    monkeypatch.setenv("JWT_TOKEN", "cli-token")
+    assert get_request_token() == "cli-token"
+
+    reset = set_request_token("request-token")
+    assert get_request_token() == "request-token"
+    reset_request_token(reset)
+    assert get_request_token() == "cli-token"
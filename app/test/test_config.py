@@ -0,0 +1,53 @@
+import os
+
+import config
+
+
+def _reset(monkeypatch, candidates, env_file=None):
+    monkeypatch.setattr(config, "_loaded", None)
+    monkeypatch.setattr(config, "ENV_CANDIDATES", candidates)
+    if env_file:
+        monkeypatch.setenv("ENV_FILE", env_file)
+    else:
+        monkeypatch.delenv("ENV_FILE", raising=False)
+
+
+def test_load_env_reads_root_env_past_empty_app_env(tmp_path, monkeypatch):
+    app_env = tmp_path / "app.env"
+    app_env.write_text("\n")
+    root_env = tmp_path / "root.env"
+    root_env.write_text("RJV_TEST_KEY=from-root\n")
+    monkeypatch.delenv("RJV_TEST_KEY", raising=False)
+    _reset(monkeypatch, [str(app_env), str(root_env)])
+
+    loaded = config.load_env()
+
+    assert loaded == [str(app_env), str(root_env)]
+    assert os.environ["RJV_TEST_KEY"] == "from-root"
+
+
+def test_load_env_earlier_files_and_process_env_win(tmp_path, monkeypatch):
+    custom = tmp_path / "custom.env"
+    custom.write_text("RJV_TEST_A=custom\n")
+    root_env = tmp_path / "root.env"
+    root_env.write_text("RJV_TEST_A=root\nRJV_TEST_B=root\nRJV_TEST_C=root\n")
+    monkeypatch.delenv("RJV_TEST_A", raising=False)
+    monkeypatch.delenv("RJV_TEST_B", raising=False)
+    monkeypatch.setenv("RJV_TEST_C", "process")
+    _reset(monkeypatch, [str(tmp_path / "missing.env"), str(root_env)], env_file=str(custom))
+
+    config.load_env()
+
+    assert os.environ["RJV_TEST_A"] == "custom"
+    assert os.environ["RJV_TEST_B"] == "root"
+    assert os.environ["RJV_TEST_C"] == "process"
+
+
+def test_load_env_runs_once(tmp_path, monkeypatch):
+    env = tmp_path / "root.env"
+    env.write_text("RJV_TEST_ONCE=1\n")
+    _reset(monkeypatch, [str(env)])
+
+    first = config.load_env()
+    env.write_text("RJV_TEST_ONCE=2\n")
+    assert config.load_env() is first
@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+import tag_restaurants
+from service.context_tags import ContextTagStore, match_context_tags
+from service.prompt import CONTEXT_PROMPT_VERSION
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ContextTagStore(str(tmp_path / "tags.sqlite3"))
+
+
+def test_match_context_tags():
+    assert match_context_tags(["혼밥하기 좋은", "조용한 곳"]) == ["혼밥", "조용한"]
+    assert match_context_tags(["가볍게한잔"]) == ["가볍게 한잔"]
+    assert match_context_tags(["매운"]) == []
+
+
+def test_save_tags_keeps_known_tags_and_clamps_scores(store):
+    saved = store.save_tags(1, {"혼밥": 1.7, "조용한": "0.4", "없는태그": 0.9, "회식": "높음"}, "v1")
+    assert saved == {"혼밥": 1.0, "조용한": 0.4}
+    assert store.get_tags(1) == saved
+
+
+def test_find_restaurants_orders_by_total_score(store):
+    store.save_tags(1, {"혼밥": 0.6}, "v1")
+    store.save_tags(2, {"혼밥": 0.9, "조용한": 0.8}, "v1")
+    store.save_tags(3, {"혼밥": 0.3}, "v1")
+    assert store.find_restaurants(["혼밥", "조용한"]) == [2, 1]
+    assert store.find_restaurants(["혼밥", "조용한"], top_n=1) == [2]
+    store.save_tags(2, {}, "v1")           # 다시 태깅하면 이전 태그 제거
+    assert store.find_restaurants(["혼밥"]) == [1]
+
+
+def test_is_complete_requires_finished_run_with_coverage(store):
+    store.save_tags(1, {"혼밥": 0.9}, "v1")
+    assert not store.is_complete("v1")
+    store.mark_complete("v1", places=10, tagged=5)
+    assert not store.is_complete("v1", min_coverage=0.9)
+    store.mark_complete("v1", places=10, tagged=10)
+    assert store.is_complete("v1", min_coverage=0.9)
+    assert not store.is_complete("v2")
+
+
+def _catalog(place_ids):
+    async def load_catalog_ids():
+        return list(place_ids)
+    return load_catalog_ids
+
+
+@pytest.fixture
+def tagging(store, monkeypatch):
+    calls = {"batches": []}
+
+    async def fake_details(batch):
+        calls["batches"].append(batch)
+        if 3 in batch:
+            raise RuntimeError("Spring 503")
+        return {"restaurants": [{"placeId": pid, "name": f"식당{pid}"} for pid in batch]}
+
+    async def fake_llm(prompt, print_result):
+        if "식당5" in prompt:
+            raise RuntimeError("429")
+        return '{"tags": {"혼밥": 0.8}}'
+
+    monkeypatch.setattr(tag_restaurants, "context_tag_store", store)
+    monkeypatch.setattr(tag_restaurants, "load_catalog_ids", _catalog(range(1, 7)))
+    monkeypatch.setattr(tag_restaurants, "bring_restaurants_list_async", fake_details)
+    monkeypatch.setattr(tag_restaurants, "build_context_prompt", lambda r: r["name"])
+    monkeypatch.setattr(tag_restaurants, "call_llm", fake_llm)
+    monkeypatch.setattr(tag_restaurants, "DETAIL_BATCH_SIZE", 2)
+    return calls
+
+
+def test_run_continues_past_failed_batches_and_llm_calls(store, tagging):
+    asyncio.run(tag_restaurants.run(concurrency=2, force=False, limit=0))
+
+    # [3, 4] 배치 실패, 5번 LLM 실패 → 나머지는 태깅
+    assert store.tagged_ids(CONTEXT_PROMPT_VERSION) == {1, 2, 6}
+    assert not store.is_complete(CONTEXT_PROMPT_VERSION)   # 커버리지 3/6
+
+
+def test_run_with_limit_is_not_recorded_as_complete(store, tagging, monkeypatch):
+    monkeypatch.setattr(tag_restaurants, "load_catalog_ids", _catalog([1, 2]))
+    asyncio.run(tag_restaurants.run(concurrency=2, force=False, limit=1))
+    assert not store.is_complete(CONTEXT_PROMPT_VERSION, min_coverage=0.0)
+
+    asyncio.run(tag_restaurants.run(concurrency=2, force=False, limit=0))
+    assert store.is_complete(CONTEXT_PROMPT_VERSION)
+    assert tagging["batches"] == [[1], [2]]
+
+
+def test_context_tool_uses_tags_only_after_complete_run(store, monkeypatch):
+    from tools import gpt_tools
+
+    async def fake_spring(contexts):
+        return {"restaurants": [99]}
+
+    monkeypatch.setattr(gpt_tools, "context_tag_store", store)
+    monkeypatch.setattr(gpt_tools, "bring_context_filter_restaurants_async", fake_spring)
+    store.save_tags(1, {"혼밥": 0.9}, CONTEXT_PROMPT_VERSION)
+
+    run = lambda: asyncio.run(gpt_tools.get_context_tool({"context_keywords": ["혼밥"]}))
+    assert run() == {"restaurants": [99]}
+    store.mark_complete(CONTEXT_PROMPT_VERSION, places=1, tagged=1)
+    assert run() == {"restaurants": [1]}
@@ -0,0 +1,50 @@
+from crawl_journal import CrawlJournal
+
+
+def _journal(tmp_path):
+    return CrawlJournal(str(tmp_path / "journal.sqlite3"))
+
+
+def test_snapshot_reports_status_and_attempts(tmp_path):
+    journal = _journal(tmp_path)
+    journal.record(1, "done")
+    journal.record(2, "registered", "후기 수집 실패")
+    for _ in range(3):
+        journal.record(3, "failed", "timeout")
+
+    assert journal.snapshot() == {1: ("done", 0), 2: ("registered", 1), 3: ("failed", 3)}
+    assert journal.counts() == {"done": 1, "registered": 1, "failed": 1}
+    journal.close()
+
+
+def test_record_counts_attempts_until_done(tmp_path):
+    journal = _journal(tmp_path)
+    journal.record(1, "failed", "boom")
+    journal.record(1, "registered")
+    assert journal.snapshot()[1] == ("registered", 2)
+
+    journal.record(1, "done")
+    assert journal.snapshot()[1] == ("done", 2)
+    assert journal.counts() == {"done": 1}
+    journal.close()
+
+
+def test_seed_existing_keeps_journal_entries(tmp_path):
+    journal = _journal(tmp_path)
+    assert journal.seeded_at() is None
+    journal.record(2, "registered")
+
+    assert journal.seed_existing([1, 2, "3"]) == 2
+    assert journal.seeded_at() is not None
+    assert journal.snapshot() == {1: ("done", 0), 2: ("registered", 1), 3: ("done", 0)}
+    journal.close()
+
+
+def test_journal_survives_reopen(tmp_path):
+    journal = _journal(tmp_path)
+    journal.record(7, "done")
+    journal.close()
+
+    reopened = _journal(tmp_path)
+    assert reopened.snapshot() == {7: ("done", 0)}
+    reopened.close()
@@ -0,0 +1,59 @@
+from service.fusion import fuse_candidates
+
+
+def test_restaurants_in_every_list_come_first():
+    result = fuse_candidates({
+        "location": [1, 2, 3, 4],
+        "menu": {"restaurants": [{"placeId": 3}, {"placeId": 1}]},
+        "context": [4, 3],
+    }, top_k=10)
+
+    assert result["restaurants"][0] == 3
+    assert result["restaurants"][1:3] == [1, 4]
+    assert result["restaurants"][3] == 2
+    assert result["matched"] == 1
+    assert set(result["scores"]) == {1, 2, 3, 4}
+
+
+def test_full_match_fills_top_k_without_relaxing():
+    result = fuse_candidates({"location": [1, 2, 3], "menu": [2, 1], "context": [1, 2]}, top_k=2)
+    assert result["restaurants"] == [1, 2]
+    assert result["matched"] == 3
+
+
+def test_anchor_filters_out_restaurants_outside_location():
+    result = fuse_candidates({"location": [1, 2], "menu": [9, 1], "context": [9]}, top_k=10)
+    assert 9 not in result["restaurants"]
+    assert result["restaurants"] == [1, 2]
+
+
+def test_error_and_empty_sources_are_ignored():
+    result = fuse_candidates({"location": {"error": "geocode"}, "menu": [5, 6], "context": []}, top_k=10)
+    assert result["restaurants"] == [5, 6]
+    assert result["matched"] == 1
+    assert fuse_candidates({"location": [], "menu": []}) == {"restaurants": [], "scores": {}, "matched": 0}
+
+
+def test_excluded_restaurants_are_skipped():
+    result = fuse_candidates({"location": [1, 2, 3], "menu": [1, 2, 3]}, top_k=2, exclude=[1])
+    assert result["restaurants"] == [2, 3]
+
+
+def test_weights_break_ties_between_single_list_hits():
+    result = fuse_candidates({"location": [1, 2], "menu": [3], "context": [4]}, top_k=10, anchor=None)
+    scores = result["scores"]
+    assert scores[3] > scores[4]
+    assert scores[1] == scores[3]
+
+
+def test_failed_location_is_not_relaxed_away_when_requested():
+    sources = {"location": {"restaurants": None}, "menu": {"restaurants": [901, 902, 903]}, "context": [902]}
+
+    result = fuse_candidates(sources, top_k=10, require_anchor=True)
+    assert result["restaurants"] == []
+    assert "error" in result
+
+    failed = {**sources, "location": {"error": "예외 발생"}}
+    assert fuse_candidates(failed, top_k=10, require_anchor=True)["restaurants"] == []
+    # 장소를 말하지 않은 요청은 메뉴/상황만으로 후보를 채움
+    assert fuse_candidates(sources, top_k=10)["restaurants"][0] == 902
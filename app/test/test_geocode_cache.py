@@ -0,0 +1,66 @@
+import asyncio
+import threading
+import time
+
+from service import saveRestaurant_pipeline
+from service.geocode_cache import GeocodeCache, normalize_location
+
+
+def test_geocode_cache_normalizes_and_persists(tmp_path):
+    path = str(tmp_path / "geocode.sqlite3")
+    cache = GeocodeCache(path=path)
+    cache.set(" 강남역  ", {"latitude": 37.49, "longitude": 127.02})
+
+    assert normalize_location("  강남역 ") == "강남역"
+    assert cache.get_memory("강남역") == {"latitude": 37.49, "longitude": 127.02}
+    # 재시작 후에는 메모리에 없고 SQLite에서 읽음
+    fresh = GeocodeCache(path=path)
+    assert fresh.get_memory("강남역") is None
+    assert fresh.get("강남역") == {"latitude": 37.49, "longitude": 127.02}
+    assert fresh.get_memory("강남역") is not None
+
+
+def test_geocode_cache_negative_entries_expire_sooner(tmp_path):
+    cache = GeocodeCache(path=str(tmp_path / "geocode.sqlite3"), ttl=100, negative_ttl=-1)
+    cache.set("없는곳", {"error": "not found"})
+    cache.set("홍대", {"latitude": 37.55, "longitude": 126.92})
+    assert cache.get("없는곳") is None
+    assert cache.get("홍대") is not None
+
+
+def test_geocode_cache_evicts_least_recently_used(tmp_path):
+    cache = GeocodeCache(path=str(tmp_path / "geocode.sqlite3"), max_entries=2, memory_max_entries=1)
+    cache.set("a", {"latitude": 1, "longitude": 1})
+    time.sleep(0.01)
+    cache.set("b", {"latitude": 2, "longitude": 2})
+    time.sleep(0.01)
+    cache.set("c", {"latitude": 3, "longitude": 3})
+    assert cache.get("a") is None
+    assert cache.get("b") is not None and cache.get("c") is not None
+    assert cache.get_stats()["size"] == 2
+
+
+def test_async_geocode_serves_memory_hits_without_threads(tmp_path, monkeypatch):
+    cache = GeocodeCache(path=str(tmp_path / "geocode.sqlite3"))
+    cache.set("강남역", {"latitude": 37.49, "longitude": 127.02})
+    monkeypatch.setattr(saveRestaurant_pipeline, "geocode_cache", cache)
+
+    def no_sync_lookup(location):
+        raise AssertionError("메모리 히트인데 동기 조회를 부름")
+
+    monkeypatch.setattr(saveRestaurant_pipeline, "get_coordinates_from_location", no_sync_lookup)
+    result = asyncio.run(saveRestaurant_pipeline.get_coordinates_from_location_async("강남역"))
+    assert result["latitude"] == 37.49
+
+
+def test_async_geocode_misses_run_off_the_event_loop(tmp_path, monkeypatch):
+    monkeypatch.setattr(saveRestaurant_pipeline, "geocode_cache", GeocodeCache(path=str(tmp_path / "g.sqlite3")))
+    loop_thread = []
+
+    def lookup(location):
+        loop_thread.append(threading.current_thread() is threading.main_thread())
+        return {"latitude": 1.0, "longitude": 2.0}
+
+    monkeypatch.setattr(saveRestaurant_pipeline, "get_coordinates_from_location", lookup)
+    asyncio.run(saveRestaurant_pipeline.get_coordinates_from_location_async("어딘가"))
+    assert loop_thread == [False]
@@ -0,0 +1,65 @@
+import asyncio
+
+import httpx
+import pytest
+
+import bring_to_server
+from tools import gpt_tools
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def _patch_location(monkeypatch, handler):
+    async def fake_coords(location):
+        return {"latitude": 37.5, "longitude": 127.0}
+
+    monkeypatch.setattr(gpt_tools, "get_coordinates_from_location_async", fake_coords)
+    monkeypatch.setattr(bring_to_server, "get_request_token", lambda: "token")
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(bring_to_server, "get_http_client", lambda: client)
+    return client
+
+
+def test_location_tool_uses_db_server(monkeypatch):
+    seen = []
+
+    def handler(request):
+        seen.append(request.url)
+        return httpx.Response(200, json=[1, 2, 3])
+
+    _patch_location(monkeypatch, handler)
+    result = _run(gpt_tools.get_location_tool({"location": "강남역"}))
+
+    assert result["restaurants"] == [1, 2, 3]
+    assert result["center"] == {"latitude": 37.5, "longitude": 127.0}
+    assert str(seen[0]).startswith(f"{bring_to_server.SPRING_DB_SERVER}/api/restaurants?")
+
+
+def test_location_tool_http_error_is_soft(monkeypatch):
+    _patch_location(monkeypatch, lambda request: httpx.Response(500, text="boom"))
+    assert _run(gpt_tools.get_location_tool({"location": "강남역"})) == {"restaurants": None}
+
+
+def test_location_tool_unauthorized_propagates(monkeypatch):
+    _patch_location(monkeypatch, lambda request: httpx.Response(401))
+    with pytest.raises(RuntimeError):
+        _run(gpt_tools.get_location_tool({"location": "강남역"}))
+
+
+def test_restaurant_info_unauthorized_propagates(monkeypatch):
+    async def unauthorized(restaurants):
+        raise RuntimeError("인증에 실패했습니다(401).")
+
+    monkeypatch.setattr(gpt_tools, "bring_restaurants_list_async", unauthorized)
+    with pytest.raises(RuntimeError):
+        _run(gpt_tools.get_restaurant_info({"restaurants": [1]}))
+
+
+def test_location_tool_connection_error_returns_error(monkeypatch):
+    def handler(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    _patch_location(monkeypatch, handler)
+    assert "error" in _run(gpt_tools.get_location_tool({"location": "강남역"}))
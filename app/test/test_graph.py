@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+from agent import langGraphRunner
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def _patch_tools(monkeypatch, calls, delay=0.05):
+    async def fake_extract(text):
+        calls.append("extract")
+        return {"location": "강남역", "menu": "파스타", "context": "데이트"}
+
+    def branch(name, value):
+        async def fake(extraction):
+            calls.append(name)
+            await asyncio.sleep(delay)
+            return value
+        return fake
+
+    def fake_intersection(location, menu, context, exclude=None, location_requested=False):
+        calls.append("intersection")
+        return {"restaurants": [{"placeId": 1}, {"placeId": 2}]}
+
+    async def fake_info(candidates):
+        calls.append("detail")
+        return candidates
+
+    def fake_rank(details, extraction, center, scores, exclude=None):
+        calls.append("rank")
+        return {"restaurants": [r for r in details["restaurants"] if r["placeId"] not in (exclude or [])]}
+
+    async def fake_final(ranked, user_input, keywords):
+        calls.append("final")
+        return f"추천 {len(ranked['restaurants'])}곳"
+
+    monkeypatch.setattr(langGraphRunner, "extract_tool", fake_extract)
+    monkeypatch.setattr(langGraphRunner, "get_location_tool", branch("location", {"restaurants": [1, 2], "center": None}))
+    monkeypatch.setattr(langGraphRunner, "get_menu_tool", branch("menu", {"restaurants": [1, 2]}))
+    monkeypatch.setattr(langGraphRunner, "get_context_tool", branch("context", {"restaurants": [1, 2], "scores": {}}))
+    monkeypatch.setattr(langGraphRunner, "intersection_restaurant", fake_intersection)
+    monkeypatch.setattr(langGraphRunner, "get_restaurant_info", fake_info)
+    monkeypatch.setattr(langGraphRunner, "rank_restaurants", fake_rank)
+    monkeypatch.setattr(langGraphRunner, "final_recommend", fake_final)
+
+
+def test_branches_fan_in_once_and_run_concurrently(monkeypatch):
+    calls = []
+    _patch_tools(monkeypatch, calls, delay=0.2)
+
+    started = time.perf_counter()
+    result = _run(langGraphRunner.run_recommendation_pipeline({"user_input": "강남역 파스타 데이트"}))
+    elapsed = time.perf_counter() - started
+
+    assert calls[0] == "extract"
+    assert sorted(calls[1:4]) == ["context", "location", "menu"]
+    assert calls[4:] == ["intersection", "detail", "rank", "final"]
+    assert result["result"] == "추천 2곳"
+    assert set(result["timings"]) == {"extract_node", "location_node", "menu_node", "context_node"}
+    # 0.2초짜리 브랜치 세 개가 순서대로 돌았다면 0.6초 이상 걸림
+    assert elapsed < 0.5
+
+
+def test_compiled_graphs_are_cached_per_entry_node():
+    assert langGraphRunner.get_compiled_graph("extract_node") is langGraphRunner.get_compiled_graph("location_node")
+    assert langGraphRunner.get_compiled_graph("rank_node") is langGraphRunner.COMPILED_GRAPHS["rank_node"]
+
+
+def test_rank_node_followup_skips_search(monkeypatch):
+    calls = []
+    _patch_tools(monkeypatch, calls)
+    state = {
+        "user_input": "처음 요청",
+        "extraction": {},
+        "restaurant_details": {"restaurants": [{"placeId": 1}, {"placeId": 2}]},
+        "excluded": [1],
+    }
+
+    result = _run(langGraphRunner.run_from_node(state, entry_node="rank_node"))
+
+    assert calls == ["rank", "final"]
+    assert result["ranked"]["restaurants"] == [{"placeId": 2}]
+    assert result["excluded"] == [1, 2]
+
+
+def test_resume_entry_node_falls_back_when_state_is_missing():
+    details = {"restaurant_details": {"restaurants": [{"placeId": 1}]}, "excluded": [1]}
+    assert langGraphRunner.resume_entry_node("rank_node", details) == "extract_node"
+    details.update(location={}, menu={}, context={})
+    assert langGraphRunner.resume_entry_node("rank_node", details) == "intersection_node"
+    assert langGraphRunner.resume_entry_node("menu_node", {}) == "extract_node"
+
+
+def test_followup_without_candidates_skips_llm(monkeypatch):
+    calls = []
+    _patch_tools(monkeypatch, calls)
+
+    def no_candidates(location, menu, context, exclude=None, location_requested=False):
+        calls.append("intersection")
+        return {"restaurants": [], "scores": {}, "matched": 0}
+
+    async def empty_info(candidates):
+        calls.append("detail")
+        return {"restaurants": []}
+
+    monkeypatch.setattr(langGraphRunner, "intersection_restaurant", no_candidates)
+    monkeypatch.setattr(langGraphRunner, "get_restaurant_info", empty_info)
+    state = {"user_input": "다른 식당", "extraction": {}, "location": {}, "menu": {}, "context": {}, "excluded": [1, 2]}
+
+    result = _run(langGraphRunner.run_from_node(state, entry_node="intersection_node"))
+
+    assert "final" not in calls
+    assert result["result"] == langGraphRunner.NO_MORE_RESTAURANTS
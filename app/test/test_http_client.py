@@ -0,0 +1,32 @@
+import asyncio
+
+import http_client
+
+
+def test_client_is_shared_until_closed(monkeypatch):
+    monkeypatch.setattr(http_client, "_client", None)
+
+    async def main():
+        first = await http_client.init_http_client()
+        assert http_client.get_http_client() is first
+        assert await http_client.init_http_client() is first
+
+        await http_client.close_http_client()
+        assert first.is_closed
+        second = http_client.get_http_client()
+        assert second is not first
+        await http_client.close_http_client()
+
+    asyncio.run(main())
+    assert http_client._client is None
+
+
+def test_http2_falls_back_without_h2(monkeypatch):
+    seen = {}
+    monkeypatch.setattr(http_client, "SPRING_HTTP2", True)
+    monkeypatch.setattr(http_client, "_http2_available", lambda: False)
+    monkeypatch.setattr(http_client.httpx, "AsyncClient", lambda **kwargs: seen.update(kwargs))
+
+    http_client._create_client()
+    assert seen["http2"] is False
+    assert seen["limits"].max_connections == http_client.SPRING_HTTP_MAX_CONNECTIONS
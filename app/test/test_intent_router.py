@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from service import intent_router
+from service.intent_router import classify_followup, needs_llm, route_followup
+
+
+@pytest.mark.parametrize("text, label", [
+    ("다른 식당 추천해줘", "another_restaurants"),
+    ("메뉴 좀 보여줘", "show_menu"),
+    ("다른 메뉴로 바꿔줘", "another_menu"),
+    ("처음부터 다시 찾아줘", "restart"),
+    ("그만할게", "end"),
+])
+def test_clear_requests_are_classified_locally(text, label):
+    result, confidence = classify_followup(text)
+    assert result == label
+    assert confidence >= intent_router.INTENT_ROUTER_MIN_CONFIDENCE
+    assert not needs_llm(text)
+
+
+def test_unknown_text_needs_llm():
+    assert classify_followup("음 글쎄요") == (None, 0.0)
+    assert needs_llm("음 글쎄요")
+    assert needs_llm("")
+
+
+def test_route_followup_skips_llm_when_confident(monkeypatch):
+    monkeypatch.setattr(intent_router, "router_stats", {"local": 0, "llm": 0, "agree": 0, "disagree": 0})
+
+    def llm_classify(text):
+        raise AssertionError("LLM이 호출되면 안 됨")
+
+    assert asyncio.run(route_followup("다른 식당 추천해줘", llm_classify)) == "rank_node"
+    assert intent_router.router_stats["local"] == 1
+
+
+def test_route_followup_falls_back_to_llm_and_records_agreement(monkeypatch):
+    monkeypatch.setattr(intent_router, "router_stats", {"local": 0, "llm": 0, "agree": 0, "disagree": 0})
+    monkeypatch.setattr(intent_router, "classify_followup", lambda text: ("another_menu", 0.5))
+
+    assert asyncio.run(route_followup("애매한 요청", lambda text: "another_menu")) == "menu_node"
+    assert asyncio.run(route_followup("애매한 요청", lambda text: "unknown_tool")) == "end"
+
+    stats = intent_router.get_router_stats()
+    assert stats["llm"] == 2
+    assert stats["agree"] == 1 and stats["disagree"] == 1
+    assert stats["agreement"] == 0.5
+
+
+def test_llm_classification_goes_through_scheduler(monkeypatch):
+    monkeypatch.setattr(intent_router, "classify_followup", lambda text: ("show_menu", 0.9))
+    monkeypatch.setattr(intent_router, "INTENT_ROUTER_SHADOW_RATE", 1.0)
+    scheduled = []
+    real_run = intent_router.llm_scheduler.run
+
+    async def counting_run(make_call):
+        scheduled.append(1)
+        return await real_run(make_call)
+
+    monkeypatch.setattr(intent_router.llm_scheduler, "run", counting_run)
+
+    async def main():
+        node = await route_followup("메뉴 보여줘", lambda text: "show_menu")   # 로컬 판단 + shadow 비교
+        await asyncio.gather(*intent_router._shadow_tasks)
+        monkeypatch.setattr(intent_router, "classify_followup", lambda text: (None, 0.0))
+        return node, await route_followup("음", lambda text: "restart")         # LLM 폴백
+
+    assert asyncio.run(main()) == ("menu_node", "location_node")
+    assert len(scheduled) == 2
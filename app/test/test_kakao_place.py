@@ -0,0 +1,102 @@
+import asyncio
+import json
+import os
+
+import httpx
+import pytest
+
+import process_restaurant
+from kakao_place import KakaoPlaceParseError, fetch_place, parse_place
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+PLACE_ID = 12345678
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _client(routes: dict):
+    def handler(request):
+        body = routes.get(request.url.path)
+        if body is None:
+            return httpx.Response(404)
+        if isinstance(body, httpx.Response):
+            return body
+        return httpx.Response(200, json=body)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def _fetch(routes, **kwargs):
+    async def run():
+        async with _client(routes) as client:
+            return await fetch_place(client, PLACE_ID, **kwargs)
+
+    return asyncio.run(run())
+
+
+def test_fetch_place_parses_recorded_fixture():
+    place = _fetch({
+        f"/main/v/{PLACE_ID}": _fixture("kakao_place_main.json"),
+        f"/commentlist/v/{PLACE_ID}/9004": _fixture("kakao_place_commentlist.json"),
+    })
+
+    assert place["rating"] == 4.4            # 431 / 97
+    assert place["review_count"] == 97
+    # 5자 미만/내용 없는 후기는 제외, 다음 페이지까지 이어 붙임
+    assert [r["text"] for r in place["reviews"]] == [
+        "국물이 진하고 양도 많아요",
+        "혼밥하기 좋은 분위기",
+        "회식 장소로도 괜찮습니다",
+        "웨이팅이 길어요 그래도 맛있음",
+    ]
+    assert place["menus"] == [
+        {"name": "돼지국밥", "price": "9,000"},
+        {"name": "순대국밥", "price": "11,000"},
+        {"name": "수육(소)", "price": ""},
+    ]
+    assert place["has_next"] is False
+
+
+def test_fetch_place_stops_at_review_page_limit():
+    place = _fetch({f"/main/v/{PLACE_ID}": _fixture("kakao_place_main.json")}, review_pages=1)
+    assert len(place["reviews"]) == 2
+    assert place["has_next"] is True
+
+
+def test_broken_later_page_keeps_first_page():
+    place = _fetch({
+        f"/main/v/{PLACE_ID}": _fixture("kakao_place_main.json"),
+        f"/commentlist/v/{PLACE_ID}/9004": {"comment": {"list": ["unexpected"]}},
+    })
+    assert len(place["reviews"]) == 2
+
+
+@pytest.mark.parametrize("payload", [
+    {},
+    {"basicInfo": {"feedback": "hidden"}},
+    {"basicInfo": {"feedback": {"scorecnt": "many"}}},
+    {"basicInfo": {}, "menuInfo": {"menuList": ["돼지국밥"]}},
+    {"basicInfo": {}, "comment": {"list": [None]}},
+])
+def test_unexpected_structure_raises_parse_error(payload):
+    with pytest.raises(KakaoPlaceParseError):
+        parse_place(payload)
+
+
+def test_non_json_response_raises_parse_error():
+    with pytest.raises(KakaoPlaceParseError):
+        _fetch({f"/main/v/{PLACE_ID}": httpx.Response(200, text="<html>차단</html>")})
+
+
+def test_crawl_fast_falls_back_on_unexpected_payload():
+    async def run(body):
+        routes = {f"/main/v/{PLACE_ID}": body, f"/commentlist/v/{PLACE_ID}/9004": _fixture("kakao_place_commentlist.json")}
+        async with _client(routes) as client:
+            return await process_restaurant.crawl_fast(client, PLACE_ID)
+
+    assert asyncio.run(run({"basicInfo": {"feedback": "hidden"}})) is None
+    assert asyncio.run(run(httpx.Response(503))) is None
+    assert asyncio.run(run(_fixture("kakao_place_main.json")))["review_count"] == 97
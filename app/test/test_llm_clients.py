@@ -0,0 +1,25 @@
+import sys
+import types
+
+from llm import clients
+
+
+def test_clients_are_created_lazily_once_per_name(monkeypatch):
+    created = []
+
+    class FakeChat:
+        def __init__(self, **kwargs):
+            created.append(kwargs)
+
+    monkeypatch.setitem(sys.modules, "langchain_google_genai", types.SimpleNamespace(ChatGoogleGenerativeAI=FakeChat))
+    monkeypatch.setattr(clients, "_clients", {})
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+
+    default = clients.get_llm()
+    assert clients.get_llm("default") is default
+    streaming = clients.get_llm("streaming")
+
+    assert streaming is not default
+    assert len(created) == 2
+    assert created[0]["google_api_key"] == "test-key"
+    assert created[1]["model_kwargs"] == {"streaming": True}
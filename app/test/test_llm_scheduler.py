@@ -0,0 +1,139 @@
+import asyncio
+import time
+
+import pytest
+
+from llm.llm_scheduler import LLMScheduler, TokenBucket, is_retryable
+from service import saveRestaurant_pipeline
+from tools import gpt_tools
+
+
+class StatusError(Exception):
+    def __init__(self, code):
+        super().__init__(f"status {code}")
+        self.code = code
+
+
+def _no_backoff(monkeypatch, scheduler):
+    monkeypatch.setattr(scheduler, "backoff", lambda attempt: 0)
+
+
+def test_is_retryable():
+    assert is_retryable(StatusError(429))
+    assert is_retryable(StatusError(503))
+    assert not is_retryable(StatusError(400))
+    assert is_retryable(Exception("429 Resource has been exhausted"))
+    assert is_retryable(TimeoutError("read"))
+    assert not is_retryable(ValueError("bad json"))
+
+
+def test_token_bucket_limits_rate():
+    async def run():
+        bucket = TokenBucket(rate=50, capacity=2)
+        started = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    # 버스트 2개는 바로, 나머지 3개는 초당 50개 속도 → 약 0.06초
+    assert 0.04 <= asyncio.run(run()) < 0.5
+
+
+def test_run_retries_retryable_errors(monkeypatch):
+    scheduler = LLMScheduler(max_concurrency=2, rate_per_sec=0, max_retries=3)
+    _no_backoff(monkeypatch, scheduler)
+    calls = []
+
+    async def call():
+        calls.append(1)
+        if len(calls) < 3:
+            raise StatusError(503)
+        return "ok"
+
+    assert asyncio.run(scheduler.run(call)) == "ok"
+    assert len(calls) == 3
+    assert scheduler.stats["retries"] == 2
+    assert scheduler.stats["failures"] == 0
+
+
+def test_run_does_not_retry_other_errors(monkeypatch):
+    scheduler = LLMScheduler(max_concurrency=2, rate_per_sec=0, max_retries=3)
+    _no_backoff(monkeypatch, scheduler)
+    calls = []
+
+    async def call():
+        calls.append(1)
+        raise ValueError("bad")
+
+    with pytest.raises(ValueError):
+        asyncio.run(scheduler.run(call))
+    assert len(calls) == 1
+    assert scheduler.stats["failures"] == 1
+
+
+def test_run_limits_concurrency():
+    scheduler = LLMScheduler(max_concurrency=2, rate_per_sec=0, max_retries=0)
+    peak = []
+
+    async def call():
+        peak.append(scheduler.stats["running"])
+        await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(*(scheduler.run(call) for _ in range(6)))
+
+    asyncio.run(run())
+    assert max(peak) == 2
+
+
+def test_cancel_while_waiting_for_rate_limit_keeps_stats_balanced():
+    scheduler = LLMScheduler(max_concurrency=2, rate_per_sec=1, burst=1)
+
+    async def call():
+        await asyncio.sleep(0)
+        return "ok"
+
+    async def main():
+        assert await scheduler.run(call) == "ok"        # 버킷의 토큰 1개 사용
+        waiting = asyncio.create_task(scheduler.run(call))
+        await asyncio.sleep(0.05)                          # 토큰 버킷 대기 중
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        # 슬롯이 반환되어 두 자리 모두 다시 쓸 수 있음
+        await asyncio.wait_for(scheduler._semaphore.acquire(), 0.1)
+        await asyncio.wait_for(scheduler._semaphore.acquire(), 0.1)
+
+    asyncio.run(main())
+    assert scheduler.stats["running"] == 0
+    assert scheduler.stats["waiting"] == 0
+    assert scheduler.stats["calls"] == 1
+
+
+def test_extract_tool_retries_then_falls_back(monkeypatch):
+    scheduler = LLMScheduler(max_concurrency=2, rate_per_sec=0, max_retries=2)
+    _no_backoff(monkeypatch, scheduler)
+    monkeypatch.setattr(gpt_tools, "llm_scheduler", scheduler)
+    calls = []
+
+    class Chain:
+        def invoke(self, inputs):
+            calls.append(inputs)
+            raise StatusError(429)
+
+    monkeypatch.setattr(saveRestaurant_pipeline, "get_extraction_chain", lambda: Chain())
+
+    result = asyncio.run(gpt_tools.extract_tool("강남역 초밥"))
+
+    assert len(calls) == 3
+    assert result == {"location": "", "menu_keywords": [], "context_keywords": []}
+
+
+def test_extract_request_info_swallows_parse_errors(monkeypatch):
+    class Chain:
+        def invoke(self, inputs):
+            raise ValueError("not json")
+
+    monkeypatch.setattr(saveRestaurant_pipeline, "get_extraction_chain", lambda: Chain())
+    result = saveRestaurant_pipeline.extract_request_info("아무거나", raise_retryable=True)
+    assert result["location"] == ""
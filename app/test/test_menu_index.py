@@ -0,0 +1,93 @@
+import asyncio
+
+from service import menu_index as menu_module
+from service.menu_index import MenuIndex, append_build_marker, append_menu_log
+from tools import gpt_tools
+
+
+def _index(tmp_path):
+    return MenuIndex(log_path=str(tmp_path / "menu_log.jsonl"))
+
+
+def test_search_matches_substrings_with_or(tmp_path):
+    index = _index(tmp_path)
+    index.add(1, ["국물닭발", "계란찜"])
+    index.add(2, [{"name": "직화 닭발"}])
+    index.add(3, ["쭈꾸미 볶음"])
+    index.add(4, ["닭갈비"])
+
+    assert index.search(["닭발"]) == [1, 2]
+    assert index.search(["쭈꾸미", "계란찜"]) == [3, 1]
+    assert index.search(["닭"]) == [1, 2, 4]
+    assert index.search(["발닭"]) == []
+
+
+def test_three_char_keyword_requires_contiguous_match(tmp_path):
+    index = _index(tmp_path)
+    index.add(1, ["김치찌개"])
+    index.add(2, ["김치", "치찌"])     # 2-gram은 모두 있지만 "김치찌"는 아님
+    assert index.search(["김치찌"]) == [1]
+
+
+def test_replaced_menus_drop_stale_postings(tmp_path):
+    index = _index(tmp_path)
+    index.add(1, ["초밥"])
+    index.add(1, ["라멘"])
+    assert index.search(["초밥"]) == []
+    assert index.search(["라멘"]) == [1]
+
+
+def test_sync_reads_only_complete_new_lines(tmp_path):
+    index = _index(tmp_path)
+    append_menu_log(1, ["초밥"], path=index.log_path)
+    with open(index.log_path, "a", encoding="utf-8") as f:
+        f.write('{"placeId": 2, "menus": ["라')   # 크롤러가 쓰는 중
+    assert index.sync_from_log() == 1
+    with open(index.log_path, "a", encoding="utf-8") as f:
+        f.write('멘"]}\n')
+    assert index.sync_from_log() == 1
+    assert index.search(["라멘"]) == [2]
+
+
+def test_ready_requires_completed_build_with_coverage(tmp_path, monkeypatch):
+    monkeypatch.setattr(menu_module, "MENU_INDEX_MIN_COVERAGE", 0.9)
+    index = _index(tmp_path)
+    append_menu_log(1, ["초밥"], path=index.log_path)
+    index.sync_from_log()
+    assert not index.ready          # 일부만 색인됨, 완료 표시 없음
+
+    append_build_marker(places=10, indexed=5, path=index.log_path)
+    index.sync_from_log()
+    assert not index.ready          # 백필은 끝났지만 커버리지 부족
+
+    append_build_marker(places=10, indexed=10, path=index.log_path)
+    index.sync_from_log()
+    assert index.ready
+
+
+def _run_menu_tool(monkeypatch, index, keywords):
+    spring_calls = []
+
+    async def fake_spring(kw):
+        spring_calls.append(kw)
+        return {"restaurants": [99]}
+
+    monkeypatch.setattr(gpt_tools, "menu_index", index)
+    monkeypatch.setattr(gpt_tools, "bring_menu_filter_restaurants_async", fake_spring)
+    result = asyncio.run(gpt_tools.get_menu_tool({"menu_keywords": keywords}))
+    return result, spring_calls
+
+
+def test_menu_tool_uses_index_only_when_ready_and_hit(tmp_path, monkeypatch):
+    index = _index(tmp_path)
+    append_menu_log(1, ["초밥"], path=index.log_path)
+    index.sync_from_log()
+
+    # 백필 전: Spring
+    assert _run_menu_tool(monkeypatch, index, ["초밥"]) == ({"restaurants": [99]}, [["초밥"]])
+
+    append_build_marker(places=1, indexed=1, path=index.log_path)
+    index.sync_from_log()
+    assert _run_menu_tool(monkeypatch, index, ["초밥"]) == ({"restaurants": [1]}, [])
+    # 색인에 없는 키워드: Spring
+    assert _run_menu_tool(monkeypatch, index, ["파스타"]) == ({"restaurants": [99]}, [["파스타"]])
@@ -0,0 +1,39 @@
+from service.pre_rank import pre_rank, keyword_score, distance_score, haversine_m
+
+CENTER = {"latitude": 37.4979, "longitude": 127.0276}
+
+
+def test_keyword_score_counts_matching_keywords():
+    restaurant = {"name": "파스타집", "menus": [{"name": "봉골레"}], "reviews": [{"text": "데이트하기 좋아요"}]}
+    assert keyword_score(restaurant, ["파스타", "데이트", "삼겹살"]) == 2 / 3
+    assert keyword_score(restaurant, ["", " "]) == 0.0
+
+
+def test_distance_score_decays_to_zero_at_radius():
+    assert distance_score({"latitude": CENTER["latitude"], "longitude": CENTER["longitude"]}, CENTER) == 1.0
+    assert distance_score({"latitude": 37.51, "longitude": 127.0276}, CENTER, radius_m=500) == 0.0
+    assert distance_score({"latitude": None, "longitude": None}, CENTER) == 0.0
+    assert distance_score({"latitude": "bad", "longitude": 1}, CENTER) == 0.0
+    assert 1300 < haversine_m(37.4979, 127.0276, 37.51, 127.0276) < 1400
+
+
+def test_pre_rank_orders_by_signals_and_keeps_top_k():
+    restaurants = [
+        {"placeId": 1, "name": "분식", "rating": 3.0, "reviewCount": 10},
+        {"placeId": 2, "name": "파스타 하우스", "rating": 4.5, "reviewCount": 300, **CENTER},
+        {"placeId": 3, "name": "파스타 골목", "rating": 4.0, "reviewCount": 50},
+    ]
+
+    ranked = pre_rank(restaurants, keywords=["파스타"], center=CENTER, top_k=2)
+
+    assert [r["placeId"] for r in ranked] == [2, 3]
+    assert all("preRankScore" in r for r in restaurants)
+    assert len(pre_rank(restaurants, top_k=0)) == 3
+
+
+def test_context_scores_are_normalized_to_the_best_candidate():
+    restaurants = [{"placeId": 1}, {"placeId": 2}]
+    ranked = pre_rank(restaurants, context_scores={1: 2.0, 2: 8.0}, top_k=0)
+    assert [r["placeId"] for r in ranked] == [2, 1]
+    assert ranked[0]["preRankScore"] == 1.0
+    assert ranked[1]["preRankScore"] == 0.25
@@ -0,0 +1,60 @@
+import os
+
+from service.review_index import ReviewIndex, build_review_index, tokenize
+
+
+DOCUMENTS = {
+    101: ["조용한 분위기에서 데이트하기 좋아요", "데이트 코스로 추천"],
+    102: ["회식하기 좋은 고깃집", "단체석 넓어요"],
+    103: ["혼밥하기 편한 국밥집"],
+}
+
+
+def _index(tmp_path, documents=DOCUMENTS):
+    build_review_index(documents, out_dir=str(tmp_path))
+    index = ReviewIndex(str(tmp_path))
+    assert index.load()
+    return index
+
+
+def test_tokenize_uses_character_bigrams():
+    assert tokenize("데이트 코스!") == ["데이", "이트", "트코", "코스"]
+    assert tokenize("밥") == ["밥"]
+    assert tokenize("  ") == []
+
+
+def test_search_ranks_matching_restaurants(tmp_path):
+    index = _index(tmp_path)
+
+    results = index.search(["데이트"], min_score=0)
+    assert results[0][0] == 101
+    assert [pid for pid, _ in results] == [101]
+
+    assert [pid for pid, _ in index.search(["회식", "단체"], min_score=0)] == [102]
+    assert index.search(["없는키워드"], min_score=0) == []
+    index.close()
+
+
+def test_min_score_and_top_n_limit_results(tmp_path):
+    index = _index(tmp_path, {1: ["데이트 데이트 데이트"], 2: ["데이트"], 3: ["국밥"]})
+
+    scores = dict(index.search(["데이트"], min_score=0))
+    assert scores[1] > scores[2]
+    assert index.search(["데이트"], min_score=0, top_n=1) == [(1, scores[1])]
+    assert index.search(["데이트"], min_score=scores[1] + 1) == []
+    index.close()
+
+
+def test_build_replaces_files_atomically(tmp_path):
+    _index(tmp_path).close()
+    assert sorted(os.listdir(tmp_path)) == ["meta.json", "postings.bin"]
+
+
+def test_missing_or_empty_index_is_not_ready(tmp_path):
+    index = ReviewIndex(str(tmp_path))
+    assert not index.load()
+    assert not index.ready
+    assert index.search(["데이트"]) == []
+
+    build_review_index({}, out_dir=str(tmp_path))
+    assert not index.load()
@@ -0,0 +1,100 @@
+import asyncio
+
+from llm import gemini_call
+from llm.analysis_cache import AnalysisCache, make_analysis_key
+from service import prompt as prompt_module
+from service.review_select import estimate_tokens, select_reviews
+
+
+def _texts(reviews):
+    return [r["text"] for r in reviews]
+
+
+def test_select_reviews_removes_exact_and_near_duplicates():
+    reviews = [
+        {"text": "국물이 진하고 고기가 많이 들어있어요"},
+        {"text": "국물이 진하고 고기가 많이 들어있어요!!"},
+        {"text": "국물이 진하고 고기가 많이 들어 있어요 ^^"},
+        {"text": "직원분들이 친절하고 매장이 깨끗해요"},
+    ]
+    selected, stats = select_reviews(reviews, budget=1000)
+    assert len(selected) == 2
+    assert stats["total"] == 4 and stats["selected"] == 2
+
+
+def test_select_reviews_respects_budget_and_prefers_keywords():
+    reviews = [{"text": f"무난한 식당이에요 {i}번째 방문 기록입니다"} for i in range(20)]
+    reviews.append({"text": "혼밥하기 편한 바 좌석이 있어요"})
+    budget = estimate_tokens(reviews[-1]["text"]) + estimate_tokens(reviews[0]["text"])
+
+    selected, stats = select_reviews(reviews, budget=budget, keywords=["혼밥"])
+
+    assert _texts(selected)[0] == "혼밥하기 편한 바 좌석이 있어요"
+    assert stats["tokens_after"] <= budget
+    assert stats["tokens_saved"] == stats["tokens_before"] - stats["tokens_after"]
+
+
+def test_select_reviews_handles_empty_input():
+    selected, stats = select_reviews([{"text": "  "}, {"text": "ㅋㅋ"}], budget=100)
+    assert _texts(selected) == ["ㅋㅋ"]
+    assert select_reviews(None)[0] == []
+
+
+def test_analyze_restaurant_selects_reviews_once_and_prompts_with_them(tmp_path, monkeypatch):
+    restaurant = {
+        "placeId": 1, "name": "식당", "url": "u",
+        "reviews": [{"text": f"리뷰 내용 {i} " + "맛" * (i % 7)} for i in range(60)],
+    }
+    calls = []
+    real_select = select_reviews
+
+    def counting_select(*args, **kwargs):
+        calls.append(kwargs.get("keywords"))
+        return real_select(*args, **kwargs)
+
+    prompts = []
+
+    async def fake_llm(prompt, print_result):
+        prompts.append(prompt)
+        return "분석"
+
+    cache = AnalysisCache(path=str(tmp_path / "analysis.sqlite3"))
+    monkeypatch.setattr(gemini_call, "select_reviews", counting_select)
+    monkeypatch.setattr(prompt_module, "select_reviews", counting_select)
+    monkeypatch.setattr(gemini_call, "call_llm", fake_llm)
+    monkeypatch.setattr(gemini_call, "analysis_cache", cache)
+
+    asyncio.run(gemini_call.analyze_restaurant(restaurant))
+
+    assert calls == [None]
+    selected, _ = real_select(restaurant["reviews"])
+    # 프롬프트에 들어간 리뷰 = 캐시 키를 만든 리뷰 (순서까지 같음)
+    assert "\n".join(_texts(selected)) in prompts[0]
+    key = make_analysis_key({**restaurant, "reviews": selected}, gemini_call.REVIEW_PROMPT_VERSION)
+    assert cache.get(key) == "분석"
+
+
+def test_analysis_cache_is_shared_across_keyword_sets(tmp_path, monkeypatch):
+    restaurant = {
+        "placeId": 1, "name": "식당", "url": "u",
+        "reviews": [{"text": f"리뷰 {i} " + ("파스타 " if i % 3 else "데이트 ") * (i % 9)} for i in range(300)],
+    }
+    llm_calls = []
+
+    async def fake_llm(prompt, print_result):
+        llm_calls.append(prompt)
+        return "분석"
+
+    monkeypatch.setattr(gemini_call, "call_llm", fake_llm)
+    monkeypatch.setattr(gemini_call, "analysis_cache", AnalysisCache(path=str(tmp_path / "analysis.sqlite3")))
+
+    async def run():
+        for keywords in (["파스타"], ["데이트"], ["파스타", "데이트"], None):
+            await gemini_call.run_llm_analysis({"restaurants": [restaurant]})
+            prompt = prompt_module.build_final_recommendation_prompt(
+                [{"name": "식당", "url": "u", "llmResult": "분석"}], "요청", keywords
+            )
+            assert ", ".join(keywords or ["없음"]) in prompt
+
+    asyncio.run(run())
+    assert len(llm_calls) == 1
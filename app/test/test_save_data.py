@@ -0,0 +1,69 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import crawl_journal
+import save_data
+
+
+class FakeUploader:
+    def __init__(self):
+        self.batches = []
+
+    def upload_batch(self, batch):
+        self.batches.append([p["place_id"] for p in batch])
+        return [(p["place_id"], "done" if p["crawled"] else "registered", p["error"]) for p in batch]
+
+    def close(self):
+        return []
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    uploader = FakeUploader()
+    journal_path = str(tmp_path / "journal.sqlite3")
+    monkeypatch.setattr(save_data, "CrawlUploader", lambda: uploader)
+    monkeypatch.setattr(save_data, "CrawlJournal", lambda: crawl_journal.CrawlJournal(journal_path))
+    monkeypatch.setattr(save_data, "fetch_existing_place_ids", lambda: [3])
+    monkeypatch.setattr(save_data, "UPLOAD_BATCH_SIZE", 4)
+    monkeypatch.setattr(save_data, "UPLOAD_FLUSH_SEC", 30)
+    monkeypatch.setattr(save_data, "PIPELINE_STATS_SEC", 30)
+
+    async def fake_crawl_fast(client, place_id):
+        await asyncio.sleep(0.001)
+        return {"rating": 4.0, "review_count": 1, "reviews": [], "menus": []}
+
+    monkeypatch.setattr(save_data, "crawl_fast", fake_crawl_fast)
+
+    def run(ids):
+        path = tmp_path / "restaurants.jsonl"
+        path.write_text("".join(json.dumps({"id": str(i), "place_name": f"식당{i}", "place_url": ""}) + "\n" for i in ids))
+        args = SimpleNamespace(input=str(path), discover=False, selenium=False, reseed=False)
+        asyncio.run(save_data.run_pipeline(args))
+        return uploader, crawl_journal.CrawlJournal(journal_path)
+
+    return run
+
+
+def test_pipeline_batches_uploads_and_skips_known_places(pipeline):
+    # 3은 서버에 이미 있음, 5는 입력에 두 번 등장
+    uploader, journal = pipeline([1, 2, 3, 4, 5, 5, 6, 7, 8, 9, 10])
+
+    uploaded = [pid for batch in uploader.batches for pid in batch]
+    assert sorted(uploaded) == [1, 2, 4, 5, 6, 7, 8, 9, 10]
+    # 큐가 비었다고 한 건씩 올리지 않고 배치를 채움 (마지막 배치만 작을 수 있음)
+    assert [len(b) for b in uploader.batches] == [4, 4, 1]
+    assert journal.counts() == {"done": 10}
+    journal.close()
+
+
+def test_pipeline_rerun_skips_done_places(pipeline):
+    uploader, journal = pipeline([1, 2])
+    journal.close()
+    uploader.batches.clear()
+
+    uploader, journal = pipeline([1, 2, 11])
+    assert uploader.batches == [[11]]
+    journal.close()
@@ -0,0 +1,67 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+import send_to_server
+
+
+class _Handler(BaseHTTPRequestHandler):
+    statuses = []
+    received = []
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.received.append(json.loads(self.rfile.read(length)))
+        status = self.statuses.pop(0) if self.statuses else 200
+        self.send_response(status)
+        if status in (429, 503):
+            self.send_header("Retry-After", "0")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    httpd = HTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    _Handler.statuses, _Handler.received = [], []
+    monkeypatch.setattr(send_to_server, "SPRING_SERVER", f"http://127.0.0.1:{httpd.server_port}")
+    monkeypatch.setattr(send_to_server, "UPLOAD_BACKOFF", 0)
+    monkeypatch.setattr(send_to_server, "_session", None)
+    yield _Handler
+    httpd.shutdown()
+    httpd.server_close()
+    send_to_server._session = None
+
+
+@pytest.mark.parametrize("status", [500, 502, 504])
+def test_post_is_not_retried_after_server_may_have_written(server, status):
+    server.statuses = [status]
+    result = send_to_server.send_reviews(1, [{"text": "맛있어요"}])
+    assert result[0] == status
+    assert len(server.received) == 1
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_post_is_retried_on_rejection(server, status):
+    server.statuses = [status, status]
+    result = send_to_server.send_restaurant({"place_id": 1})
+    assert send_to_server.is_success(result)
+    assert len(server.received) == 3
+
+
+def test_connection_error_is_reported_as_status_zero(monkeypatch):
+    monkeypatch.setattr(send_to_server, "SPRING_SERVER", "http://127.0.0.1:9")
+    monkeypatch.setattr(send_to_server, "UPLOAD_BACKOFF", 0)
+    monkeypatch.setattr(send_to_server, "_session", None)
+    result = send_to_server.send_menus(1, [])
+    send_to_server._session = None
+    assert result[0] == 0
+    assert not send_to_server.is_success(result)
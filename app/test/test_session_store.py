@@ -0,0 +1,58 @@
+from service import session_store as store_module
+from service.session_store import SessionStore
+
+
+def test_session_is_scoped_to_its_key_and_keeps_only_session_keys():
+    store = SessionStore()
+    key = store.new_key()
+    store.save("c1", {"user_input": "강남 파스타", "excluded": [1], "jwt_token": "secret", "timings": {}}, key)
+
+    assert store.get("c1", store.new_key()) is None
+    assert store.get("c1", key) == {"user_input": "강남 파스타", "excluded": [1]}
+    assert store.get_stats()["hits"] == 1
+    assert store.get_stats()["misses"] == 1
+
+
+def test_get_returns_a_copy():
+    store = SessionStore()
+    store.save("c1", {"user_input": "a"}, "t")
+    store.get("c1", "t")["user_input"] = "changed"
+    assert store.get("c1", "t")["user_input"] == "a"
+
+
+def test_expired_sessions_are_dropped(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(store_module.time, "time", lambda: now[0])
+    store = SessionStore(ttl=10)
+    store.save("c1", {"user_input": "a"}, "t")
+
+    now[0] += 5
+    assert store.get("c1", "t") is not None   # 사용하면 만료 시간이 연장됨
+    now[0] += 9
+    assert store.get("c1", "t") is not None
+    now[0] += 11
+    assert store.get("c1", "t") is None
+    assert len(store) == 0
+
+
+def test_least_recently_used_session_is_evicted_first():
+    store = SessionStore(max_entries=2)
+    store.save("c1", {"user_input": "1"}, "t")
+    store.save("c2", {"user_input": "2"}, "t")
+    store.get("c1", "t")
+    store.save("c3", {"user_input": "3"}, "t")
+
+    assert store.get("c2", "t") is None
+    assert store.get("c1", "t") is not None
+    assert store.get_stats()["evictions"] == 1
+
+
+def test_byte_limit_keeps_the_newest_session():
+    store = SessionStore(max_bytes=50)
+    store.save("c1", {"user_input": "가" * 10}, "t")
+    store.save("c2", {"user_input": "나" * 100}, "t")
+
+    assert len(store) == 1
+    assert store.get("c2", "t") is not None
+    store.delete("c2")
+    assert store.get_stats()["bytes"] == 0
@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+import config
+from service import spatial_index as spatial_module
+from service.pre_rank import haversine_m
+from service.spatial_index import SpatialIndex, refresh_spatial_index, spatial_index_refresher
+
+GANGNAM = (37.4979, 127.0276)
+
+
+def _offset(lat, lng, north_m=0.0, east_m=0.0):
+    # 짧은 거리용 근사 (테스트 좌표 생성)
+    return lat + north_m / 111320, lng + east_m / 88200
+
+
+def _restaurant(place_id, lat, lng):
+    return {"placeId": place_id, "latitude": lat, "longitude": lng}
+
+
+def test_radius_query_returns_places_in_range_sorted_by_distance():
+    index = SpatialIndex()
+    index.upsert([
+        _restaurant(1, *_offset(*GANGNAM, north_m=300)),
+        _restaurant(2, *_offset(*GANGNAM, east_m=100)),
+        _restaurant(3, *_offset(*GANGNAM, north_m=900)),
+    ])
+
+    hits = index.radius_query(*GANGNAM, 500)
+
+    assert [pid for pid, _ in hits] == [2, 1]
+    assert hits[0][1] == pytest.approx(haversine_m(*GANGNAM, *_offset(*GANGNAM, east_m=100)))
+    assert index.nearby_restaurants(*GANGNAM, 500) == {"restaurants": [2, 1]}
+
+
+def test_nearest_widens_search_until_k_found():
+    index = SpatialIndex()
+    index.upsert([_restaurant(i, *_offset(*GANGNAM, north_m=400 * i)) for i in range(1, 6)])
+    assert [pid for pid, _ in index.nearest(*GANGNAM, k=3)] == [1, 2, 3]
+
+
+def test_upsert_moves_cells_and_remove():
+    index = SpatialIndex()
+    index.upsert([_restaurant(1, *GANGNAM)])
+    index.upsert([_restaurant(1, *_offset(*GANGNAM, north_m=2000))])
+
+    assert index.radius_query(*GANGNAM, 500) == []
+    assert index.remove([1]) == 1
+    assert not index.ready
+
+
+def test_refresh_drops_missing_places(monkeypatch):
+    index = SpatialIndex()
+    monkeypatch.setattr(spatial_module, "spatial_index", index)
+    refresh_spatial_index([_restaurant(1, *GANGNAM), _restaurant(2, *GANGNAM)])
+    refresh_spatial_index([_restaurant(2, *GANGNAM)])
+    assert index.place_ids() == {2}
+
+
+def test_refresh_rejects_catalog_without_coordinates(monkeypatch):
+    index = SpatialIndex()
+    monkeypatch.setattr(spatial_module, "spatial_index", index)
+    with pytest.raises(ValueError):
+        refresh_spatial_index([{"placeId": 1}, {"placeId": 2}])
+    assert not index.ready
+
+
+def test_refresher_stops_when_service_token_missing(monkeypatch):
+    monkeypatch.setattr(config, "_loaded", [])
+    monkeypatch.delenv("SPRING_SERVICE_TOKEN", raising=False)
+    calls = []
+
+    def load_catalog():
+        calls.append(1)
+        config.get_service_token()
+
+    # 토큰이 없으면 재시도하지 않고 바로 끝남 (interval만큼 기다리지 않음)
+    asyncio.run(asyncio.wait_for(spatial_index_refresher(load_catalog, interval=3600), timeout=5))
+    assert calls == [1]
+
+
+def test_get_service_token(monkeypatch):
+    monkeypatch.setattr(config, "_loaded", [])
+    monkeypatch.setenv("SPRING_SERVICE_TOKEN", "svc")
+    assert config.get_service_token() == "svc"
+    monkeypatch.delenv("SPRING_SERVICE_TOKEN")
+    with pytest.raises(RuntimeError):
+        config.get_service_token()
+
+
+def test_findall_restaurants_uses_service_token(monkeypatch):
+    from service import saveRestaurant_pipeline
+
+    monkeypatch.setattr(config, "_loaded", [])
+    sent = []
+
+    class Response:
+        status_code = 200
+
+        def json(self):
+            return [_restaurant(1, *GANGNAM)]
+
+    def fake_get(url, headers=None, timeout=None):
+        sent.append(headers["Authorization"])
+        return Response()
+
+    monkeypatch.setattr(saveRestaurant_pipeline.requests, "get", fake_get)
+    monkeypatch.setenv("SPRING_SERVICE_TOKEN", "svc")
+    assert saveRestaurant_pipeline.findall_restaurants_DB()["restaurants"][0]["placeId"] == 1
+    assert sent == ["Bearer svc"]
+
+    monkeypatch.delenv("SPRING_SERVICE_TOKEN")
+    with pytest.raises(RuntimeError):
+        saveRestaurant_pipeline.findall_restaurants_DB()
+    assert len(sent) == 1
+
+
+def test_load_catalog_ids_uses_service_token(monkeypatch):
+    from auth_context import get_request_token
+    from service import saveRestaurant_pipeline
+
+    monkeypatch.setattr(saveRestaurant_pipeline, "get_service_token", lambda: "svc")
+    monkeypatch.setattr(
+        saveRestaurant_pipeline, "findall_restaurants_DB", lambda: {"restaurants": [{"placeId": "3"}, 4]}
+    )
+
+    async def main():
+        return await saveRestaurant_pipeline.load_catalog_ids(), get_request_token()
+
+    assert asyncio.run(main()) == ([3, 4], "svc")
+
+    monkeypatch.setattr(saveRestaurant_pipeline, "findall_restaurants_DB", lambda: {"restaurants": None})
+    assert asyncio.run(saveRestaurant_pipeline.load_catalog_ids()) is None
@@ -0,0 +1,104 @@
+import pytest
+
+import uploader
+from uploader import CrawlUploader
+
+CRAWLED = {"rating": 4.5, "review_count": 2, "reviews": [{"text": "맛있어요"}], "menus": [{"name": "국밥"}]}
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """send_* 호출을 기록하고, fail에 넣은 이름은 500을 돌려주는 가짜 Spring 서버"""
+    class Fake:
+        calls = []
+        fail = set()
+        menu_log = []
+
+        @classmethod
+        def respond(cls, name, place_id):
+            cls.calls.append((name, place_id))
+            return (500, "boom") if name in cls.fail else (200, "ok")
+
+    Fake.calls, Fake.fail, Fake.menu_log = [], set(), []
+    monkeypatch.setattr(uploader, "send_restaurant", lambda r: Fake.respond("restaurant", r["place_id"]))
+    monkeypatch.setattr(uploader, "send_restaurant_rating", lambda pid, rating, count: Fake.respond("rating", pid))
+    monkeypatch.setattr(uploader, "send_reviews", lambda pid, reviews: Fake.respond("reviews", pid))
+    monkeypatch.setattr(uploader, "send_menus", lambda pid, menus: Fake.respond("menus", pid))
+    monkeypatch.setattr(uploader, "append_menu_log", lambda pid, menus: Fake.menu_log.append(pid))
+    return Fake
+
+
+def _place(place_id, registered=False, crawled=CRAWLED):
+    restaurant = None if registered else {"place_id": place_id}
+    return {"place_id": place_id, "restaurant": restaurant, "crawled": crawled}
+
+
+def test_new_place_is_registered_then_fully_uploaded(server):
+    up = CrawlUploader(concurrency=1)
+    result = up._upload_place(_place(1))
+
+    assert result == (1, "done", None, 4)
+    assert [name for name, _ in server.calls] == ["restaurant", "rating", "reviews", "menus"]
+    assert server.menu_log == [1]
+    up.close()
+
+
+def test_already_registered_place_skips_registration(server):
+    up = CrawlUploader(concurrency=1)
+    assert up._upload_place(_place(1, registered=True)) == (1, "done", None, 3)
+    assert ("restaurant", 1) not in server.calls
+    up.close()
+
+
+def test_failed_registration_stops_before_other_requests(server):
+    server.fail = {"restaurant"}
+    up = CrawlUploader(concurrency=1)
+
+    place_id, status, error, sent = up._upload_place(_place(1))
+
+    assert (place_id, status, sent) == (1, "failed", 1)
+    assert "500" in error
+    assert server.calls == [("restaurant", 1)]
+    up.close()
+
+
+def test_failed_step_leaves_place_registered(server):
+    server.fail = {"reviews"}
+    up = CrawlUploader(concurrency=1)
+
+    place_id, status, error, sent = up._upload_place(_place(1))
+
+    assert (status, sent) == ("registered", 3)
+    assert error.startswith("후기 전송 실패")
+    assert ("menus", 1) not in server.calls
+    assert server.menu_log == []
+    up.close()
+
+
+def test_crawl_failure_is_reported_as_registered(server):
+    up = CrawlUploader(concurrency=1)
+    place = {**_place(1, crawled=None), "error": "후기 페이지 없음"}
+    assert up._upload_place(place) == (1, "registered", "후기 페이지 없음", 1)
+    up.close()
+
+
+def test_upload_batch_returns_statuses_and_tracks_totals(server):
+    server.fail = {"menus"}
+    up = CrawlUploader(concurrency=4)
+
+    results = up.upload_batch([_place(1), _place(2, registered=True)])
+    assert sorted(r[:2] for r in results) == [(1, "registered"), (2, "registered")]
+
+    assert up.upload_batch([_place(3, registered=True, crawled=None)]) == [(3, "registered", "후기/메뉴 수집 실패")]
+    up.close()
+    assert up.totals["batches"] == 2
+    assert up.totals["places"] == 3
+    assert up.totals["requests"] == 7
+    assert up.totals["failed"] == 3
+
+
+def test_upload_batch_ignores_empty_batches(server):
+    up = CrawlUploader()
+    assert up.upload_batch([]) == []
+    assert up.totals["batches"] == 0
+    up.close()
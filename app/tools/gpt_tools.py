@@ -1,27 +1,36 @@
 import os
 import sys
+import asyncio
+import httpx
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from service.saveRestaurant_pipeline import (
-    get_location_and_context,
-    get_location_and_menu,
-    get_coordinates_from_location,
-    get_location_from_text,
-    get_nearby_restaurants_DB
+    extract_request_info,
+    empty_extraction,
+    get_coordinates_from_location_async,
 )
 from bring_to_server import (
-    bring_menu_filter_restaurants,
-    bring_context_filter_restaurants,
-    bring_restaurants_list
+    bring_nearby_restaurants_async,
+    bring_menu_filter_restaurants_async,
+    bring_context_filter_restaurants_async,
+    bring_restaurants_list_async
 )
-from llm.gemini_call import run_llm_analysis, get_final_recommendation
-from collections import Counter
+from service.pre_rank import pre_rank
+from service.fusion import fuse_candidates
+from service.spatial_index import spatial_index
+from service.menu_index import menu_index
+from service.context_tags import context_tag_store, match_context_tags
+from service.prompt import CONTEXT_PROMPT_VERSION
+from service.review_index import review_index
+from llm.llm_scheduler import llm_scheduler
+from llm.gemini_call import run_llm_analysis, get_final_recommendation, stream_final_recommendation
 from typing import TypedDict
 from langgraph.graph import StateGraph
 
 # Define the state structure
 class State(TypedDict):
     user_input: str
+    extraction: dict
     location: dict
     menu: dict
     context: dict
@@ -30,67 +39,148 @@ class State(TypedDict):
     result: dict
 
 # LangGraph-compatible tools
+# 아래 도구들은 그래프에서 병렬 브랜치로 실행되므로, Spring 호출은 async 버전을 쓰고
+# 남은 동기(blocking) 호출은 asyncio.to_thread로 넘겨서 이벤트 루프를 막지 않도록 합니다.
 
-async def get_location_tool(input_text: str) -> dict:
+async def extract_tool(input_text: str) -> dict:
+    print("extractTool사용")
+    # 추출도 Gemini 호출이므로 공용 스케줄러의 동시 실행/속도 제한을 따릅니다.
+    # 429/5xx/타임아웃은 스케줄러가 지터 백오프로 재시도하고, 재시도를 다 쓰면 빈 추출 결과로 진행합니다.
+    try:
+        return await llm_scheduler.run(lambda: asyncio.to_thread(extract_request_info, input_text, True))
+    except Exception as e:
+        print(f"❌ 추출 재시도 실패, 빈 결과로 진행: {e}")
+        return empty_extraction()
+
+
+async def get_location_tool(extraction: dict) -> dict:
     print("locationTool사용")
-    location = get_location_from_text(input_text)
-    coords = get_coordinates_from_location(location)
+    location = extraction.get("location", "")
+    coords = await get_coordinates_from_location_async(location)
     if "error" in coords:
         return coords
-    restaurants = get_nearby_restaurants_DB(coords["latitude"], coords["longitude"], radius=500)
+    if spatial_index.ready and spatial_index.covers(coords["latitude"], coords["longitude"]):
+        # 메모리 공간 인덱스로 바로 조회 (Spring 호출은 인덱스가 없거나 범위 밖일 때만)
+        restaurants = spatial_index.nearby_restaurants(coords["latitude"], coords["longitude"], 500)
+    else:
+        try:
+            restaurants = await bring_nearby_restaurants_async(coords["latitude"], coords["longitude"], radius=500)
+        except httpx.HTTPStatusError as e:
+            # get_nearby_restaurants_DB와 같은 계약: 서버가 200이 아니면 {"restaurants": None} (그래프는 계속 진행)
+            # 401/토큰 없음(RuntimeError)은 잡지 않고 run_from_node의 재로그인 안내로 올려보냄
+            print(f"⚠️ 주변 식당 조회 실패: {e}")
+            return {"restaurants": None}
+        except httpx.HTTPError as e:
+            return {"error": f"예외 발생: {str(e)}"}
+    restaurants["center"] = coords  # pre-ranking 거리 점수에 사용
     return restaurants
 
 
-async def get_menu_tool(input_text: str) -> dict:
+async def get_menu_tool(extraction: dict) -> dict:
     print("getmenuTool사용")
-    keywords = get_location_and_menu(input_text)
-    restaurants = bring_menu_filter_restaurants(keywords)
+    keywords = extraction.get("menu_keywords", [])
+    if menu_index.ready:
+        # 로컬 메뉴 역색인으로 조회 (백필이 안 끝났거나 일치하는 식당이 없으면 Spring 필터 사용)
+        hits = menu_index.search(keywords)
+        if hits:
+            return {"restaurants": hits}
+    restaurants = await bring_menu_filter_restaurants_async(keywords)
     return restaurants
 
 
-async def get_context_tool(input_text: str) -> dict:
+async def get_context_tool(extraction: dict) -> dict:
     print("getcontextTool사용")
-    contexts = get_location_and_context(input_text)
-    restaurants = bring_context_filter_restaurants(contexts)
+    contexts = extraction.get("context_keywords", [])
+    # 오프라인 배치(data/tag_restaurants.py)가 현재 프롬프트 버전으로 끝까지 돌았으면 로컬 조회로 끝냄
+    tags = match_context_tags(contexts)
+    if tags and context_tag_store.is_complete(CONTEXT_PROMPT_VERSION):
+        restaurants = {"restaurants": await asyncio.to_thread(context_tag_store.find_restaurants, tags)}
+        print(f"🏷️ 태그 조회 {tags}: {len(restaurants['restaurants'])}곳")
+        return restaurants
+    # 태그로 표현되지 않는 키워드는 리뷰 BM25 색인에서 점수순으로 조회 (점수는 pre-ranking에 사용)
+    if contexts and review_index.ready:
+        hits = review_index.search(contexts)
+        print(f"📚 리뷰 색인 조회 {contexts}: {len(hits)}곳")
+        return {"restaurants": [pid for pid, _ in hits], "scores": dict(hits)}
+    restaurants = await bring_context_filter_restaurants_async(contexts)
     return restaurants
 
 
-def get_restaurant_info(restaurant_ids: dict) -> dict:
+async def get_restaurant_info(restaurant_ids: dict) -> dict:
     print("정보가져오기 함수")
     try:
         restaurants = restaurant_ids.get("restaurants", [])
-        data = bring_restaurants_list(restaurants)
+        data = await bring_restaurants_list_async(restaurants)
         print(data)
         return data
+    except RuntimeError:
+        raise  # 인증 실패는 재로그인 안내로 (메뉴/태그 조회가 로컬로 끝나도 여기서는 Spring을 부름)
     except Exception as e:
         return {"error": f"파싱 실패: {str(e)}"}
 
 
-def intersection_restaurant(location:dict, menu:dict, context:dict):
+def intersection_restaurant(location:dict, menu:dict, context:dict, exclude: list = None,
+                            location_requested: bool = False):
     """
-    여러 리스트에서 2번 이상 등장한 식당 ID만 반환하는 도구.
+    위치/메뉴/상황 결과를 가중 RRF로 합쳐 순위가 매겨진 후보를 반환하는 도구.
+    세 목록 모두에 있는 식당이 부족하면 조건을 완화해서 후보를 채웁니다. (service/fusion.py)
+    location_requested: 사용자가 장소를 말했으면 위치 조회가 실패해도 다른 동네 식당으로 채우지 않음
     """
     print("교집합함수 호출")
     try:
-        location_ids = location.get("restaurants", [])
-        menu_ids = menu.get("restaurants", [])
-        context_ids = context.get("restaurants", [])
-
-        all_ids = location_ids + menu_ids + context_ids
-        counter = Counter(all_ids)
-
-        # 2번 이상 등장하는 ID 필터링
-        result = [rid for rid, count in counter.items() if count > 2]
-        print(result)
-        return {"restaurants": result}
+        result = fuse_candidates(
+            {"location": location, "menu": menu, "context": context},
+            exclude=exclude,
+            require_anchor=location_requested,
+        )
+        if "error" in result:
+            print(f"⚠️ 후보 없음: {result['error']}")
+            return result
+        print(f"🔗 후보 {len(result['restaurants'])}곳 (최소 {result['matched']}개 목록 일치)")
+        return result
 
     except Exception as e:
         return {"error": str(e)}
 
-async def final_recommend(restaurants_info: dict, input_text:str) -> dict:
+
+def extraction_keywords(extraction: dict) -> list:
+    """추출 결과의 메뉴 + 상황 키워드 (pre-ranking, 리뷰 선택에서 사용)"""
+    return (extraction or {}).get("menu_keywords", []) + (extraction or {}).get("context_keywords", [])
+
+
+def rank_restaurants(restaurants_info: dict, extraction: dict, center: dict = None, context_scores: dict = None,
+                     exclude: list = None) -> dict:
+    """
+    LLM 분석 전에 인기도/키워드 겹침/거리(+리뷰 색인 점수)로 후보를 점수 매겨 상위 K곳만 남깁니다.
+    exclude에 있는 식당(이미 추천한 곳)은 빼고 순위를 매깁니다.
+    """
+    restaurants = restaurants_info.get("restaurants") or []
+    if not isinstance(restaurants, list):
+        return restaurants_info
+    if exclude:
+        exclude = set(exclude)
+        restaurants = [r for r in restaurants if r.get("placeId") not in exclude]
+    keywords = extraction_keywords(extraction)
+    ranked = pre_rank(restaurants, keywords=keywords, center=center, context_scores=context_scores)
+    print(f"📊 pre-ranking: {len(restaurants)}곳 → {len(ranked)}곳")
+    return {**restaurants_info, "restaurants": ranked}
+
+
+async def final_recommend(restaurants_info: dict, input_text:str, keywords: list = None) -> dict:
     ai_rating = await run_llm_analysis(restaurants_info)
-    results = await get_final_recommendation(ai_rating, input_text)
+    results = await get_final_recommendation(ai_rating, input_text, keywords)
     return results
 
+
+async def stream_final_recommend(restaurants_info: dict, input_text: str, keywords: list = None):
+    """
+    final_recommend의 스트리밍 버전.
+    식당별 분석이 끝나면 ("analyses", 분석 결과)를, 이후 최종 추천은 ("token", 텍스트 조각)으로 넘겨줍니다.
+    """
+    ai_rating = await run_llm_analysis(restaurants_info)
+    yield "analyses", ai_rating
+    async for text in stream_final_recommendation(ai_rating, input_text, keywords):
+        yield "token", text
+
 graph_builder = StateGraph(State)
 
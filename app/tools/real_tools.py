@@ -7,7 +7,7 @@ from service.saveRestaurant_pipeline import get_location_and_context,get_locatio
 from bring_to_server import bring_menu_filter_restaurants, bring_context_filter_restaurants, bring_restaurants_list
 from llm.gemini_call import run_llm_analysis, get_final_recommendation
 import ast
-from collections import Counter
+from service.fusion import fuse_candidates
 
 accumulated_list = {}
 added_tools = set()
@@ -60,17 +60,10 @@ def get_restaurant_info(restaurant_ids:dict):
 
 def intersection_restaurant(location:list, menu:list, context:list):
     """
-    여러 리스트에서 2번 이상 등장한 식당 ID만 반환하는 도구.
+    위치/메뉴/상황 식당 ID 목록을 가중 RRF로 합쳐 순위가 매겨진 후보를 반환하는 도구.
     """
     try:
-        # 모든 리스트 합치기
-        all_ids = location + menu + context
-        counter = Counter(all_ids)
-
-        # 2번 이상 등장하는 ID 필터링
-        result = [rid for rid, count in counter.items() if count > 1]
-
-        return {"restaurants": result}
+        return fuse_candidates({"location": location, "menu": menu, "context": context})
 
     except Exception as e:
         return {"error": str(e)}
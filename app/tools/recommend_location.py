@@ -1,4 +1,3 @@
-import math
 import asyncio
 from langchain_core.tools import tool
 
@@ -8,6 +7,7 @@ from service.saveRestaurant_pipeline import (
     get_nearby_restaurants_DB
 )
 from service.review_fetch import get_review_texts
+from service.pre_rank import popularity_score
 from llm.gemini_call import run_llm_analysis, get_final_recommendation
 import time
 
@@ -34,10 +34,7 @@ async def recommend_by_location(text: str):
             if r.get("reviewCount", 0) >= 5
     ]
     for r in filtered_restaurants:
-        rating = r.get("rating", 0)
-        review_count = r.get("reviewCount", 0)
-        score = 0.6 * rating + 0.4 * math.log(review_count + 1)
-        r["score"] = score
+        r["score"] = popularity_score(r)
     
     top_restaurants = sorted(filtered_restaurants, key=lambda r: r["score"], reverse=True)[:10]
     